@@ -0,0 +1,67 @@
+"""
+Bulk A/B testing benchmark: one million comparisons scored by the scalar
+calculator (timed on a sample and extrapolated), by ab_test_bulk on arrays and
+by ab_test_frame on a DataFrame of experiments and variants.
+
+    python -m benchmarks.bench_ab --rows 1000000 --variants 4
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules import scenarios
+
+def random_experiments(rows, variants, seed=0):
+    """
+    DataFrame of `rows` (experiment, variant) rows; the first variant of each experiment is the control.
+    """
+    rng = np.random.default_rng(seed)
+    experiments = -(-rows // variants)
+    visitors = rng.integers(1_000, 100_000, experiments * variants)
+    base = np.repeat(rng.uniform(0.01, 0.2, experiments), variants)
+    conversions = rng.binomial(visitors, base * rng.uniform(0.95, 1.05, len(base)))
+    return pd.DataFrame({
+        "experiment": np.repeat(np.arange(experiments), variants),
+        "variant": np.tile(["control"] + [f"v{i}" for i in range(1, variants)], experiments),
+        "conversions": conversions,
+        "visitors": visitors,
+    }).head(rows)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10**6)
+    parser.add_argument("--variants", type=int, default=4, help="variants per experiment, control included")
+    parser.add_argument("--scalar-sample", type=int, default=20_000, help="comparisons timed with the scalar calculator")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    frame = random_experiments(args.rows, args.variants, args.seed)
+    rng = np.random.default_rng(args.seed)
+    a = frame.sample(args.rows, replace=True, random_state=args.seed)[["conversions", "visitors"]].to_numpy()
+    b = frame.sample(args.rows, replace=True, random_state=args.seed + 1)[["conversions", "visitors"]].to_numpy()
+
+    sample = rng.choice(args.rows, min(args.scalar_sample, args.rows), replace=False)
+    start = time.perf_counter()
+    for i in sample.tolist():
+        scenarios.calculate_ab_test_significance(a[i, 0], a[i, 1], b[i, 0], b[i, 1])
+    scalar = (time.perf_counter() - start) * args.rows / len(sample)
+
+    start = time.perf_counter()
+    for correction in scenarios.P_VALUE_CORRECTIONS:
+        scenarios.ab_test_bulk(a[:, 0], a[:, 1], b[:, 0], b[:, 1], correction=correction)
+    bulk = (time.perf_counter() - start) / len(scenarios.P_VALUE_CORRECTIONS)
+
+    start = time.perf_counter()
+    result = scenarios.ab_test_frame(frame)
+    framed = time.perf_counter() - start
+
+    print(f"{args.rows:,} comparisons")
+    print(f"  scalar calculator (extrapolated) {scalar:>9.2f} s")
+    print(f"  ab_test_bulk                     {bulk:>9.2f} s ({scalar / bulk:.0f}x)")
+    print(f"  ab_test_frame ({len(result):,} variants vs control) {framed:.2f} s, "
+          f"{int(result['Significant'].sum()):,} significant after Holm")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Collision benchmark: birthday curves from one call per group size with the
+old Python product loop against one vectorized call, k-way curves, unequal
+buckets, and inverse queries on large ID spaces.
+
+    python -m benchmarks.bench_collision --max-n 100000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from modules import collision
+
+def _loop_probability(n_people, days):
+    # The per-call product calculate_birthday_paradox used before the collision engine
+    if n_people > days:
+        return 1.0
+    prob_unique = 1.0
+    for i in range(n_people):
+        prob_unique *= (days - i) / days
+    return 1 - prob_unique
+
+def _seconds(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-n", type=int, default=100_000, help="largest group size on the curves")
+    parser.add_argument("--loop-n", type=int, default=5_000, help="largest group size for the per-call loop")
+    parser.add_argument("--buckets", type=int, default=100_000, help="buckets with unequal probabilities")
+    args = parser.parse_args()
+
+    days = 10**9
+    collision.collision_curve(10, days)  # load scipy.special outside the timings
+    looped, _ = _seconds(lambda: [_loop_probability(n, days) for n in range(args.loop_n + 1)])
+    curve, _ = _seconds(lambda: collision.collision_curve(args.loop_n, days))
+    print(f"Pair-collision curve, n = 0..{args.loop_n:,}, d = 10^9")
+    print(f"  one product loop per n       {looped * 1e3:>10.1f} ms")
+    print(f"  collision_curve              {curve * 1e3:>10.2f} ms ({looped / curve:,.0f}x)")
+    seconds, _ = _seconds(lambda: collision.collision_curve(args.max_n, 2**128))
+    print(f"  n = 0..{args.max_n:,}, d = 2^128 {seconds * 1e3:>10.2f} ms")
+
+    for k in (3, 4):
+        seconds, _ = _seconds(lambda: collision.collision_curve(args.max_n, 10**12, k))
+        print(f"{k}-way curve, n = 0..{args.max_n:,}       {seconds * 1e3:>10.1f} ms")
+
+    weights = np.random.default_rng(0).pareto(2.0, args.buckets) + 1
+    seconds, size = _seconds(lambda: collision.max_group_size(0.5, probs=weights))
+    print(f"Unequal buckets ({args.buckets:,}), 50% point  {seconds * 1e3:>10.1f} ms (n = {size:,})")
+
+    for epsilon, bits, k in [(1e-12, 64, 2), (1e-6, 128, 2), (1e-6, 64, 3)]:
+        seconds, size = _seconds(lambda: collision.max_group_size(epsilon, 2**bits, k))
+        print(f"Largest n, P(k={k}) <= {epsilon:g}, 2^{bits}  {seconds * 1e3:>8.2f} ms (n = {size:,})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Ingestion benchmark for the Statistics tab.
+
+Writes a column of random measurements as CSV, NPY and Parquet, then times
+data_io.load_array and the downstream statistics calls for each format.
+
+    python -m benchmarks.bench_ingest --rows 10000000
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules import data_io, statistics
+
+def timed(label, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    print(f"  {label:<28} {time.perf_counter() - start:>8.3f} s")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10**7)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    values = np.random.default_rng(args.seed).normal(14.0, 2.0, args.rows)
+    frame = pd.DataFrame({"value": values})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {ext: os.path.join(tmp, f"data{ext}") for ext in (".csv", ".npy", ".parquet")}
+        frame.to_csv(paths[".csv"], index=False)
+        np.save(paths[".npy"], values)
+        try:
+            frame.to_parquet(paths[".parquet"])
+        except ImportError:
+            del paths[".parquet"]
+            print("pyarrow/fastparquet not installed, skipping Parquet")
+
+        print(f"{args.rows:,} rows")
+        baseline_text = ", ".join(map(str, values[:10**5]))
+        start = time.perf_counter()
+        [float(x.strip()) for x in baseline_text.split(",")]
+        per_row = (time.perf_counter() - start) / 10**5
+        print(f"  {'text parsing (extrapolated)':<28} {per_row * args.rows:>8.3f} s")
+
+        for ext, path in paths.items():
+            print(f"{ext} ({os.path.getsize(path) / 2**20:,.0f} MiB)")
+            data = timed("load from path", data_io.load_array, path)
+            with open(path, "rb") as f:
+                upload = io.BytesIO(f.read())
+            timed("load from upload buffer", data_io.load_array, upload, name=path)
+            timed("calculate_descriptive_stats", statistics.calculate_descriptive_stats, data)
+            timed("perform_z_test", statistics.perform_z_test, data, 14.0, 2.0)
+            timed("perform_t_test", statistics.perform_t_test, data, 14.0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Lottery benchmark: exact tier tables, ticket generation with the redraw and
+Floyd samplers, popcount, and end-to-end simulated tickets per second.
+
+    python -m benchmarks.bench_lottery --tickets 10000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from modules import lottery
+
+GAMES = {"Powerball 5/69 + 1/26": lottery.POWERBALL, "Lotto 6/49": (49, 6, 0, 0), "Keno 20/80": (80, 20, 0, 0)}
+
+def _seconds(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=10_000_000, help="tickets simulated per game")
+    parser.add_argument("--chunk", type=int, default=lottery.TICKET_CHUNK, help="tickets per chunk")
+    args = parser.parse_args()
+
+    seconds, _ = _seconds(lambda: [lottery.prize_tiers(*game) for game in GAMES.values()])
+    print(f"Exact tier tables ({len(GAMES)} games)       {seconds * 1e3:>10.2f} ms")
+
+    rng = np.random.default_rng(0)
+    masks = lottery.random_masks(rng, args.chunk, 69, 5)
+    seconds, _ = _seconds(lambda: lottery.popcount(masks))
+    print(f"popcount, {args.chunk:,} x 2 words     {seconds / args.chunk * 1e9:>10.1f} ns/ticket")
+    for name, (pool, pick, _, _) in GAMES.items():
+        seconds, _ = _seconds(lambda: lottery.random_masks(rng, args.chunk, pool, pick))
+        print(f"random_masks, {name:<22} {seconds / args.chunk * 1e9:>8.1f} ns/ticket")
+
+    for name, game in GAMES.items():
+        seconds, sim = _seconds(lambda: lottery.simulate_tickets(*game, num_tickets=args.tickets, seed=0,
+                                                                 chunk_size=args.chunk))
+        print(f"simulate_tickets, {name:<22} {args.tickets / seconds / 1e6:>6.2f} M tickets/s "
+              f"({sim['Jackpot Winners']} jackpots)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Scaling benchmark for simulations.simulate_parallel.
+
+Runs the same simulation with an increasing number of worker processes and
+prints throughput (trials/sec) and speed-up relative to one worker.
+
+    python -m benchmarks.bench_parallel --kind dice --trials 100000000
+"""
+import argparse
+import os
+import time
+
+from modules import simulations
+
+def worker_counts(max_workers):
+    counts, n = [], 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    return counts + [max_workers]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kind", choices=sorted(simulations.HISTOGRAM_SIMULATORS), default="dice")
+    parser.add_argument("--trials", type=int, default=10**7)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=12345)
+    args = parser.parse_args()
+
+    params = {"dice": {"num_dice": 2}, "coin": {"num_coins": 10}, "card": {"hand_size": 5}}[args.kind]
+
+    print(f"{args.kind}: {args.trials:,} trials, params={params}")
+    print(f"{'workers':>8} {'seconds':>10} {'trials/sec':>14} {'speed-up':>9}")
+    baseline = None
+    for workers in worker_counts(args.max_workers):
+        start = time.perf_counter()
+        histogram = simulations.simulate_parallel(args.kind, args.trials, seed=args.seed, workers=workers, **params)
+        elapsed = time.perf_counter() - start
+        assert histogram.trials == args.trials
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>10.3f} {args.trials / elapsed:>14,.0f} {baseline / elapsed:>8.2f}x")
+
+if __name__ == "__main__":
+    main()
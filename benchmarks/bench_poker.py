@@ -0,0 +1,42 @@
+"""
+Throughput benchmark for the poker hand evaluator and equity engine.
+
+    python -m benchmarks.bench_poker --hands 2000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from modules import poker
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hands", type=int, default=2_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    for size in (5, 7):
+        hands = np.argpartition(rng.random((args.hands, 52)), size - 1, axis=1)[:, :size]
+        # Lookup tables are built on first use; time the steady state
+        poker.evaluate_hands(hands[:1])
+        start = time.perf_counter()
+        poker.evaluate_hands(hands)
+        elapsed = time.perf_counter() - start
+        print(f"{size}-card evaluation: {args.hands / elapsed:>14,.0f} hands/sec")
+
+    spots = [
+        ("AhAd vs KsKc preflop (exact)", dict(hole_cards="AhAd", opponents=["KsKc"], exact=True)),
+        ("AhKh vs 7s7c preflop (MC)", dict(hole_cards="AhKh", opponents=["7s7c"], seed=args.seed)),
+        ("AhKh vs 7s7c on QhJh2c (exact)", dict(hole_cards="AhKh", board="QhJh2c", opponents=["7s7c"])),
+        ("AhKh vs 3 random preflop (MC)", dict(hole_cards="AhKh", num_random_opponents=3, seed=args.seed)),
+    ]
+    for label, kwargs in spots:
+        start = time.perf_counter()
+        result = poker.calculate_equity(**kwargs)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<34} equity {result['Equity'][0]:.4f}  {result['Samples']:>9,} samples  {elapsed:.2f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Resampling benchmark: bootstrap replicates of the mean and median and a
+two-sample permutation test on a large dataset, with one worker and with a
+process pool, plus the cost of a BCa interval (jackknife included).
+
+    python -m benchmarks.bench_resampling --size 1000000 --resamples 200 --workers 4
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from modules import statistics
+
+def _seconds(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=10**6)
+    parser.add_argument("--resamples", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    data = np.random.default_rng(args.seed).lognormal(0.0, 1.0, args.size)
+    cells = args.size * args.resamples
+    print(f"{args.resamples:,} resamples of {args.size:,} points")
+    for statistic in ("mean", "median"):
+        for workers in sorted({1, args.workers}):
+            seconds, _ = _seconds(lambda: statistics.bootstrap_distribution(
+                data, statistic, args.resamples, seed=args.seed, workers=workers))
+            print(f"  bootstrap {statistic:<7} {workers:>2} worker(s) {seconds:>8.2f} s"
+                  f"   {seconds / cells * 1e9:>6.1f} ns/value"
+                  f"   10^5 resamples ~{seconds / args.resamples * 1e5 / 60:>6.1f} min")
+
+    seconds, result = _seconds(lambda: statistics.bootstrap_ci(
+        data, "skewness", num_resamples=args.resamples, seed=args.seed, workers=args.workers))
+    print(f"  BCa skewness interval        {seconds:>8.2f} s   [{result['CI Low']:.3f}, {result['CI High']:.3f}]")
+
+    half = args.size // 2
+    seconds, result = _seconds(lambda: statistics.permutation_test(
+        data[:half], data[half:], num_permutations=args.resamples, seed=args.seed, workers=args.workers))
+    print(f"  permutation test (mean)      {seconds:>8.2f} s   p = {result['P-Value']:.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Risk-of-ruin benchmark: exact Markov-chain solves for bankrolls up to 10^5
+units (scipy.sparse and the pure NumPy banded solver), cached lookups of
+nearby bankrolls, finite horizons, and path simulation.
+
+    python -m benchmarks.bench_ruin --max-bankroll 100000
+"""
+import argparse
+import time
+
+from modules import fastmath, ruin
+
+# (label, payoffs in units, probabilities)
+BETS = [
+    ("±1 at p = 0.501", [1, -1], [0.501, 0.499]),
+    ("+3 / -2 at p = 0.41", [3, -2], [0.41, 0.59]),
+    ("multi-outcome", [5, 1, -1, -4], [0.1, 0.4, 0.4, 0.1]),
+]
+
+def _seconds(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-bankroll", type=int, default=10**5)
+    parser.add_argument("--horizon", type=int, default=1000)
+    parser.add_argument("--paths", type=int, default=100_000)
+    parser.add_argument("--no-pure", action="store_true", help="skip the pure NumPy solver")
+    args = parser.parse_args()
+
+    backends = [False] if args.no_pure or not fastmath.HAVE_SCIPY else [False, True]
+    for label, steps, probs in BETS:
+        print(label)
+        for pure in backends:
+            fastmath.PURE = pure or not fastmath.HAVE_SCIPY
+            ruin._absorption.cache_clear()
+            name = "numpy banded" if fastmath.PURE else "scipy sparse"
+            cold, p = _seconds(lambda: ruin.ruin_probability(steps, probs, args.max_bankroll))
+            warm, _ = _seconds(lambda: ruin.ruin_probability(steps, probs, args.max_bankroll * 3 // 4))
+            print(f"  ever, {name:<13} {cold * 1e3:>10.2f} ms   nearby bankroll (cached) {warm * 1e3:>8.3f} ms   ψ = {p:.3e}")
+
+        small = min(args.max_bankroll, 100)
+        finite, p = _seconds(lambda: ruin.ruin_probability(steps, probs, small, args.horizon))
+        print(f"  {args.horizon:,} bets, bankroll {small}  {finite * 1e3:>8.2f} ms   ψ = {p:.4f}")
+        simulated, sim = _seconds(lambda: ruin.simulate_ruin(
+            lambda rng, shape: rng.choice(steps, size=shape, p=probs), small, args.horizon, args.paths, seed=0))
+        print(f"  simulated ({args.paths:,} paths)   {simulated * 1e3:>8.2f} ms   ψ = {sim['Risk of Ruin']:.4f} ± {sim['Std Error']:.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Cold-start benchmark: import cost of the app's dependencies and modules, and
+time to first render of each tab. Every measurement runs in a fresh
+interpreter, so nothing is already cached in sys.modules.
+
+    python -m benchmarks.bench_startup --repeat 3 -o startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORTS = [
+    "numpy", "pandas", "plotly.graph_objects", "plotly.express", "scipy.special", "scipy.stats", "streamlit",
+    "modules.probability", "modules.distributions", "modules.simulations", "modules.statistics",
+    "modules.scenarios", "modules.data_io", "modules.poker",
+]
+
+TABS = ["🧩 Probability Logic", "📊 Distributions", "🎲 Simulations", "📈 Statistics", "🛠️ Situational Tools", "🗺️ Parameter Sweep"]
+
+# Packages whose presence after a render shows what a tab pulled in
+HEAVY = ["pandas", "scipy", "plotly", "pyarrow"]
+
+_RENDER_SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+at = AppTest.from_file({main!r}, default_timeout=300)
+at.session_state["active_tab"] = {tab!r}
+at.run()
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "errors": len(at.exception),
+                  "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def _python(args, **kwargs):
+    return subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True, check=True, **kwargs)
+
+def import_seconds(module):
+    """
+    Cumulative import time of `module` in a fresh interpreter (python -X importtime).
+    """
+    result = _python(["-X", "importtime", "-c", f"import {module}"])
+    total = 0
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) == 3 and not parts[2].startswith("  ") and parts[1].strip().isdigit():
+            total += int(parts[1])
+    return total / 1e6
+
+def first_render(tab):
+    """
+    Seconds from a cold interpreter to the first full render of `tab`, plus
+    the heavy packages loaded by then.
+    """
+    script = _RENDER_SCRIPT.format(main=os.path.join(ROOT, "main.py"), tab=tab, heavy=HEAVY)
+    return json.loads(_python(["-c", script]).stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement (the fastest is kept)")
+    parser.add_argument("--no-render", action="store_true", help="only measure imports")
+    parser.add_argument("-o", "--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    results = {"imports": {}, "render": {}}
+    print("Import time (cumulative)")
+    for module in IMPORTS:
+        seconds = min(import_seconds(module) for _ in range(args.repeat))
+        results["imports"][module] = seconds
+        print(f"  {module:<28} {seconds * 1e3:>9.1f} ms")
+
+    if not args.no_render:
+        print("First render")
+        for tab in TABS:
+            runs = [first_render(tab) for _ in range(args.repeat)]
+            best = min(runs, key=lambda r: r["seconds"])
+            results["render"][tab] = best
+            loaded = ", ".join(best["loaded"]) or "-"
+            print(f"  {tab:<28} {best['seconds'] * 1e3:>9.1f} ms   loads: {loaded}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
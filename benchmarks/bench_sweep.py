@@ -0,0 +1,48 @@
+"""
+Parameter-sweep benchmark: a grid of binomial tail probabilities P(X > k) over
+k and p, by the cumulative path of modules.sweep, by broadcasting
+distributions.binomial_sf, and by calling it once per grid point (on a
+sample of the points).
+
+    python -m benchmarks.bench_sweep --size 1000 --n 1000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from modules import distributions
+from modules.sweep import sweep
+
+def _seconds(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1000, help="grid points per parameter")
+    parser.add_argument("--n", type=int, default=1000, help="binomial trials")
+    parser.add_argument("--sample", type=int, default=2000, help="grid points timed one call at a time")
+    args = parser.parse_args()
+
+    k = np.arange(args.size) * args.n // args.size
+    p = np.linspace(0, 1, args.size)
+    cells = args.size * args.size
+
+    swept, result = _seconds(lambda: sweep("distributions.binomial_sf", {"k": k, "p": p}, {"n": args.n}))
+    direct, reference = _seconds(lambda: distributions.binomial_sf(k[:, None], args.n, p[None, :]))
+    points = [(int(a), float(b)) for a, b in zip(k[:args.sample], p[::-1][:args.sample])]
+    looped, _ = _seconds(lambda: [distributions.binomial_sf(a, args.n, b) for a, b in points])
+    looped *= cells / len(points)
+
+    significant = reference > 1e-250
+    error = np.max(np.abs(result.values - reference)[significant] / reference[significant])
+    print(f"{args.size} x {args.size} grid of binomial P(X > k), n = {args.n}")
+    print(f"  {f'sweep ({result.method})':<30}{swept * 1e3:>10.1f} ms")
+    print(f"  binomial_sf broadcast         {direct * 1e3:>10.1f} ms")
+    print(f"  one call per point (est.)     {looped * 1e3:>10.1f} ms")
+    print(f"  max relative difference       {error:>10.1e}")
+
+if __name__ == "__main__":
+    main()
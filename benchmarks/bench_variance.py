@@ -0,0 +1,42 @@
+"""
+Variance-reduction benchmark: trials and time each estimation method needs to
+reach the same confidence-interval half-width.
+
+    python -m benchmarks.bench_variance --half-width 0.001
+"""
+import argparse
+import time
+
+from modules import simulations
+
+PROBLEMS = [
+    ("P(2 dice >= 10)", "dice", 10, {"num_dice": 2}),
+    ("P(20 coins >= 13 heads)", "coin", 13, {"num_coins": 20}),
+    ("P(5 cards sum >= 40)", "card", 40, {"hand_size": 5}),
+    ("Mean of 3 dice", "dice", None, {"num_dice": 3}),
+]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--half-width", type=float, default=0.001)
+    parser.add_argument("--max-trials", type=int, default=10**8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for label, kind, threshold, params in PROBLEMS:
+        print(label)
+        plain_trials = None
+        for method in simulations.ESTIMATION_METHODS:
+            if method == "control" and threshold is None:
+                continue
+            start = time.perf_counter()
+            res = simulations.estimate_adaptive(kind, threshold, target_half_width=args.half_width, method=method,
+                                                max_trials=args.max_trials, seed=args.seed, **params)
+            elapsed = time.perf_counter() - start
+            plain_trials = plain_trials or res["Trials"]
+            print(f"  {method:<11} {res['Estimate']:>10.5f} ± {res['CI High'] - res['Estimate']:.5f}"
+                  f" {res['Trials']:>12,} trials ({plain_trials / res['Trials']:>6.1f}x fewer)"
+                  f" {elapsed:>8.3f} s{'' if res['Converged'] else '  (not converged)'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+"""
+Benchmark suite for the modules.* hot paths and the Streamlit render functions.
+
+Every public function in distributions, probability, scenarios, simulations
+and statistics is timed at a range of input sizes (vector length, number of
+trials, data points, ...). Results are written as JSON and can be compared
+with a stored baseline; any case slower than the baseline by more than the
+threshold is reported as a regression and the exit status is 1.
+
+    python -m benchmarks.suite --max-size 1e6 -o bench.json
+    python -m benchmarks.suite --save-baseline                 # record benchmarks/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --threshold 0.2
+"""
+import argparse
+import inspect
+import json
+import logging
+import os
+import platform
+import statistics as pystats
+import sys
+import time
+
+import numpy as np
+
+from modules import distributions, probability, scenarios, simulations, statistics
+
+COVERED_MODULES = (distributions, probability, scenarios, simulations, statistics)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+SIZES = (10, 10**3, 10**5, 10**6, 10**8)
+# Only the constant-memory simulation engines go up to 10**8; cases that hold
+# their whole input in memory stop at 10**6 and Python-level loops at 10**5
+LOOP_MAX = 10**5
+
+CASES = []
+
+class Case:
+    def __init__(self, target, setup, sizes):
+        self.target = target
+        self.setup = setup
+        self.sizes = sizes
+
+    def ids(self, max_size):
+        return [(f"{self.target}[{size:g}]", size) for size in self.sizes if size <= max_size]
+
+def case(target, sizes=SIZES, max_size=None):
+    """
+    Register setup(size) -> zero-argument callable as the benchmark for `target`.
+    """
+    sizes = tuple(s for s in sizes if max_size is None or s <= max_size)
+
+    def register(setup):
+        CASES.append(Case(target, setup, sizes))
+        return setup
+    return register
+
+def _rng():
+    return np.random.default_rng(0)
+
+# ---------------------------------------------------------------------------
+# distributions: vector length
+# ---------------------------------------------------------------------------
+
+def _register_vectorized():
+    discrete = {
+        "binomial": lambda k: (k, len(k), 0.3),
+        "poisson": lambda k: (k, len(k) / 2),
+        "geometric": lambda k: (k + 1, 0.01),
+    }
+    continuous = {
+        "normal": lambda x: (x, 0.0, 1.0),
+        "exponential": lambda x: (x, 1.5),
+    }
+    for dist, make_args in discrete.items():
+        for kind in ("logpmf", "pmf", "cdf", "sf"):
+            func = getattr(distributions, f"{dist}_{kind}")
+            case(f"distributions.{func.__name__}", max_size=10**6)(
+                lambda size, func=func, make_args=make_args:
+                    (lambda args=make_args(np.arange(size, dtype=float)): func(*args)))
+    for dist, make_args in continuous.items():
+        for kind in ("pdf", "cdf", "sf"):
+            func = getattr(distributions, f"{dist}_{kind}")
+            case(f"distributions.{func.__name__}", max_size=10**6)(
+                lambda size, func=func, make_args=make_args:
+                    (lambda args=make_args(np.linspace(-4, 4, size)): func(*args)))
+
+_register_vectorized()
+
+# Quantiles: size = number of probability levels
+_QUANTILE_PARAMS = {"binomial": (1000, 0.3), "poisson": (250.0,), "geometric": (0.01,),
+                    "normal": (0.0, 1.0), "exponential": (1.5,)}
+
+def _register_quantiles():
+    for dist, params in _QUANTILE_PARAMS.items():
+        for kind in ("ppf", "isf"):
+            func = getattr(distributions, f"{dist}_{kind}")
+            case(f"distributions.{func.__name__}", max_size=10**6)(
+                lambda size, func=func, params=params: (lambda q=_rng().random(size): func(q, *params)))
+
+_register_quantiles()
+
+@case("distributions.quantile_table", sizes=(10, 10**3))
+def _(size):
+    # Building (uncached) tables for `size` different rates
+    rates = 100.0 + np.arange(size) / size
+    return lambda: [distributions._quantile_table.__wrapped__("poisson", rate) for rate in rates]
+
+@case("distributions.QuantileTable", max_size=10**6)
+def _(size):
+    table = distributions.quantile_table("poisson", 250.0)
+    q = _rng().random(size)
+    return lambda: (table.ppf(q), table.isf(q))
+
+# Scalar calculators: size = number of calls
+def _calls(func, *args):
+    return lambda size: (lambda: [func(*args) for _ in range(size)])
+
+case("distributions.calculate_binomial_probability", max_size=LOOP_MAX)(
+    _calls(distributions.calculate_binomial_probability, 100, 30, 0.3))
+case("distributions.calculate_poisson_distribution", max_size=LOOP_MAX)(
+    _calls(distributions.calculate_poisson_distribution, 4.0, 7))
+case("distributions.calculate_normal_distribution", max_size=LOOP_MAX)(
+    _calls(distributions.calculate_normal_distribution, 0.0, 1.0, -1.0, 1.0))
+case("distributions.calculate_geometric_distribution", max_size=LOOP_MAX)(
+    _calls(distributions.calculate_geometric_distribution, 0.2, 5))
+case("distributions.calculate_exponential_distribution", max_size=LOOP_MAX)(
+    _calls(distributions.calculate_exponential_distribution, 1.5, 0.0, 2.0))
+
+# ---------------------------------------------------------------------------
+# probability: number of variables
+# ---------------------------------------------------------------------------
+
+def _variables(size):
+    return {f"E{i}": p for i, p in enumerate(_rng().uniform(0, 1, size))}
+
+@case("probability.calculate_joint_probability", max_size=10**6)
+def _(size):
+    variables = _variables(size)
+    return lambda: probability.calculate_joint_probability(variables)
+
+@case("probability.calculate_union_probability", max_size=10**6)
+def _(size):
+    variables = _variables(size)
+    return lambda: probability.calculate_union_probability(variables)
+
+case("probability.calculate_conditional_probability", max_size=LOOP_MAX)(
+    _calls(probability.calculate_conditional_probability, {"A": 0.3, "B": 0.5}, "A", "B"))
+case("probability.calculate_bayesian_inference", max_size=LOOP_MAX)(
+    _calls(probability.calculate_bayesian_inference, {"H": 0.01, "E": 0.05, "P(E|H)": 0.95}, "H", "E"))
+
+@case("probability.calculate_expected_value", max_size=10**6)
+def _(size):
+    variables = {str(float(i)): 1.0 / size for i in range(size)}
+    return lambda: probability.calculate_expected_value(variables)
+
+# ---------------------------------------------------------------------------
+# scenarios: number of calls (birthday: group size)
+# ---------------------------------------------------------------------------
+
+case("scenarios.calculate_lottery_probability", max_size=LOOP_MAX)(
+    _calls(scenarios.calculate_lottery_probability, 69, 5, 26, 1))
+case("scenarios.calculate_poker_outs", max_size=LOOP_MAX)(
+    _calls(scenarios.calculate_poker_outs, 9, 2))
+case("scenarios.calculate_risk_of_ruin", max_size=LOOP_MAX)(
+    _calls(scenarios.calculate_risk_of_ruin, 0.55, 1, 1, 50))
+case("scenarios.calculate_ab_test_significance", max_size=LOOP_MAX)(
+    _calls(scenarios.calculate_ab_test_significance, 100, 1000, 120, 1000))
+
+@case("scenarios.calculate_birthday_paradox", sizes=(10, 100, 365))
+def _(size):
+    return lambda: [scenarios.calculate_birthday_paradox(n) for n in range(1, size + 1)]
+
+# Bulk A/B tests: number of comparisons (frame: rows, four per experiment)
+@case("scenarios.ab_test_bulk", max_size=10**6)
+def _(size):
+    conversions = _rng().binomial(1000, 0.1, (2, size))
+    return lambda: scenarios.ab_test_bulk(conversions[0], 1000, conversions[1], 1000)
+
+@case("scenarios.adjust_p_values", max_size=10**6)
+def _(size):
+    p_values = _rng().random(size)
+    return lambda: scenarios.adjust_p_values(p_values, "bh")
+
+@case("scenarios.ab_test_frame", max_size=10**6)
+def _(size):
+    import pandas as pd
+    frame = pd.DataFrame({"experiment": np.arange(size) // 4, "variant": np.arange(size) % 4,
+                          "conversions": _rng().binomial(1000, 0.1, size), "visitors": 1000})
+    return lambda: scenarios.ab_test_frame(frame)
+
+# ---------------------------------------------------------------------------
+# simulations: number of trials
+# ---------------------------------------------------------------------------
+
+case("simulations.simulate_dice_rolls", max_size=LOOP_MAX)(
+    lambda size: (lambda: simulations.simulate_dice_rolls(2, size)))
+case("simulations.simulate_coin_flips", max_size=10**6)(
+    lambda size: (lambda: simulations.simulate_coin_flips(10, size)))
+case("simulations.simulate_card_draws", max_size=LOOP_MAX)(
+    lambda size: (lambda: simulations.simulate_card_draws(size)))
+case("simulations.simulate_dice_histogram")(
+    lambda size: (lambda: simulations.simulate_dice_histogram(2, size, seed=0)))
+case("simulations.simulate_coin_histogram")(
+    lambda size: (lambda: simulations.simulate_coin_histogram(10, size, seed=0)))
+case("simulations.simulate_card_histogram")(
+    lambda size: (lambda: simulations.simulate_card_histogram(size, seed=0)))
+case("simulations.iter_dice_histogram")(
+    lambda size: (lambda: sum(1 for _ in simulations.iter_dice_histogram(2, size, seed=0))))
+case("simulations.iter_coin_histogram")(
+    lambda size: (lambda: sum(1 for _ in simulations.iter_coin_histogram(10, size, seed=0))))
+case("simulations.iter_card_histogram")(
+    lambda size: (lambda: sum(1 for _ in simulations.iter_card_histogram(size, seed=0))))
+# interval=0 yields a snapshot after every block, the most overhead streaming can add
+case("simulations.simulate_stream")(
+    lambda size: (lambda: list(simulations.simulate_stream("dice", size, seed=0, interval=0, num_dice=2))))
+case("simulations.simulate_parallel")(
+    lambda size: (lambda: simulations.simulate_parallel("dice", size, seed=0, num_dice=2)))
+# An unreachable target makes the estimator run its full trial budget
+case("simulations.estimate_adaptive", max_size=10**6)(
+    lambda size: (lambda: simulations.estimate_adaptive("dice", 10, target_se=1e-12, max_trials=size,
+                                                        method="control", seed=0, num_dice=2)))
+case("simulations.split_trials", sizes=(10,))(
+    lambda size: (lambda: simulations.split_trials(10**8, size)))
+
+@case("simulations.SumHistogram", max_size=10**6)
+def _(size):
+    samples = _rng().integers(2, 13, size)
+    return lambda: simulations.SumHistogram(2, 12).add(samples).variance
+
+# ---------------------------------------------------------------------------
+# statistics: number of data points
+# ---------------------------------------------------------------------------
+
+def _data(size):
+    return _rng().normal(14.0, 2.0, size).round(2)
+
+case("statistics.calculate_descriptive_stats", max_size=10**6)(
+    lambda size: (lambda d=_data(size): statistics.calculate_descriptive_stats(d)))
+case("statistics.perform_z_test", max_size=10**6)(
+    lambda size: (lambda d=_data(size): statistics.perform_z_test(d, 14.0, 2.0)))
+case("statistics.perform_t_test", max_size=10**6)(
+    lambda size: (lambda d=_data(size): statistics.perform_t_test(d, 14.0)))
+case("statistics.StreamingStats", max_size=10**6)(
+    lambda size: (lambda d=_data(size): statistics.StreamingStats(seed=0).update(d).result()))
+case("statistics.QuantileSketch", max_size=10**6)(
+    lambda size: (lambda d=_data(size): statistics.QuantileSketch(seed=0).update(d).quantile(0.5)))
+case("statistics.HeavyHitters", max_size=10**6)(
+    lambda size: (lambda d=_data(size): statistics.HeavyHitters().update(d).most_common()))
+case("statistics.summarize_chunks", max_size=10**6)(
+    lambda size: (lambda d=_data(size): statistics.summarize_chunks(np.array_split(d, 10), seed=0)))
+# Resampling: data size with a fixed 100 resamples (cost is resamples x size)
+case("statistics.bootstrap_distribution", max_size=10**6)(
+    lambda size: (lambda d=_data(size): statistics.bootstrap_distribution(d, "median", 100, seed=0)))
+case("statistics.bootstrap_ci", max_size=10**6)(
+    lambda size: (lambda d=_data(size): statistics.bootstrap_ci(d, "skewness", num_resamples=100, seed=0)))
+case("statistics.permutation_test", max_size=10**6)(
+    lambda size: (lambda d=_data(size): statistics.permutation_test(d[::2], d[1::2], num_permutations=100, seed=0)))
+
+# ---------------------------------------------------------------------------
+# main.py render functions, run headlessly through streamlit's AppTest
+# ---------------------------------------------------------------------------
+
+RENDER_FUNCTIONS = (
+    "render_probability_tab", "render_distributions_tab", "render_simulations_tab",
+    "render_statistics_tab", "render_scenarios_tab", "render_sweep_tab",
+)
+
+def _render(name):
+    def setup(size):
+        from streamlit.testing.v1 import AppTest
+        logging.getLogger("streamlit").setLevel(logging.ERROR)
+        script = f"import sys\nsys.path.insert(0, {ROOT!r})\nimport main\nmain.{name}()\n"
+
+        def run():
+            app = AppTest.from_string(script, default_timeout=300).run()
+            if app.exception:
+                raise RuntimeError(app.exception[0].value)
+        return run
+    return setup
+
+for _name in RENDER_FUNCTIONS:
+    case(f"main.{_name}", sizes=(1,))(_render(_name))
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def missing_coverage():
+    """
+    Public functions/classes of the covered modules without a benchmark case.
+    """
+    targets = {c.target for c in CASES}
+    missing = []
+    for module in COVERED_MODULES:
+        for name, obj in vars(module).items():
+            if name.startswith("_") or not (inspect.isfunction(obj) or inspect.isclass(obj)):
+                continue
+            if obj.__module__ == module.__name__ and f"{module.__name__.split('.')[-1]}.{name}" not in targets:
+                missing.append(f"{module.__name__}.{name}")
+    return missing
+
+def measure(func, min_time=0.2, max_repeats=20):
+    """
+    Run func until min_time has elapsed (at least once, at most max_repeats times).
+    """
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < max_repeats:
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+        if time.perf_counter() - started >= min_time:
+            break
+    return {"median": pystats.median(timings), "min": min(timings), "repeats": len(timings)}
+
+def run(max_size=10**6, pattern=None, min_time=0.2, render=True):
+    results = {}
+    for c in CASES:
+        if pattern and pattern not in c.target:
+            continue
+        if not render and c.target.startswith("main."):
+            continue
+        for case_id, size in c.ids(max_size):
+            try:
+                results[case_id] = measure(c.setup(size), min_time=min_time)
+                print(f"{case_id:<60} {results[case_id]['median'] * 1e3:>12.3f} ms", flush=True)
+            except ImportError as e:
+                print(f"{case_id:<60} skipped ({e})", flush=True)
+    return results
+
+def compare(current, baseline, threshold, min_seconds=1e-4):
+    """
+    Cases slower than baseline by more than `threshold` (fraction), ignoring
+    differences below min_seconds, which are timer noise.
+    """
+    regressions = []
+    for case_id, result in current.items():
+        before = baseline.get(case_id)
+        if before is None:
+            continue
+        ratio = result["median"] / before["median"]
+        if ratio > 1 + threshold and result["median"] - before["median"] > min_seconds:
+            regressions.append((case_id, before["median"], result["median"], ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-size", type=float, default=1e6, help="largest input size to run (up to 1e8)")
+    parser.add_argument("-k", "--filter", help="only run cases whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds to spend repeating each case")
+    parser.add_argument("--no-render", action="store_true", help="skip the Streamlit render cases")
+    parser.add_argument("-o", "--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before a case counts as a regression")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, help="write results as the new baseline")
+    args = parser.parse_args(argv)
+
+    missing = missing_coverage()
+    if missing:
+        print("No benchmark for: " + ", ".join(missing))
+
+    results = run(int(args.max_size), args.filter, args.min_time, not args.no_render)
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for case_id, before, after, ratio in regressions:
+            print(f"REGRESSION {case_id}: {before * 1e3:.3f} ms -> {after * 1e3:.3f} ms ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
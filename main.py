@@ -1,19 +1,75 @@
 
+import os
+
 import streamlit as st
 import numpy as np
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
+
+from modules.lazy import lazy_import
+
+# Heavy dependencies load on first use, i.e. only in the tabs that need them
+pd = lazy_import("pandas")
+go = lazy_import("plotly.graph_objects")
+px = lazy_import("plotly.express")
 
 # Import custom modules
 try:
-    from modules import probability, distributions, simulations, statistics, scenarios
+    from modules import probability, distributions, simulations, statistics, scenarios, data_io, poker, aggregation, convolution, ruin, sweep, collision, lottery
 except ImportError as e:
     st.error(f"Error import modules: {e}")
     st.stop()
 
+from modules import cache, instrumentation
 from utils import validate_input, format_probability
 
+# Seeded simulation runs are stored on disk and shared by every app process
+try:
+    from modules import result_store
+    simulate_parallel = result_store.persistent(simulations.simulate_parallel)
+except ImportError:
+    simulate_parallel = simulations.simulate_parallel
+
+# Deterministic calculators are memoized across reruns (simulations are not)
+probability = cache.cached_module(probability)
+distributions = cache.cached_module(distributions)
+statistics = cache.cached_module(statistics)
+scenarios = cache.cached_module(scenarios)
+convolution = cache.cached_module(convolution)
+ruin = cache.cached_module(ruin)
+collision = cache.cached_module(collision)
+lottery = cache.cached_module(lottery)
+sweep = cache.cached_module(sweep)
+
+# Opt-in timing (PROBCALC_METRICS=1); without it these return their argument unchanged
+probability = instrumentation.instrumented(probability, "probability")
+distributions = instrumentation.instrumented(distributions, "distributions")
+statistics = instrumentation.instrumented(statistics, "statistics")
+scenarios = instrumentation.instrumented(scenarios, "scenarios")
+convolution = instrumentation.instrumented(convolution, "convolution")
+ruin = instrumentation.instrumented(ruin, "ruin")
+collision = instrumentation.instrumented(collision, "collision")
+lottery = instrumentation.instrumented(lottery, "lottery")
+sweep = instrumentation.instrumented(sweep, "sweep")
+simulations = instrumentation.instrumented(simulations, "simulations")
+data_io = instrumentation.instrumented(data_io, "data_io")
+poker = instrumentation.instrumented(poker, "poker")
+simulate_parallel = instrumentation.timed("simulations.simulate_parallel")(simulate_parallel)
+instrumentation.start_http_server()
+
+@instrumentation.timed("render.plotly_chart")
+def show_chart(fig, container=st):
+    container.plotly_chart(fig, use_container_width=True)
+
+def histogram_chart(edges, counts, title, exact=None):
+    # Only bin geometry goes to the browser, whatever the number of trials
+    centers, widths = aggregation.bar_geometry(edges)
+    fig = go.Figure(go.Bar(x=centers, y=counts, width=widths, name="Simulated"))
+    if exact is not None:
+        # Expected counts from the exact distribution, binned like the simulation
+        expected, _ = np.histogram(exact.values, bins=edges, weights=exact.probs * np.sum(counts))
+        fig.add_trace(go.Scatter(x=centers, y=expected, mode="lines+markers", name="Exact"))
+    fig.update_layout(title=title)
+    return fig
+
 def load_css():
     try:
         with open(".streamlit/custom.css") as f:
@@ -21,10 +77,11 @@ def load_css():
     except FileNotFoundError:
         pass
 
+@instrumentation.timed("render.probability_tab")
 def render_probability_tab():
     st.header("Classical Probability Logic")
     calc_type = st.selectbox(
-        "Select Calculation",,
+        "Select Calculation",
         ["Joint Probability (AND)", "Union Probability (OR)", "Conditional Probability", "Bayesian Inference", "Expected Value"]
     )
     
@@ -112,6 +169,7 @@ def render_probability_tab():
     if result is not None:
         st.success(f"Result: {format_probability(result)}")
 
+@instrumentation.timed("render.distributions_tab")
 def render_distributions_tab():
     st.header("Probability Distributions")
     dist_type = st.selectbox("Select Distribution", ["Binomial", "Poisson", "Normal", "Geometric", "Exponential"])
@@ -129,8 +187,9 @@ def render_distributions_tab():
         
         # Plot
         x = np.arange(0, n+1)
-        y = [distributions.calculate_binomial_probability(n, i, p) for i in x]
+        y = distributions.binomial_pmf(x, n, p)
         fig.add_trace(go.Bar(x=x, y=y, name="PMF"))
+        ppf, isf = (lambda q: distributions.binomial_ppf(q, n, p)), (lambda q: distributions.binomial_isf(q, n, p))
         
     elif dist_type == "Poisson":
         c1, c2 = st.columns(2)
@@ -141,8 +200,9 @@ def render_distributions_tab():
         st.metric(f"P(X={k})", f"{prob:.4f}")
         
         x = np.arange(0, int(rate*3)+5)
-        y = [distributions.calculate_poisson_distribution(rate, i) for i in x]
+        y = distributions.poisson_pmf(x, rate)
         fig.add_trace(go.Bar(x=x, y=y, name="PMF"))
+        ppf, isf = (lambda q: distributions.poisson_ppf(q, rate)), (lambda q: distributions.poisson_isf(q, rate))
 
     elif dist_type == "Normal":
         c1, c2 = st.columns(2)
@@ -156,13 +216,14 @@ def render_distributions_tab():
         st.metric(f"P({low} ≤ X ≤ {high})", f"{prob:.4f}")
         
         x = np.linspace(mu - 4*sigma, mu + 4*sigma, 200)
-        y = (1/(sigma * np.sqrt(2 * np.pi))) * np.exp(-0.5 * ((x - mu) / sigma)**2)
+        x, y = aggregation.downsample_curve(x, distributions.normal_pdf(x, mu, sigma))
         fig.add_trace(go.Scatter(x=x, y=y, mode='lines', name='PDF'))
         
         # Fill area
         x_fill = np.linspace(low, high, 100)
-        y_fill = (1/(sigma * np.sqrt(2 * np.pi))) * np.exp(-0.5 * ((x_fill - mu) / sigma)**2)
+        x_fill, y_fill = aggregation.downsample_curve(x_fill, distributions.normal_pdf(x_fill, mu, sigma))
         fig.add_trace(go.Scatter(x=x_fill, y=y_fill, fill='tozeroy', mode='none', fillcolor='rgba(0,100,80,0.5)', name='Prob Area'))
+        ppf, isf = (lambda q: distributions.normal_ppf(q, mu, sigma)), (lambda q: distributions.normal_isf(q, mu, sigma))
 
     elif dist_type == "Geometric":
         c1, c2 = st.columns(2)
@@ -173,8 +234,9 @@ def render_distributions_tab():
         st.metric(f"P(X={k})", f"{prob:.4f}")
         
         x = np.arange(1, 20)
-        y = [distributions.calculate_geometric_distribution(p, i) for i in x]
+        y = distributions.geometric_pmf(x, p)
         fig.add_trace(go.Bar(x=x, y=y, name="PMF"))
+        ppf, isf = (lambda q: distributions.geometric_ppf(q, p)), (lambda q: distributions.geometric_isf(q, p))
 
     elif dist_type == "Exponential":
         c1, c2, c3 = st.columns(3)
@@ -186,59 +248,136 @@ def render_distributions_tab():
         st.metric(f"P({low} ≤ T ≤ {high})", f"{prob:.4f}")
         
         x = np.linspace(0, max(high, 5/rate), 200)
-        y = rate * np.exp(-rate * x)
+        x, y = aggregation.downsample_curve(x, distributions.exponential_pdf(x, rate))
         fig.add_trace(go.Scatter(x=x, y=y, mode='lines', name='PDF'))
         
         x_fill = np.linspace(low, high, 100)
-        y_fill = rate * np.exp(-rate * x_fill)
+        x_fill, y_fill = aggregation.downsample_curve(x_fill, distributions.exponential_pdf(x_fill, rate))
         fig.add_trace(go.Scatter(x=x_fill, y=y_fill, fill='tozeroy', mode='none', fillcolor='rgba(200,50,50,0.5)', name='Area'))
+        ppf, isf = (lambda q: distributions.exponential_ppf(q, rate)), (lambda q: distributions.exponential_isf(q, rate))
+
+    show_chart(fig)
+
+    with st.expander("🔁 Inverse: Value for a Given Coverage"):
+        c1, c2 = st.columns(2)
+        coverage = c1.number_input("Coverage", 0.0, 1.0, 0.95, step=0.01, format="%.4f")
+        region = c2.radio("Region", ["Lower Tail", "Central Interval"], horizontal=True)
+        if region == "Lower Tail":
+            st.metric(f"Smallest x with P(X ≤ x) ≥ {coverage:g}", f"{float(ppf(coverage)):,.6g}")
+        else:
+            alpha = (1 - coverage) / 2
+            st.metric(f"Interval covering at least {coverage:g}", f"[{float(ppf(alpha)):,.6g}, {float(isf(alpha)):,.6g}]")
+
+def run_simulation(kind, num_trials, seed, **params):
+    # Spreading small runs over processes costs more than it saves
+    workers = 1 if num_trials < 10**6 else os.cpu_count()
+    return simulate_parallel(kind, num_trials, seed=seed, workers=workers, **params)
 
-    st.plotly_chart(fig, use_container_width=True)
+def run_live_simulation(run_key, kind, num_trials, seed, params, title, exact):
+    # The Cancel button reruns the script, which stops this loop at its next
+    # Streamlit call; the partial histogram saved below is then shown instead
+    st.button("⏹ Cancel", key="cancel_simulation")
+    chart, progress, status = st.empty(), st.progress(0.0), st.empty()
+    for i, snap in enumerate(simulations.simulate_stream(kind, num_trials, seed=seed, **params)):
+        hist = snap["Histogram"]
+        st.session_state["simulation_run"] = {"key": run_key, "histogram": hist, "done": snap["Done"]}
+        chart.plotly_chart(histogram_chart(*aggregation.histogram_bins(hist), title, exact=exact),
+                           use_container_width=True, key=f"live_chart_{i}")
+        progress.progress(snap["Trials"] / snap["Total"] if snap["Total"] else 1.0)
+        status.caption(f"{snap['Trials']:,} / {snap['Total']:,} trials · {snap['Rate']:,.0f} trials/s · "
+                       f"mean {snap['Mean']:.4f} (95% CI {snap['CI Low']:.4f} to {snap['CI High']:.4f})")
+    chart.empty()
+    progress.empty()
 
+@instrumentation.timed("render.simulations_tab")
 def render_simulations_tab():
     st.header("Monte Carlo Simulations")
-    sim_type = st.selectbox("Type", ["Dice Rolls", "Coin Flips", "Card Draws"])
+    c1, c2 = st.columns([3, 1])
+    sim_type = c1.selectbox("Type", ["Dice Rolls", "Coin Flips", "Card Draws"])
+    seed = c2.number_input("Seed", 0, 2**31 - 1, 42, help="Runs with the same settings and seed are computed once and reused")
     
     if sim_type == "Dice Rolls":
         c1, c2 = st.columns(2)
         n_dice = c1.number_input("Num Dice", 1, 10, 2)
-        n_rolls = c2.number_input("Num Rolls", 100, 100000, 1000)
-        
-        if st.button("Run Simulation"):
-            results = simulations.simulate_dice_rolls(n_dice, n_rolls)
-            fig = px.histogram(results, nbins=n_dice*6, title=f"Sum of {n_dice} Dice ({n_rolls} rolls)")
-            st.plotly_chart(fig, use_container_width=True)
-            stats_res = statistics.calculate_descriptive_stats(results)
-            st.json(stats_res)
+        num_trials = c2.number_input("Num Rolls", 100, 10_000_000, 1000)
+        kind, params = "dice", {"num_dice": n_dice}
+        title, exact = f"Sum of {n_dice} Dice ({num_trials:,} rolls)", convolution.dice_sum(n_dice)
 
     elif sim_type == "Coin Flips":
         c1, c2 = st.columns(2)
         n_coins = c1.number_input("Num Coins", 1, 100, 10)
-        n_flips = c2.number_input("Num Flips", 100, 100000, 1000)
-        
-        if st.button("Run Simulation"):
-            results = simulations.simulate_coin_flips(n_coins, n_flips)
-            fig = px.histogram(results, title=f"Heads in {n_coins} Coin Flips ({n_flips} trials)")
-            st.plotly_chart(fig, use_container_width=True)
-            st.metric("Expected Heads", n_coins * 0.5)
-            st.metric("Observed Mean", np.mean(results))
+        num_trials = c2.number_input("Num Flips", 100, 10_000_000, 1000)
+        kind, params = "coin", {"num_coins": n_coins}
+        title, exact = f"Heads in {n_coins} Coin Flips ({num_trials:,} trials)", convolution.binomial(n_coins, 0.5)
 
     elif sim_type == "Card Draws":
-        n_draws = st.number_input("Num Draws", 100, 10000, 1000)
-        if st.button("Run"):
-            results = simulations.simulate_card_draws(n_draws)
-            fig = px.histogram(results, title="Sum of 5 Card Values")
-            st.plotly_chart(fig, use_container_width=True)
+        num_trials = st.number_input("Num Draws", 100, 10_000_000, 1000)
+        kind, params = "card", {"hand_size": 5}
+        title, exact = "Sum of 5 Card Values", convolution.card_sum(5)
 
+    run_key = (kind, tuple(sorted(params.items())), num_trials, seed)
+    live = st.toggle("Live progress", False,
+                     help="Update the chart while the simulation runs; it can be cancelled midway. Live runs use "
+                          "one process and are not stored, so they draw a different sample than the default run")
+    if st.button("Run Simulation"):
+        if live:
+            run_live_simulation(run_key, kind, num_trials, seed, params, title, exact)
+        else:
+            hist = run_simulation(kind, num_trials, seed, **params)
+            st.session_state["simulation_run"] = {"key": run_key, "histogram": hist, "done": True}
+
+    # Also reached on the rerun that Cancel triggers, which keeps the partial result
+    run = st.session_state.get("simulation_run")
+    if run is not None and run["key"] == run_key and run["histogram"].trials:
+        hist = run["histogram"]
+        if not run["done"]:
+            st.warning(f"Cancelled after {hist.trials:,} of {num_trials:,} trials; showing the partial result.")
+        show_chart(histogram_chart(*aggregation.histogram_bins(hist), title, exact=exact))
+        c1, c2 = st.columns(2)
+        c1.metric("Exact Mean", f"{exact.mean:.4f}")
+        c2.metric("Observed Mean", f"{hist.mean:.4f}")
+        st.json(hist.describe())
+
+    with st.expander("🎯 Run to a Target Precision"):
+        st.caption("Draws trials in batches and stops as soon as the 95% confidence interval is narrow enough.")
+        c1, c2, c3 = st.columns(3)
+        method = c1.selectbox("Method", simulations.ESTIMATION_METHODS, index=1,
+                              format_func={"plain": "Plain Monte Carlo", "antithetic": "Antithetic Variates",
+                                           "control": "Control Variate", "qmc": "Quasi-Monte Carlo (Sobol)"}.get)
+        quantity = c2.selectbox("Estimate", ["P(Sum ≥ t)", "Mean"])
+        half_width = c3.number_input("CI Half-Width", 1e-5, 10.0, 0.005, format="%.5f")
+        threshold = st.number_input("Threshold (t)", value=10) if quantity != "Mean" else None
+        if st.button("Estimate"):
+            try:
+                res = simulations.estimate_adaptive(kind, threshold, target_half_width=half_width,
+                                                    method=method, seed=seed, **params)
+            except (ValueError, ImportError) as e:
+                st.error(str(e))
+            else:
+                c1, c2, c3 = st.columns(3)
+                c1.metric("Estimate", f"{res['Estimate']:.5f}")
+                c2.metric("95% CI", f"[{res['CI Low']:.5f}, {res['CI High']:.5f}]")
+                c3.metric("Trials Used", f"{res['Trials']:,}")
+                if not res["Converged"]:
+                    st.warning("Stopped at the trial limit before reaching the target precision.")
+
+@instrumentation.timed("render.statistics_tab")
 def render_statistics_tab():
     st.header("Statistical Analysis")
     
-    st.info("Paste data (comma separated) or generate random data.")
-    data_input = st.text_area("Data Input", "12, 15, 14, 16, 15, 13, 15, 14, 18, 14")
+    st.info("Paste data (comma separated) or upload a CSV, NPY or Parquet file.")
+    uploaded = st.file_uploader("Data File", type=[ext.lstrip(".") for ext in data_io.SUPPORTED_EXTENSIONS])
+    if uploaded is None:
+        data_input = st.text_area("Data Input", "12, 15, 14, 16, 15, 13, 15, 14, 18, 14")
     
     try:
-        data = [float(x.strip()) for x in data_input.split(',')]
-        st.write(f"Loaded {len(data)} data points.")
+        if uploaded is not None:
+            columns = data_io.load_columns(uploaded)
+            column = st.selectbox("Column", list(columns)) if len(columns) > 1 else next(iter(columns))
+            data = columns[column]
+        else:
+            data = data_io.parse_text(data_input)
+        st.write(f"Loaded {len(data):,} data points.")
         
         res = statistics.calculate_descriptive_stats(data)
         st.write("### Descriptive Stats")
@@ -260,15 +399,41 @@ def render_statistics_tab():
             t_res = statistics.perform_t_test(data, pop_mean_t)
             st.write(t_res)
 
+        st.write("### Resampling")
+        if st.checkbox("Bootstrap Confidence Interval"):
+            c1, c2, c3 = st.columns(3)
+            stat_name = c1.selectbox("Statistic", list(statistics.RESAMPLING_STATISTICS), key="boot_stat")
+            method = c2.selectbox("Method", statistics.BOOTSTRAP_METHODS, index=1, format_func=str.upper)
+            confidence = c3.slider("Confidence", 0.80, 0.99, 0.95, key="boot_confidence")
+            c1, c2 = st.columns(2)
+            resamples = c1.number_input("Resamples", 100, 1_000_000, 10_000, step=1000, key="boot_resamples")
+            seed = c2.number_input("Seed", 0, value=0, key="boot_seed")
+            st.write(statistics.bootstrap_ci(data, stat_name, confidence, method, resamples, seed=seed))
+
+        if st.checkbox("Two-Sample Permutation Test"):
+            other_input = st.text_area("Sample B (comma separated)", "13, 16, 17, 15, 18, 16, 17, 19, 15, 17")
+            other = data_io.parse_text(other_input)
+            c1, c2, c3 = st.columns(3)
+            perm_stat = c1.selectbox("Statistic", list(statistics.RESAMPLING_STATISTICS), key="perm_stat")
+            alternative = c2.selectbox("Alternative", statistics.ALTERNATIVES)
+            permutations = c3.number_input("Permutations", 100, 1_000_000, 10_000, step=1000)
+            perm_res = statistics.permutation_test(data, other, perm_stat, alternative, permutations, seed=0)
+            st.write(perm_res)
+            if perm_res['P-Value'] < 0.05:
+                st.success("Reject Null Hypothesis (Significant)")
+            else:
+                st.warning("Fail to Reject Null Hypothesis (Not Significant)")
+
     except Exception as e:
         st.error(f"Invalid data format: {e}")
 
+@instrumentation.timed("render.scenarios_tab")
 def render_scenarios_tab():
     st.header("🛠️ Situational Tools")
     st.markdown("Specialized calculators for real-world scenarios.")
     
     scenario = st.selectbox("Select Scenario", 
-        ["Lottery Probability", "Birthday Paradox", "Poker Outs", "Risk of Ruin", "A/B Test Significance"])
+        ["Lottery Probability", "Birthday Paradox", "Poker Outs", "Poker Equity", "Risk of Ruin", "A/B Test Significance"])
         
     st.markdown("---")
     
@@ -280,27 +445,80 @@ def render_scenarios_tab():
         
         bonus_balls = c1.number_input("Total Bonus Balls (e.g. Red)", 0, 50, 26)
         pick_bonus = c2.number_input("Bonus Balls to Pick", 0, 5, 1)
+        if not bonus_balls:
+            pick_bonus = 0
         
-        if st.button("Calculate Odds"):
+        try:
             prob = scenarios.calculate_lottery_probability(total_balls, pick_white, bonus_balls, pick_bonus)
-            st.metric("Win Probability", f"{prob:.12f}")
-            if prob > 0:
-                st.metric("1 in X Chance", f"1 in {int(1/prob):,}")
+            tiers = lottery.prize_tiers(total_balls, pick_white, bonus_balls, pick_bonus)
+        except ValueError as e:
+            st.error(e)
+            return
+        c1.metric("Jackpot Probability", f"{prob:.4g}")
+        c2.metric("1 in X Chance", f"1 in {round(1/prob):,}")
+
+        st.markdown("#### Prize Table")
+        c1, c2, c3 = st.columns(3)
+        jackpot = c1.number_input("Jackpot ($)", 0.0, value=500e6, step=10e6, format="%.0f")
+        price = c2.number_input("Ticket Price ($)", 0.0, value=2.0, step=0.5)
+        sold = c3.number_input("Tickets Sold", 0, value=100_000_000, step=1_000_000,
+                               help="Other winners split the jackpot; 0 ignores sharing")
+        # Powerball's fixed prizes fill the table when the game matches; otherwise only the jackpot pays
+        fixed = lottery.POWERBALL_PRIZES if (total_balls, pick_white, bonus_balls, pick_bonus) == lottery.POWERBALL else {}
+        table = pd.DataFrame({"Tier": [f"{w}+{b}" if pick_bonus else f"{w}" for w, b in tiers],
+                              "Probability": list(tiers.values()),
+                              "Prize ($)": [fixed.get(tier, 0.0) for tier in tiers]})
+        table.loc[0, "Prize ($)"] = jackpot
+        table = st.data_editor(table, disabled=["Tier", "Probability"], hide_index=True)
+        prizes = dict(zip(tiers, table["Prize ($)"].fillna(0.0)))
+        ev = lottery.expected_value(total_balls, pick_white, bonus_balls, pick_bonus, prizes, price, sold)
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Expected Prize", f"${ev['Expected Prize']:,.2f}")
+        c2.metric("Expected Value", f"${ev['Expected Value']:,.2f}")
+        c3.metric("Win Any Prize", f"1 in {1/ev['Win Probability']:,.1f}" if ev["Win Probability"] > 0 else "—")
+        c4.metric("Jackpot Share", f"{ev['Jackpot Share']:.1%}", help="Expected fraction kept after splitting")
+
+        st.markdown("#### Ticket Simulation")
+        c1, c2 = st.columns(2)
+        n_tickets = c1.select_slider("Tickets", [10**4, 10**5, 10**6, 10**7], 10**6)
+        seed = c2.number_input("Seed", 0, value=0, key="lottery_seed")
+        if st.button("Simulate Tickets"):
+            with st.spinner("Scoring tickets..."):
+                sim = lottery.simulate_tickets(total_balls, pick_white, bonus_balls, pick_bonus, n_tickets, seed=seed)
+            st.caption(f"Draw: {sim['Draw']} + {sim['Bonus Draw']}" if pick_bonus else f"Draw: {sim['Draw']}")
+            counts = list(sim["Tier Counts"].values())
+            st.dataframe(pd.DataFrame({"Tier": table["Tier"], "Tickets": counts,
+                                       "Observed": np.array(counts) / n_tickets,
+                                       "Exact": list(tiers.values())}), hide_index=True)
 
     elif scenario == "Birthday Paradox":
         st.subheader("🎂 Birthday Paradox")
-        n = st.number_input("Number of People", 2, 366, 23)
-        prob = scenarios.calculate_birthday_paradox(n)
+        c1, c2, c3 = st.columns(3)
+        space = c1.selectbox("Collision Space", ["365 Days", "Custom Size", "Hash / ID Bits"])
+        if space == "Custom Size":
+            days = c2.number_input("Number of Buckets (d)", 1, value=1000)
+        elif space == "Hash / ID Bits":
+            days = 2 ** c2.slider("Bits", 8, 128, 32)
+        else:
+            days = 365
+        k = c3.number_input("People Sharing (k)", 2, 10, 2, help="Collision = at least k in the same bucket")
+        n = st.number_input("Number of People / Items", 0, value=23)
+        prob = collision.collision_probability(n, days, k)
         
         col1, col2 = st.columns([1,3])
-        col1.metric("Probability of Match", f"{prob:.2%}")
-        
-        # simple plot
-        x = np.arange(1, 101)
-        y = [scenarios.calculate_birthday_paradox(i) for i in x]
-        fig = px.line(x=x, y=y, title="Probability of Shared Birthday vs Group Size")
+        col1.metric("Probability of Match", f"{prob:.4g}" if 0 < prob < 1e-4 else f"{prob:.2%}")
+        budget = col1.select_slider("Collision Budget ε", [1e-12, 1e-9, 1e-6, 1e-3, 0.01, 0.1, 0.5], 0.5)
+        col1.metric("Max Group Size", f"{collision.max_group_size(budget, days, k):,}",
+                    help="Largest group whose collision probability stays within ε")
+        
+        # Whole curve in one vectorized call, up to about three times the 50% point
+        x_max = max(3 * collision.max_group_size(0.5, days, k), 10)
+        x = np.unique(np.linspace(0, x_max, 400).round())
+        y = collision.collision_probability(x, days, k)
+        fig = px.line(x=x, y=y, title="Probability of Collision vs Group Size",
+                      labels={"x": "Group Size", "y": "Probability"})
         fig.add_hline(y=0.5, line_dash="dash", line_color="red", annotation_text="50% Threshold")
-        col2.plotly_chart(fig, use_container_width=True)
+        show_chart(fig, col2)
 
     elif scenario == "Poker Outs":
         st.subheader("🃏 Poker Outs Calculator")
@@ -312,19 +530,50 @@ def render_scenarios_tab():
         prob = scenarios.calculate_poker_outs(outs, n_cards)
         st.metric("Hit Probability", f"{prob:.2%}")
         
-        st.info("Approximation based on standard deck (52 cards).")
+        st.info("Approximation based on standard deck (52 cards). Use Poker Equity for exact odds.")
+
+    elif scenario == "Poker Equity":
+        st.subheader("♠️ Texas Hold'em Equity")
+        c1, c2 = st.columns(2)
+        hole = c1.text_input("Your Hole Cards", "AhKh", help="Rank (2-9, T, J, Q, K, A) + suit (c, d, h, s)")
+        board = c2.text_input("Board (0, 3, 4 or 5 cards)", "")
+        opponents = st.text_input("Known Opponent Hands (space separated)", "7s7c")
+        n_random = st.number_input("Random Opponents", 0, 8, 0)
+
+        if st.button("Calculate Equity"):
+            try:
+                res = poker.calculate_equity(hole, board, opponents.split(), n_random)
+                c1, c2, c3 = st.columns(3)
+                c1.metric("Win", f"{res['Win']:.2%}")
+                c2.metric("Tie", f"{res['Tie']:.2%}")
+                c3.metric("Lose", f"{res['Lose']:.2%}")
+                st.caption(f"Equity {res['Equity'][0]:.2%} · {res['Method']} over {res['Samples']:,} runouts")
+            except ValueError as e:
+                st.error(e)
 
     elif scenario == "Risk of Ruin":
         st.subheader("📉 Risk of Ruin")
         c1, c2 = st.columns(2)
         win_rate = c1.number_input("Win Rate (0-1)", 0.0, 1.0, 0.55)
-        bankroll = c2.number_input("Bankroll (Units)", 1, 1000, 50)
-        
-        ror = scenarios.calculate_risk_of_ruin(win_rate, 1, 1, bankroll)
-        st.metric("Risk of Ruin", f"{ror:.2%}")
-        
-        if win_rate <= 0.5:
-            st.error("With a win rate <= 50%, ruin is mathematically guaranteed eventually.")
+        bankroll = c2.number_input("Bankroll (Units)", 1, 100_000, 50)
+        win_amount = c1.number_input("Win Amount (Units)", 0.0, 1000.0, 1.0)
+        loss_amount = c2.number_input("Loss Amount (Units)", 0.01, 1000.0, 1.0)
+        horizon = st.number_input("Number of Bets (0 = unlimited)", 0, ruin.SIM_HORIZON, 0)
+
+        try:
+            res = ruin.risk_of_ruin([win_amount, -loss_amount], [win_rate, 1 - win_rate], bankroll, horizon or None)
+        except ValueError as e:
+            st.error(e)
+        else:
+            c1, c2 = st.columns(2)
+            c1.metric("Risk of Ruin", f"{res['Risk of Ruin']:.2%}")
+            if res["Lundberg Bound"] is not None:
+                c2.metric("Lundberg Bound", f"{res['Lundberg Bound']:.2%}")
+            st.caption(res["Method"] + (f" · ±{res['Std Error']:.2%}" if res["Std Error"] else ""))
+            if res["Note"]:
+                st.info(f"Exact solve skipped: {res['Note']}")
+            if not horizon and win_rate * win_amount <= (1 - win_rate) * loss_amount:
+                st.error("With a non-positive expected payoff per bet, ruin is mathematically guaranteed eventually.")
 
     elif scenario == "A/B Test Significance":
         st.subheader("🅰️/🅱️ A/B Test Calculator")
@@ -345,6 +594,102 @@ def render_scenarios_tab():
             else:
                 st.warning("Not Significant.")
 
+# label -> (function, {parameter: (low, high, default)}); integer parameters have integer bounds
+SWEEP_FUNCTIONS = {
+    "Binomial P(X > k)": ("distributions.binomial_sf", {"k": (0, 100, 50), "n": (1, 200, 100), "p": (0.0, 1.0, 0.5)}),
+    "Binomial P(X ≤ k)": ("distributions.binomial_cdf", {"k": (0, 100, 50), "n": (1, 200, 100), "p": (0.0, 1.0, 0.5)}),
+    "Poisson P(X > k)": ("distributions.poisson_sf", {"k": (0, 50, 10), "rate": (0.1, 30.0, 10.0)}),
+    "Normal P(lower ≤ X ≤ upper)": ("distributions.calculate_normal_distribution",
+                                    {"mean": (-5.0, 5.0, 0.0), "std_dev": (0.1, 5.0, 1.0),
+                                     "lower": (-5.0, 0.0, -1.0), "upper": (0.0, 5.0, 1.0)}),
+    "Exponential P(X ≤ x)": ("distributions.exponential_cdf", {"x": (0.0, 10.0, 1.0), "rate": (0.1, 5.0, 1.0)}),
+    "Birthday Paradox": ("scenarios.calculate_birthday_paradox", {"n_people": (1, 100, 23)}),
+    "Risk of Ruin": ("scenarios.calculate_risk_of_ruin", {"win_rate": (0.3, 0.7, 0.55), "win_amount": (1, 5, 1),
+                                                          "loss_amount": (1, 5, 1), "bankroll": (1, 50, 10)}),
+}
+# Grid points per swept parameter in the UI
+MAX_SWEEP_STEPS = 200
+
+def sweep_values(low, high, steps, integer):
+    if integer:
+        return np.unique(np.round(np.linspace(low, high, steps)).astype(int))
+    return np.linspace(low, high, steps)
+
+@instrumentation.timed("render.sweep_tab")
+def render_sweep_tab():
+    st.header("🗺️ Parameter Sweep")
+    st.markdown("Evaluate a calculator over a whole grid of parameter values.")
+
+    label = st.selectbox("Function", list(SWEEP_FUNCTIONS))
+    function, params = SWEEP_FUNCTIONS[label]
+    names = list(params)
+    col1, col2 = st.columns(2)
+    x_name = col1.selectbox("X Parameter", names)
+    y_name = col2.selectbox("Y Parameter", ["(none)"] + [n for n in names if n != x_name],
+                            index=1 if len(names) > 1 else 0)
+
+    axes, fixed = {}, {}
+    for name, (low, high, default) in params.items():
+        integer = isinstance(default, int)
+        if name in (x_name, y_name):
+            c1, c2, c3 = st.columns(3)
+            low = c1.number_input(f"{name} from", value=low, key=f"sweep_{label}_{name}_low")
+            high = c2.number_input(f"{name} to", value=high, key=f"sweep_{label}_{name}_high")
+            steps = c3.number_input(f"{name} steps", 2, MAX_SWEEP_STEPS, 50,
+                                    key=f"sweep_{label}_{name}_steps")
+            axes[name] = sweep_values(low, high, steps, integer)
+        else:
+            fixed[name] = st.number_input(name, value=default, key=f"sweep_{label}_{name}")
+
+    try:
+        result = sweep.sweep(function, axes, fixed)
+    except ValueError as e:
+        st.error(str(e))
+        return
+    st.caption(f"{result.values.size:,} points · {result.method} evaluation")
+
+    if len(axes) == 1:
+        fig = go.Figure(go.Scatter(x=axes[x_name], y=result.values, mode="lines"))
+        fig.update_layout(title=label, xaxis_title=x_name, yaxis_title="Value")
+    elif st.toggle("3D Surface"):
+        fig = go.Figure(go.Surface(x=axes[x_name], y=axes[y_name], z=result.values.T))
+        fig.update_layout(title=label, scene=dict(xaxis_title=x_name, yaxis_title=y_name, zaxis_title="Value"))
+    else:
+        fig = go.Figure(go.Heatmap(x=axes[x_name], y=axes[y_name], z=result.values.T, colorbar=dict(title="Value")))
+        fig.update_layout(title=label, xaxis_title=x_name, yaxis_title=y_name)
+    show_chart(fig)
+
+    frame = result.to_frame()
+    st.download_button("Download CSV", frame.to_csv(index=False), "sweep.csv", "text/csv")
+
+def render_cache_panel():
+    stats = cache.cache_stats()
+    hits = sum(c["hits"] for c in stats.values())
+    misses = sum(c["misses"] for c in stats.values())
+    with st.sidebar.expander("⚡ Cache"):
+        st.metric("Hit Rate", f"{hits / (hits + misses):.0%}" if hits + misses else "n/a")
+        st.caption(f"{hits:,} hits · {misses:,} misses")
+        if stats:
+            st.dataframe(pd.DataFrame(stats).T[["hits", "misses", "size", "bytes"]])
+        if st.button("Clear Cache"):
+            cache.clear_caches()
+
+def render_metrics_panel():
+    if not instrumentation.ENABLED:
+        return
+    with st.sidebar.expander("⏱️ Performance"):
+        metrics = instrumentation.snapshot()
+        if not metrics:
+            st.caption("No calls recorded yet.")
+            return
+        table = pd.DataFrame(metrics).T[["calls", "mean_ms", "p50_ms", "p95_ms", "max_ms", "total_s"]]
+        st.dataframe(table.sort_values("total_s", ascending=False).style.format(precision=2))
+        c1, c2 = st.columns(2)
+        c1.download_button("JSON", instrumentation.export_json(), "metrics.json", "application/json")
+        c2.download_button("Prometheus", instrumentation.export_prometheus(), "metrics.prom", "text/plain")
+        if st.button("Reset Metrics"):
+            instrumentation.reset()
+
 def main():
     st.set_page_config(page_title="Probability Suite", page_icon="🎲", layout="wide")
     load_css()
@@ -356,19 +701,30 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
-        "🧩 Probability Logic", 
-        "📊 Distributions", 
-        "🎲 Simulations", 
-        "📈 Statistics",
-        "🛠️ Situational Tools"
-    ])
+    pages = {
+        "🧩 Probability Logic": render_probability_tab,
+        "📊 Distributions": render_distributions_tab,
+        "🎲 Simulations": render_simulations_tab,
+        "📈 Statistics": render_statistics_tab,
+        "🛠️ Situational Tools": render_scenarios_tab,
+        "🗺️ Parameter Sweep": render_sweep_tab,
+    }
+    try:
+        # Only the selected tab runs, so its imports and computations are skipped elsewhere
+        tabs = st.tabs(list(pages), key="active_tab", on_change="rerun")
+        lazy = True
+    except TypeError:
+        # Streamlit without lazy tabs (e.g. older stlite builds): render every tab
+        tabs = st.tabs(list(pages))
+        lazy = False
     
-    with tab1: render_probability_tab()
-    with tab2: render_distributions_tab()
-    with tab3: render_simulations_tab()
-    with tab4: render_statistics_tab()
-    with tab5: render_scenarios_tab()
+    for tab, render in zip(tabs, pages.values()):
+        if not lazy or tab.open:
+            with tab:
+                render()
+
+    render_cache_panel()
+    render_metrics_panel()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
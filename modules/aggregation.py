@@ -0,0 +1,88 @@
+"""
+Server-side reduction of plot data, so chart payloads stay small and do not
+grow with the number of samples or trials.
+"""
+import numpy as np
+
+# Most bars a histogram is drawn with
+MAX_BINS = 200
+# Most points a curve is drawn with, and the interpolation error (relative to
+# the curve's range) allowed when thinning it below that
+MAX_CURVE_POINTS = 200
+CURVE_TOLERANCE = 1e-3
+
+def rebin_counts(values, counts, max_bins=MAX_BINS):
+    """
+    Bin edges and counts for counts of consecutive integer `values`, merging
+    neighbouring values so that at most `max_bins` bins remain.
+    """
+    values = np.asarray(values)
+    counts = np.asarray(counts)
+    if len(values) == 0:
+        return np.array([0.0, 1.0]), np.zeros(1, dtype=counts.dtype)
+    if max_bins < 1:
+        raise ValueError("max_bins must be at least 1")
+    width = -(-len(values) // int(max_bins))
+    starts = np.arange(0, len(values), width)
+    edges = np.append(values[starts], values[-1] + 1) - 0.5
+    return edges.astype(float), np.add.reduceat(counts, starts)
+
+def histogram_bins(histogram, max_bins=MAX_BINS, trim=True):
+    """
+    Edges and counts for a simulations.SumHistogram; empty tails are dropped
+    when `trim` is set.
+    """
+    values, counts = histogram.values, histogram.counts
+    if trim:
+        occupied = np.flatnonzero(counts)
+        if len(occupied):
+            values = values[occupied[0]:occupied[-1] + 1]
+            counts = counts[occupied[0]:occupied[-1] + 1]
+    return rebin_counts(values, counts, max_bins)
+
+def bin_samples(samples, max_bins=MAX_BINS):
+    """
+    Bin raw samples in NumPy. Integer-valued data with a narrow range gets one
+    bin per value; anything else gets up to `max_bins` equal-width bins.
+    Returns (edges, counts).
+    """
+    samples = np.asarray(samples, dtype=float).ravel()
+    samples = samples[np.isfinite(samples)]
+    if len(samples) == 0:
+        return np.array([0.0, 1.0]), np.zeros(1, dtype=np.int64)
+    low, high = samples.min(), samples.max()
+    if np.all(samples == np.round(samples)) and high - low < 10 * max_bins:
+        counts = np.bincount((samples - low).astype(np.int64))
+        return rebin_counts(np.arange(low, high + 1), counts, max_bins)
+    counts, edges = np.histogram(samples, bins=max_bins, range=(low, high if high > low else low + 1))
+    return edges, counts
+
+def bar_geometry(edges):
+    """
+    Bar centres and widths for drawing binned counts as a bar chart.
+    """
+    edges = np.asarray(edges, dtype=float)
+    return (edges[:-1] + edges[1:]) / 2, np.diff(edges)
+
+def downsample_curve(x, y, max_points=MAX_CURVE_POINTS, tolerance=CURVE_TOLERANCE):
+    """
+    Thin a curve sampled at increasing x to every 2nd, 4th, ... point (always
+    keeping the end points) for as long as linear interpolation through the
+    kept points stays within `tolerance` of the curve's range, and at least
+    until at most `max_points` remain.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    scale = np.ptp(y) if n else 0.0
+    scale = scale if scale > 0 else 1.0
+    keep = np.arange(n)
+    step = 2
+    while (n - 1) // step >= 2:
+        candidate = np.unique(np.append(np.arange(0, n, step), n - 1))
+        error = np.max(np.abs(np.interp(x, x[candidate], y[candidate]) - y))
+        if error > tolerance * scale and len(keep) <= max_points:
+            break
+        keep = candidate
+        step *= 2
+    return x[keep], y[keep]
@@ -0,0 +1,290 @@
+"""
+Headless batch engine: evaluate JSONL request streams without Streamlit.
+
+Each input line is a JSON object such as
+
+    {"id": 1, "function": "distributions.calculate_binomial_probability",
+     "params": {"n": 10, "k": 5, "p": 0.5}}
+
+("args": [...] may be used instead of / alongside "params"). Each output line
+carries the same "id" plus either "result" or "error", in input order.
+Requests for functions with a vectorized counterpart are grouped and
+evaluated with one NumPy call per group, and batches are spread over a
+process pool.
+
+    python -m modules.batch requests.jsonl -o results.jsonl --workers 8
+"""
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from operator import itemgetter
+
+import numpy as np
+
+from modules import collision, distributions, probability, scenarios, simulations, statistics
+
+MODULES = {
+    "collision": collision,
+    "distributions": distributions,
+    "probability": probability,
+    "scenarios": scenarios,
+    "simulations": simulations,
+    "statistics": statistics,
+}
+
+# Requests per batch; each batch is vectorized and, with workers, sent to one process
+DEFAULT_BATCH_SIZE = 50_000
+
+try:
+    import orjson
+
+    def _loads(line):
+        return orjson.loads(line)
+
+    def _dumps(record):
+        return orjson.dumps(record, default=to_jsonable, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+except ImportError:
+    def _loads(line):
+        return json.loads(line)
+
+    def _dumps(record):
+        return json.dumps(record, default=to_jsonable)
+
+def to_jsonable(value):
+    """
+    JSON fallback for NumPy values and result objects.
+    """
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    if isinstance(value, simulations.SumHistogram):
+        return {"values": value.values.tolist(), "counts": value.counts.tolist()}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def resolve(name):
+    """
+    Look up "module.function" among the public functions of the calculator modules.
+    """
+    module_name, _, function_name = str(name).partition(".")
+    module = MODULES.get(module_name)
+    function = getattr(module, function_name, None) if module else None
+    if function is None or function_name.startswith("_") or not callable(function):
+        raise ValueError(f"Unknown function '{name}'")
+    return function
+
+# ---------------------------------------------------------------------------
+# Vectorized groups
+#
+# function name -> (parameter names, validity mask, array implementation).
+# Rows failing the mask go through the scalar function so they get the same
+# error message as a single call would.
+# ---------------------------------------------------------------------------
+
+def _in_unit(p):
+    return (p >= 0) & (p <= 1)
+
+def _whole(x):
+    return np.floor(x) == x
+
+VECTORIZED = {
+    "distributions.calculate_binomial_probability": (
+        ("n", "k", "p"),
+        lambda n, k, p: _in_unit(p) & (k >= 0) & (k <= n) & _whole(n),
+        lambda n, k, p: distributions.binomial_pmf(k, n, p),
+    ),
+    "distributions.calculate_poisson_distribution": (
+        ("rate", "k"),
+        lambda rate, k: (rate >= 0) & (k >= 0),
+        lambda rate, k: distributions.poisson_pmf(k, rate),
+    ),
+    "distributions.calculate_normal_distribution": (
+        ("mean", "std_dev", "lower", "upper"),
+        lambda mean, std_dev, lower, upper: std_dev > 0,
+        lambda mean, std_dev, lower, upper: (distributions.normal_cdf(upper, mean, std_dev)
+                                             - distributions.normal_cdf(lower, mean, std_dev)),
+    ),
+    "distributions.calculate_geometric_distribution": (
+        ("p", "k"),
+        lambda p, k: (p > 0) & (p <= 1) & (k >= 1),
+        lambda p, k: distributions.geometric_pmf(k, p),
+    ),
+    "distributions.calculate_exponential_distribution": (
+        ("rate", "lower", "upper"),
+        lambda rate, lower, upper: rate > 0,
+        lambda rate, lower, upper: (distributions.exponential_cdf(upper, rate)
+                                    - distributions.exponential_cdf(lower, rate)),
+    ),
+    "scenarios.calculate_birthday_paradox": (
+        ("n_people",),
+        lambda n_people: np.isfinite(n_people),
+        lambda n_people: _birthday_vector(n_people),
+    ),
+}
+
+def _birthday_vector(n_people):
+    return collision.collision_probability(np.maximum(n_people, 0), 365)
+
+def _params(record, function):
+    params = dict(record.get("params") or {})
+    args = record.get("args") or []
+    if args:
+        names = list(function.__code__.co_varnames[:function.__code__.co_argcount])
+        params.update(zip(names, args))
+    return params
+
+def _row(record, names, getter, function):
+    params = record.get("params")
+    if record.get("args") or not isinstance(params, dict) or len(params) != len(names):
+        params = _params(record, function)
+        if set(params) != set(names):
+            raise KeyError
+    row = getter(params)
+    return row if len(names) > 1 else (row,)
+
+def _run_vectorized(name, records, indices, results):
+    names, valid, vector = VECTORIZED[name]
+    function = resolve(name)
+    getter = itemgetter(*names)
+    rows, values = [], []
+    for i in indices:
+        try:
+            values.append(_row(records[i], names, getter, function))
+            rows.append(i)
+        except (KeyError, TypeError):
+            results[i] = _call_one(records[i])
+    if not rows:
+        return
+
+    try:
+        table = np.array(values, dtype=float).reshape(len(rows), len(names))
+    except (TypeError, ValueError):
+        # Some non-numeric parameter: let the scalar function report it
+        for i in rows:
+            results[i] = _call_one(records[i])
+        return
+
+    arrays = table.T
+    mask = valid(*arrays)
+    ok = np.flatnonzero(mask)
+    if len(ok):
+        try:
+            computed = np.asarray(vector(*(a[ok] for a in arrays)), dtype=float).tolist()
+        except (ArithmeticError, ValueError):
+            # A row the mask let through still fails: one bad row must not sink the group
+            mask[:] = False
+        else:
+            for j, value in zip(ok.tolist(), computed):
+                results[rows[j]] = {"id": records[rows[j]].get("id"), "result": value}
+    for j in np.flatnonzero(~mask).tolist():
+        results[rows[j]] = _call_one(records[rows[j]])
+
+# ---------------------------------------------------------------------------
+# Generic calls
+# ---------------------------------------------------------------------------
+
+def _call_one(record):
+    try:
+        function = resolve(record.get("function"))
+        result = function(*(record.get("args") or []), **(record.get("params") or {}))
+        return {"id": record.get("id"), "result": result}
+    except Exception as e:
+        return {"id": record.get("id"), "error": f"{type(e).__name__}: {e}"}
+
+def evaluate(records):
+    """
+    Evaluate a list of request records; returns result records in the same order.
+    """
+    results = [None] * len(records)
+    groups = {}
+    for i, record in enumerate(records):
+        groups.setdefault(record.get("function"), []).append(i)
+
+    for name, indices in groups.items():
+        if name in VECTORIZED:
+            _run_vectorized(name, records, indices, results)
+        else:
+            for i in indices:
+                results[i] = _call_one(records[i])
+    return results
+
+def _parse(line, number):
+    try:
+        record = _loads(line)
+        if not isinstance(record, dict):
+            raise ValueError("request must be a JSON object")
+        return record
+    except ValueError as e:
+        return {"id": None, "function": None, "_error": f"line {number}: {e}"}
+
+def process_batch(batch):
+    """
+    Parse, evaluate and serialize one batch of (line number, line) pairs.
+    Returns the JSONL text of the results.
+    """
+    records = [_parse(line, n) for n, line in batch]
+    evaluated = iter(evaluate([r for r in records if "_error" not in r]))
+    lines = []
+    for record in records:
+        result = {"id": None, "error": record["_error"]} if "_error" in record else next(evaluated)
+        lines.append(_dumps(result))
+    return "\n".join(lines) + "\n"
+
+def _batches(lines, batch_size):
+    numbered = ((n, line) for n, line in enumerate(lines, 1) if line.strip())
+    while True:
+        batch = list(islice(numbered, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def run(lines, out, workers=1, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Stream JSONL requests from `lines` to JSONL results on `out`.
+    With workers > 1, whole batches are processed in worker processes; at most
+    2 * workers batches are in flight, so memory stays bounded and output
+    keeps the input order. Returns the number of records processed.
+    """
+    count = 0
+    if workers <= 1:
+        for batch in _batches(lines, batch_size):
+            out.write(process_batch(batch))
+            count += len(batch)
+        return count
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for batch in _batches(lines, batch_size):
+            in_flight.append((len(batch), pool.submit(process_batch, batch)))
+            if len(in_flight) >= 2 * workers:
+                size, future = in_flight.popleft()
+                out.write(future.result())
+                count += size
+        while in_flight:
+            size, future = in_flight.popleft()
+            out.write(future.result())
+            count += size
+    return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", nargs="?", default="-", help="JSONL request file ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL result file ('-' for stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else open(args.input)
+    sink = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        run(source, sink, workers=args.workers, batch_size=args.batch_size)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""
+Discrete Bayesian networks: exact inference by variable elimination and
+approximate inference by likelihood weighting.
+
+Each variable has a list of states and a conditional probability table (CPT)
+with one axis per parent followed by an axis for its own states. Factors are
+NumPy arrays with one axis per variable; each elimination step multiplies the
+factors that mention a variable and sums it out in a single einsum call.
+
+    net = BayesianNetwork()
+    net.add_variable("Rain", ["no", "yes"], [0.8, 0.2])
+    net.add_variable("Traffic", ["no", "yes"], [[0.9, 0.1], [0.3, 0.7]], parents=["Rain"])
+    net.query("Rain", {"Traffic": "yes"})        # {'no': 0.3636..., 'yes': 0.6363...}
+"""
+import string
+
+import numpy as np
+
+# einsum subscripts available to a single elimination step
+LETTERS = string.ascii_letters
+# Name of the evidence-set axis in batched queries
+BATCH = "__batch__"
+# Likelihood weighting draws samples in blocks of this many rows
+SAMPLE_BLOCK = 1 << 16
+
+class Factor:
+    """
+    Non-negative table over named discrete variables, one array axis per variable.
+    """
+    def __init__(self, variables, values):
+        self.variables = tuple(variables)
+        self.values = np.asarray(values, dtype=float)
+        if self.values.ndim != len(self.variables):
+            raise ValueError("A factor needs exactly one axis per variable")
+
+    def reduce(self, evidence):
+        """
+        Factor restricted to the observed states (dict variable -> state index).
+        """
+        index = tuple(evidence.get(v, slice(None)) for v in self.variables)
+        return Factor([v for v in self.variables if v not in evidence], self.values[index])
+
+def multiply(factors, keep):
+    """
+    Product of the factors, summed over every variable not in `keep`, as one einsum call.
+    """
+    letters = {}
+    for factor in factors:
+        for v in factor.variables:
+            letters.setdefault(v, None)
+    if len(letters) > len(LETTERS):
+        raise ValueError(f"An elimination step involves {len(letters)} variables; at most {len(LETTERS)} are supported")
+    letters = dict(zip(letters, LETTERS))
+    keep = [v for v in keep if v in letters]
+    inputs = ",".join("".join(letters[v] for v in f.variables) for f in factors)
+    output = "".join(letters[v] for v in keep)
+    values = np.einsum(f"{inputs}->{output}", *(f.values for f in factors), optimize=len(factors) > 2)
+    return Factor(keep, values)
+
+def min_fill_order(scopes, eliminate):
+    """
+    Greedy elimination order: repeatedly pick the variable whose elimination adds
+    the fewest new edges to the interaction graph (ties broken by fewest neighbours).
+    """
+    neighbours = {}
+    for scope in scopes:
+        for v in scope:
+            neighbours.setdefault(v, set()).update(u for u in scope if u != v)
+    remaining = set(eliminate)
+    order = []
+    while remaining:
+        def cost(v):
+            near = list(neighbours[v])
+            fill = sum(1 for i, a in enumerate(near) for b in near[i + 1:] if b not in neighbours[a])
+            return fill, len(near), v
+        v = min(remaining, key=cost)
+        near = neighbours.pop(v)
+        for a in near:
+            neighbours[a].discard(v)
+            neighbours[a].update(near - {a})
+        remaining.discard(v)
+        order.append(v)
+    return order
+
+def eliminate(factors, order, keep):
+    """
+    Sum the variables in `order` out of the product of the factors, one at a time.
+    Returns the remaining product over `keep`.
+    """
+    factors = list(factors)
+    for v in order:
+        involved = [f for f in factors if v in f.variables]
+        if not involved:
+            continue
+        factors = [f for f in factors if v not in f.variables]
+        scope = dict.fromkeys(u for f in involved for u in f.variables if u != v)
+        factors.append(multiply(involved, scope))
+    return multiply(factors, keep)
+
+class BayesianNetwork:
+    """
+    Directed acyclic graph of discrete variables with conditional probability tables.
+    Variables must be added after their parents, so insertion order is topological.
+    """
+    def __init__(self):
+        self.states = {}
+        self.parents = {}
+        self.cpts = {}
+        self._factors = None
+        self._orders = {}
+
+    @property
+    def variables(self):
+        return list(self.states)
+
+    def add_variable(self, name, states, table, parents=()):
+        """
+        Add a variable with the given states and CPT. table[i1, ..., ik, s] is
+        P(name = states[s] | parent_1 = state i1, ..., parent_k = state ik).
+        """
+        if name in self.states or name == BATCH:
+            raise ValueError(f"Variable '{name}' already exists")
+        states = list(states)
+        if len(states) < 1 or len(set(states)) != len(states):
+            raise ValueError(f"Variable '{name}' needs at least one state and no duplicate states")
+        parents = tuple(parents)
+        for parent in parents:
+            if parent not in self.states:
+                raise ValueError(f"Parent '{parent}' of '{name}' must be added before it")
+        table = np.asarray(table, dtype=float)
+        shape = tuple(len(self.states[p]) for p in parents) + (len(states),)
+        if table.shape != shape:
+            raise ValueError(f"CPT of '{name}' must have shape {shape}, got {table.shape}")
+        if np.any(table < 0) or not np.allclose(table.sum(axis=-1), 1.0, atol=1e-9):
+            raise ValueError(f"Each row of the CPT of '{name}' must be non-negative and sum to 1")
+
+        self.states[name] = states
+        self.parents[name] = parents
+        self.cpts[name] = table
+        self._factors = None
+        self._orders.clear()
+
+    def factors(self):
+        """
+        The CPTs as factors, built once and reused by every query.
+        """
+        if self._factors is None:
+            self._factors = {name: Factor(self.parents[name] + (name,), self.cpts[name]) for name in self.states}
+        return self._factors
+
+    def _check(self, name):
+        if name not in self.states:
+            raise ValueError(f"Unknown variable '{name}'")
+
+    def _index(self, name, state):
+        self._check(name)
+        try:
+            return self.states[name].index(state)
+        except ValueError:
+            raise ValueError(f"'{state}' is not a state of '{name}'. Choose from {self.states[name]}")
+
+    def _ancestors(self, names):
+        # Variables outside the ancestral set sum to one and can be dropped
+        result, stack = set(), list(names)
+        while stack:
+            name = stack.pop()
+            if name not in result:
+                result.add(name)
+                stack.extend(self.parents[name])
+        return result
+
+    def elimination_order(self, targets, observed, batched=False):
+        """
+        Variables to sum out for a query over `targets` given evidence on `observed`,
+        in min-fill order. Orders are cached per (targets, observed) pattern.
+        """
+        key = (tuple(targets), frozenset(observed), batched)
+        if key not in self._orders:
+            relevant = self._ancestors(set(targets) | set(observed))
+            scopes = [self.parents[v] + (v,) for v in relevant]
+            if batched:
+                # Evidence indicators tie the batch axis to every observed variable
+                scopes += [(BATCH, v) for v in observed]
+                hidden = relevant - set(targets)
+            else:
+                hidden = relevant - set(targets) - set(observed)
+            self._orders[key] = (relevant, min_fill_order(scopes, hidden))
+        return self._orders[key]
+
+    def _joint(self, targets, evidence):
+        # Unnormalized P(targets, evidence) over the target states
+        for name in targets:
+            self._check(name)
+        observed = {name: self._index(name, state) for name, state in evidence.items()}
+        relevant, order = self.elimination_order(targets, observed)
+        factors = self.factors()
+        reduced = [factors[v].reduce(observed) for v in relevant]
+        return eliminate(reduced, order, targets)
+
+    def query(self, variable, evidence=None):
+        """
+        Exact posterior P(variable | evidence) by variable elimination.
+        Returns: dict state -> probability
+        """
+        evidence = evidence or {}
+        if variable in evidence:
+            self._index(variable, evidence[variable])
+            return {s: float(s == evidence[variable]) for s in self.states[variable]}
+        values = self._joint([variable], evidence).values
+        total = values.sum()
+        if total <= 0:
+            raise ValueError("The evidence has probability zero")
+        return dict(zip(self.states[variable], (values / total).tolist()))
+
+    def probability(self, assignment, evidence=None):
+        """
+        Exact P(assignment | evidence) for a joint assignment (dict variable -> state)
+        of dependent events, e.g. P(A ∩ B | C).
+        """
+        evidence = evidence or {}
+        for name, state in assignment.items():
+            if name in evidence and evidence[name] != state:
+                self._index(name, state)
+                return 0.0
+        denominator = self._joint([], evidence).values if evidence else 1.0
+        if denominator <= 0:
+            raise ValueError("The evidence has probability zero")
+        numerator = self._joint([], {**evidence, **assignment}).values
+        return float(numerator / denominator)
+
+    def query_batch(self, variable, evidence_sets):
+        """
+        Posteriors P(variable | evidence) for many evidence sets. Sets observing the
+        same variables share one elimination pass: each observation becomes a
+        one-hot indicator factor along a batch axis, so the compiled CPT factors
+        and the elimination order are reused for the whole group.
+        Returns: array of shape (len(evidence_sets), number of states), in self.states[variable] order
+        """
+        self._check(variable)
+        result = np.empty((len(evidence_sets), len(self.states[variable])))
+        groups = {}
+        for i, evidence in enumerate(evidence_sets):
+            groups.setdefault(tuple(sorted(evidence)), []).append(i)
+
+        factors = self.factors()
+        for observed, rows in groups.items():
+            if variable in observed:
+                states = [self._index(variable, evidence_sets[i][variable]) for i in rows]
+                result[rows] = np.eye(len(self.states[variable]))[states]
+                continue
+            relevant, order = self.elimination_order([variable], observed, batched=True)
+            indicators = []
+            for name in observed:
+                index = [self._index(name, evidence_sets[i][name]) for i in rows]
+                indicators.append(Factor((BATCH, name), np.eye(len(self.states[name]))[index]))
+            values = eliminate([factors[v] for v in relevant] + indicators, order, (BATCH, variable)).values
+            if not observed:
+                values = np.broadcast_to(values, (len(rows), len(self.states[variable])))
+            totals = values.sum(axis=-1, keepdims=True)
+            if np.any(totals <= 0):
+                raise ValueError(f"Evidence set {rows[int(np.argmin(totals))]} has probability zero")
+            result[rows] = values / totals
+        return result
+
+    def likelihood_weighting(self, variable, evidence=None, num_samples=100_000, seed=None):
+        """
+        Approximate P(variable | evidence) by likelihood weighting: sample the
+        unobserved ancestors forward and weight each sample by the likelihood of
+        the evidence. Cost grows linearly with the network, unlike exact elimination.
+        Returns: dict state -> probability
+        """
+        evidence = evidence or {}
+        observed = {name: self._index(name, state) for name, state in evidence.items()}
+        self._check(variable)
+        if num_samples < 1:
+            raise ValueError("Number of samples must be at least 1")
+        relevant = self._ancestors({variable} | set(observed))
+        rng = np.random.default_rng(seed)
+        totals = np.zeros(len(self.states[variable]))
+
+        for start in range(0, num_samples, SAMPLE_BLOCK):
+            size = min(SAMPLE_BLOCK, num_samples - start)
+            samples = {}
+            weights = np.ones(size)
+            for name in self.states:
+                if name not in relevant:
+                    continue
+                rows = self.cpts[name][tuple(samples[p] for p in self.parents[name])]
+                if name in observed:
+                    weights *= rows[..., observed[name]]
+                    samples[name] = np.full(size, observed[name])
+                else:
+                    cumulative = np.cumsum(np.broadcast_to(rows, (size, rows.shape[-1])), axis=-1)
+                    # Round-off can leave the last cumulative value just below 1
+                    drawn = (rng.random((size, 1)) >= cumulative).sum(axis=1)
+                    samples[name] = np.minimum(drawn, rows.shape[-1] - 1)
+            totals += np.bincount(samples[variable], weights=weights, minlength=len(totals))
+
+        if totals.sum() <= 0:
+            raise ValueError("Every sample has zero weight; the evidence is impossible or too unlikely to sample")
+        return dict(zip(self.states[variable], (totals / totals.sum()).tolist()))
@@ -0,0 +1,210 @@
+import functools
+import hashlib
+import inspect
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_MAXSIZE = 256
+# Memory budget per cache; entries are evicted by count or by size, whichever binds first
+DEFAULT_MAX_BYTES = 64 * 2**20
+
+# name -> LRUCache, for reporting
+_CACHES = {}
+# module name -> CachedModule, so Streamlit reruns keep the same caches
+_MODULES = {}
+
+class Uncacheable(TypeError):
+    pass
+
+def normalize(value):
+    """
+    Turn call arguments into a hashable key. Equal parameters give equal keys
+    regardless of container or numeric type (True == 1 == 1.0 == np.float64(1)).
+    """
+    if value is None or isinstance(value, (str, bytes)):
+        return value
+    if isinstance(value, (int, np.integer, np.bool_)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        value = float(value)
+        return int(value) if value.is_integer() else value
+    if isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            return ("ndarray", tuple(normalize(v) for v in value.ravel()), value.shape)
+        digest = hashlib.blake2b(np.ascontiguousarray(value).view(np.uint8), digest_size=16).digest()
+        return ("ndarray", value.dtype.str, value.shape, digest)
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize(v) for v in value)
+    if isinstance(value, dict):
+        return ("dict",) + tuple(sorted((str(k), normalize(v)) for k, v in value.items()))
+    if hasattr(value, "to_numpy"):
+        # pandas Series/DataFrame
+        return ("frame", tuple(map(str, getattr(value, "columns", ()))), normalize(value.to_numpy()))
+    raise Uncacheable(f"Cannot build a cache key from {type(value).__name__}")
+
+def _freeze(result):
+    # Cached arrays are shared between callers, so hand them out read-only
+    if isinstance(result, np.ndarray):
+        result.flags.writeable = False
+    elif isinstance(result, dict):
+        for value in result.values():
+            _freeze(value)
+    elif isinstance(result, (list, tuple)):
+        for value in result:
+            _freeze(value)
+    return result
+
+def _thaw(result):
+    # Each hit gets its own dicts and lists, however deeply nested, so callers may
+    # mutate them; the read-only arrays inside (and any other objects) are shared
+    if isinstance(result, dict):
+        return {key: _thaw(value) for key, value in result.items()}
+    if isinstance(result, list):
+        return [_thaw(value) for value in result]
+    if type(result) is tuple:
+        return tuple(_thaw(value) for value in result)
+    return result
+
+def _nbytes(value):
+    # Approximate memory held by a cached result
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_nbytes(v) for v in value)
+    if hasattr(value, "memory_usage"):
+        # pandas Series/DataFrame
+        return int(np.sum(value.memory_usage(deep=True)))
+    if hasattr(value, "__dict__"):
+        return sys.getsizeof(value) + _nbytes(vars(value))
+    return sys.getsizeof(value)
+
+class LRUCache:
+    """
+    Thread-safe mapping bounded by entry count and by total bytes, with
+    least-recently-used eviction. Values larger than max_bytes are not kept.
+    """
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, max_bytes=DEFAULT_MAX_BYTES):
+        self.maxsize = int(maxsize)
+        self.max_bytes = int(max_bytes)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        size = _nbytes(value)
+        with self._lock:
+            if key in self._data:
+                self.nbytes -= self._sizes.pop(key)
+                del self._data[key]
+            if size > self.max_bytes:
+                return
+            self._data[key] = value
+            self._sizes[key] = size
+            self.nbytes += size
+            while len(self._data) > self.maxsize or self.nbytes > self.max_bytes:
+                old, _ = self._data.popitem(last=False)
+                self.nbytes -= self._sizes.pop(old)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.nbytes = 0
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def info(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self), "maxsize": self.maxsize,
+                "bytes": self.nbytes, "max_bytes": self.max_bytes}
+
+_MISSING = object()
+
+def memoize(func=None, maxsize=DEFAULT_MAXSIZE, name=None, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Decorator caching results by normalized arguments. Calls whose arguments
+    cannot be normalized run uncached, as do calls with seed=None: their
+    results are random draws, not a function of the arguments.
+    """
+    if func is None:
+        return functools.partial(memoize, maxsize=maxsize, name=name, max_bytes=max_bytes)
+
+    name = name or f"{func.__module__}.{func.__qualname__}"
+    cache = _CACHES.setdefault(name, LRUCache(maxsize, max_bytes))
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            if "seed" in bound.arguments and bound.arguments["seed"] is None:
+                return func(*args, **kwargs)
+            key = normalize(tuple(bound.arguments.items()))
+        except (Uncacheable, TypeError):
+            return func(*args, **kwargs)
+
+        result = cache.get(key, _MISSING)
+        if result is _MISSING:
+            result = _freeze(func(*args, **kwargs))
+            cache.put(key, result)
+        return _thaw(result)
+
+    wrapper.cache = cache
+    return wrapper
+
+class CachedModule:
+    """
+    Attribute proxy over a module whose plain functions are memoized.
+    Classes, constants and names in `exclude` pass through untouched.
+    """
+    def __init__(self, module, exclude=(), maxsize=DEFAULT_MAXSIZE, max_bytes=DEFAULT_MAX_BYTES):
+        self._module = module
+        self._exclude = set(exclude)
+        self._maxsize = maxsize
+        self._max_bytes = max_bytes
+        self._wrapped = {}
+
+    def __getattr__(self, attr):
+        value = getattr(self._module, attr)
+        if attr in self._exclude or attr.startswith("_") or not inspect.isfunction(value):
+            return value
+        if attr not in self._wrapped:
+            self._wrapped[attr] = memoize(value, maxsize=self._maxsize, max_bytes=self._max_bytes)
+        return self._wrapped[attr]
+
+def cached_module(module, exclude=(), maxsize=DEFAULT_MAXSIZE, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Return the (shared) memoizing proxy for `module`.
+    """
+    if module.__name__ not in _MODULES:
+        _MODULES[module.__name__] = CachedModule(module, exclude, maxsize, max_bytes)
+    return _MODULES[module.__name__]
+
+def cache_stats():
+    """
+    Hit/miss counts and sizes of every cache, keyed by function name.
+    """
+    return {name: cache.info() for name, cache in _CACHES.items()}
+
+def clear_caches():
+    for cache in _CACHES.values():
+        cache.clear()
@@ -0,0 +1,312 @@
+"""
+Birthday / collision probabilities: n items (people, hashes, random IDs) fall
+independently into d buckets, and a collision is some bucket receiving at
+least k of them.
+
+For equally likely buckets and pairs (k = 2), P(all distinct) is a ratio of
+factorials evaluated in closed form from Stirling's series, arranged so that
+nothing cancels when n is tiny next to d; this keeps full precision for
+spaces up to 2^128 and beyond. k-way collisions come from a rescaled
+power-series recurrence while n <= d (where all its terms are positive), and
+from an exponentially tilted Poisson model evaluated by FFT past d, with a
+Poisson approximation past MAX_EXACT_ITEMS. Buckets with unequal
+probabilities use a dynamic program over elementary symmetric polynomials.
+
+    collision_probability(23, 365)          # 0.5072...
+    collision_probability(2**32, 2**128)    # 2.7e-20
+    max_group_size(1e-9, 2**64)             # 192077: largest n with P(collision) <= 1e-9
+"""
+import math
+
+import numpy as np
+
+from modules import distributions
+from modules.fastmath import special
+
+# -log1p(-x) - x is summed as a series below SERIES_MAX
+SERIES_MAX = 0.1
+SERIES_TERMS = 20
+# Stirling's series is used once d - n reaches this; below it, log-gamma directly
+STIRLING_MIN = 30.0
+# Longest curve computed exactly for k-way collisions; larger groups use the Poisson approximation
+# (unless d is at most this too, where the tilted model stays cheap)
+MAX_EXACT_ITEMS = 100_000
+# Past n = d, a tilted model answers the group sizes where its FFT density is at least this
+# fraction of its peak (closer to the peak, the FFT round-off is relatively smaller)
+WINDOW_FLOOR = 1e-2
+
+def _result(value):
+    return value[()] if isinstance(value, np.ndarray) and value.ndim == 0 else value
+
+def _space(d, k):
+    d = float(d)
+    if not d >= 1 or math.isinf(d):
+        raise ValueError("Number of buckets 'd' must be finite and at least 1")
+    if k != int(k) or k < 2:
+        raise ValueError("Collision size 'k' must be an integer of at least 2")
+    if k > 2 and d != math.floor(d):
+        raise ValueError("k-way collisions need a whole number of buckets 'd'")
+    return d, int(k)
+
+def _items(n):
+    n = np.floor(np.asarray(n, dtype=float))
+    if np.any(~(n >= 0)):
+        raise ValueError("Number of items 'n' must be non-negative")
+    return n
+
+def _buckets(probs):
+    p = np.asarray(probs, dtype=float).ravel()
+    if len(p) == 0 or np.any(~(p >= 0)) or p.sum() <= 0:
+        raise ValueError("Bucket probabilities must be non-negative with a positive total")
+    p = p[p > 0]
+    return p / p.sum()
+
+def _log1p_tail(x):
+    # -log1p(-x) - x = x²/2 + x³/3 + ..., as a series when x is small (Horner's rule)
+    if np.ndim(x) == 0:
+        if x >= SERIES_MAX:
+            return -math.log1p(-min(x, 1.0)) - x if x < 1 else math.inf
+        series = 0.0
+        for j in range(SERIES_TERMS, 1, -1):
+            series = (series + 1 / j) * x
+        return series * x
+    small = x < SERIES_MAX
+    xs = np.where(small, x, 0.0)
+    series = np.zeros_like(xs)
+    for j in range(SERIES_TERMS, 1, -1):
+        series = (series + 1 / j) * xs
+    with np.errstate(divide="ignore"):
+        direct = -np.log1p(-np.where(small, 0.0, np.minimum(x, 1.0))) - x
+    return np.where(small, series * xs, direct)
+
+def _stirling(n, d, b):
+    # log(d! / (b! d^n)) with b = d - n >= STIRLING_MIN, from Stirling's series for log-gamma,
+    # regrouped so the O(n) terms cancel algebraically:
+    # (b + 1/2)(-log1p(-x) - x) - n x + x/2 + c(d) - c(b), with c the series remainder
+    x = n / d
+    remainder = (-n / (12 * d * b)
+                 + (1 / b**3 - 1 / d**3) / 360
+                 - (1 / b**5 - 1 / d**5) / 1260)
+    return (b + 0.5) * _log1p_tail(x) - n * x + 0.5 * x + remainder
+
+def log_no_collision(n, d=365):
+    """
+    log P(n items in d equally likely buckets all land in different buckets)
+    = log(d! / ((d - n)! d^n)); -inf once n > d. Vectorized over n and d.
+    """
+    if np.ndim(n) == 0 and np.ndim(d) == 0:
+        # Plain floats: a single group size costs microseconds, like the old loop
+        n, d = float(n), float(d)
+        if not n >= 0 or not d >= 1:
+            raise ValueError("Need n >= 0 items and d >= 1 buckets")
+        n = math.floor(n) if n <= d else n
+        if n <= 1:
+            return 0.0
+        if n > d:
+            return -math.inf
+        b = d - n
+        if b >= STIRLING_MIN:
+            return _stirling(n, d, b)
+        return math.lgamma(d + 1) - math.lgamma(b + 1) - n * math.log(d)
+
+    n, d = np.broadcast_arrays(_items(n), np.asarray(d, dtype=float))
+    if np.any(~(d >= 1)):
+        raise ValueError("Number of buckets 'd' must be at least 1")
+    b = np.maximum(d - n, 0.0)
+    stirling = _stirling(n, d, np.maximum(b, STIRLING_MIN))
+    with np.errstate(divide="ignore"):
+        direct = special.gammaln(d + 1) - special.gammaln(b + 1) - n * np.log(d)
+    logp = np.where(b >= STIRLING_MIN, stirling, direct)
+    return np.where(n <= 1, 0.0, np.where(n > d, -np.inf, logp))
+
+def _k_way_curve(n_max, d, k):
+    # q[m] = P(some bucket holds k of m items) = 1 - m! [z^m] e(z)^d / d^m, where e is the
+    # exponential series cut after z^(k-1), for m <= n_max <= d. J.C.P. Miller's recurrence
+    # for powers of a series, rescaled by m!/d^m so every term is of order one, gives
+    # h[m] = sum over j < k of c(m, j) h[m-j]; the c(m, j) over all j sum to 1 (the uncut
+    # series, where h = 1), so q follows from the j >= k tail without cancelling. With
+    # m <= d every c(m, j) = ((d + 1) j - m) (m-1)! / ((m-j)! j! d^j) is non-negative, so
+    # nothing cancels anywhere; past d the recurrence is unstable (see _k_way_tilted)
+    m = np.arange(n_max + 1, dtype=float)
+    scale = np.where(m >= 1, 1.0 / d, 0.0)  # (m-1)!/(m-j)! / (j! d^j), zero once j > m
+    coefficients, tail = [], np.zeros(n_max + 1)
+    for j in range(1, n_max + 1):
+        term = ((d + 1) * j - m) * scale
+        if j < k:
+            coefficients.append(term.tolist())
+        else:
+            tail += term
+            if np.all(term <= 1e-17 * tail):
+                break
+        scale = scale * np.maximum(m - j, 0.0) / ((j + 1) * d)
+    q = [0.0] * (n_max + 1)
+    for i in range(1, n_max + 1):
+        total = tail[i]
+        for j in range(1, min(k - 1, i) + 1):
+            total += coefficients[j - 1][i] * q[i - j]
+        q[i] = total
+    # q rises with m; this only settles last-ulp wobbles next to 1
+    return np.maximum.accumulate(np.clip(q, 0.0, 1.0))
+
+def _truncated_poisson(lam, k):
+    # Poisson(lam) conditioned on < k: pmf over 0..k-1, and log of its normaliser sum lam^j / j!
+    logw = np.arange(k) * math.log(lam) - np.array([math.lgamma(j + 1) for j in range(k)])
+    log_total = np.logaddexp.reduce(logw)
+    return np.exp(logw - log_total), log_total
+
+def _tilt(target, d, k):
+    # The lam whose truncated Poisson has mean `target` (kept just below the top, k - 1); the
+    # mean rises with lam and stays below it, so geometric bisection from [target, ...]
+    target = min(target, k - 1 - 0.5 / d)
+    low, high = target, 2 * k * (k - 1) / (k - 1 - target) + 2 * target
+    for _ in range(60):
+        middle = math.sqrt(low * high)
+        p, _ = _truncated_poisson(middle, k)
+        if p @ np.arange(k) < target:
+            low = middle
+        else:
+            high = middle
+    return high
+
+def _log_poisson_pmf(m, mean):
+    # log P(Poisson(mean) = m) as -log sqrt(2 pi m) - (Stirling remainder) - (deviance), each
+    # small, so nothing of size m log m cancels
+    deviance = m * np.log1p((m - mean) / mean) - (m - mean)
+    large = m >= STIRLING_MIN
+    mm = np.where(large, m, STIRLING_MIN)
+    series = 1 / (12 * mm) - 1 / (360 * mm**3) + 1 / (1260 * mm**5)
+    direct = special.gammaln(m + 1) - (m + 0.5) * np.log(m) + m - 0.5 * math.log(2 * math.pi)
+    return -0.5 * np.log(2 * math.pi * m) - np.where(large, series, direct) - deviance
+
+def _k_way_tilted(ms, d, k):
+    # q for sorted integers d < m <= d (k - 1), by Poissonization: give the buckets independent
+    # Poisson(lam) counts; conditioned on the total T = m they are the multinomial, so
+    #   1 - q(m) = F^d P(T' = m) / P(Poisson(d lam) = m),
+    # F = P(Poisson(lam) < k) and T' a sum of d counts conditioned on < k. P(T' = m) is a d-th
+    # power in Fourier space, accurate near T's mean, so lam is re-tilted along the m's
+    out = np.empty(len(ms))
+    i, top = 0, d * (k - 1)
+    while i < len(ms):
+        m0 = ms[i]
+        p, _ = _truncated_poisson(_tilt(m0 / d, d, k), k)
+        spread = math.sqrt(d * (p @ np.arange(k)**2 - (p @ np.arange(k))**2))
+        for offset in (2.0, 0.0):
+            # Centre a little past m0 so the window reaches further; retry centred if that misses m0
+            lam = _tilt((m0 + offset * spread) / d, d, k)
+            p, log_total = _truncated_poisson(lam, k)
+            mean = d * (p @ np.arange(k))
+            spread = math.sqrt(d * (p @ np.arange(k)**2 - (p @ np.arange(k))**2))
+            # Bernstein's inequality: beyond 12 spreads + 48 (k - 1) the density is below 1e-31,
+            # so a circular FFT of twice that length does not alias
+            half = 12 * spread + 48 * (k - 1)
+            size = 1 << int(min(top + 1, 2 * half + 1)).bit_length()
+            density = np.fft.irfft(np.fft.rfft(p, size) ** d, size)
+            stop = np.searchsorted(ms, min(mean + half, top), side="right")
+            values = density[ms[i:stop] % size]
+            accepted = (values >= WINDOW_FLOOR * density.max()) & (ms[i:stop] >= mean - half)
+            if accepted[0]:
+                break
+        count = max(int(np.argmin(accepted)) if not accepted.all() else len(accepted), 1)
+        sf = distributions.poisson_sf(k - 1, lam)
+        log_f = math.log1p(-sf) if sf < 0.5 else log_total - lam
+        m = ms[i:i + count].astype(float)
+        log_h = d * log_f + np.log(values[:count]) - _log_poisson_pmf(m, d * lam)
+        out[i:i + count] = 0.0 - np.expm1(log_h)
+        i += count
+    return np.maximum.accumulate(np.clip(out, 0.0, 1.0))
+
+def _nonuniform_curve(p, n_max, stop=None):
+    # P(n items all land in different buckets) for n = 0..n_max: n! e_n(p), with the
+    # elementary symmetric polynomials of every prefix of p updated one degree at a time
+    # (scaled by n! so they stay in [0, 1]). Stops early once P(collision) > stop
+    curve = [1.0, 1.0][:n_max + 1]
+    scaled = np.cumsum(p)
+    for n in range(2, n_max + 1):
+        scaled = n * np.cumsum(p * np.concatenate([[0.0], scaled[:-1]]))
+        curve.append(min(scaled[-1], 1.0))
+        if stop is not None and 1 - curve[-1] > stop:
+            break
+    return np.array(curve)
+
+def collision_probability(n, d=365, k=2, probs=None):
+    """
+    P(some bucket receives at least k of n items), vectorized over n.
+    Buckets are equally likely unless `probs` (bucket weights, k = 2 only) is given.
+    """
+    n = _items(n)
+    if probs is not None:
+        if k != 2:
+            raise ValueError("k-way collisions need equally likely buckets")
+        p = _buckets(probs)
+        curve = _nonuniform_curve(p, int(min(n.max(initial=0), len(p) + 1)))
+        return _result(np.where(n < len(curve), 1 - curve[np.minimum(n, len(curve) - 1).astype(int)], 1.0))
+
+    d, k = _space(d, k)
+    if k == 2:
+        return _result(0.0 - np.expm1(log_no_collision(n, d)))
+    # Pigeonhole: d (k - 1) + 1 items always collide
+    values = np.ones(n.shape)
+    below = n <= d * (k - 1)
+    exact = below & ((n <= MAX_EXACT_ITEMS) | (d <= MAX_EXACT_ITEMS))
+    recurrence = exact & (n <= d)
+    if np.any(recurrence):
+        curve = _k_way_curve(int(n[recurrence].max()), d, k)
+        values[recurrence] = curve[n[recurrence].astype(int)]
+    tilted = exact & (n > d)
+    if np.any(tilted):
+        ms, where = np.unique(n[tilted].astype(np.int64), return_inverse=True)
+        values[tilted] = _k_way_tilted(ms, d, k)[where]
+    approx = below & ~exact
+    if np.any(approx):
+        # Poisson approximation: each bucket overflows independently with P(Poisson(n/d) >= k)
+        overflow = distributions.poisson_sf(k - 1, n[approx] / d)
+        values[approx] = 0.0 - np.expm1(-d * overflow)
+    return _result(values)
+
+def collision_curve(n_max, d=365, k=2, probs=None):
+    """
+    collision_probability for every group size n = 0..n_max, as one array.
+    """
+    if n_max < 0:
+        raise ValueError("Largest group size must be non-negative")
+    return collision_probability(np.arange(int(n_max) + 1), d, k, probs)
+
+def _last_within(curve, epsilon):
+    return int(np.searchsorted(np.maximum.accumulate(curve), epsilon, side="right")) - 1
+
+def max_group_size(epsilon, d=365, k=2, probs=None):
+    """
+    Largest n with collision_probability(n, d, k, probs) <= epsilon, e.g. how many
+    random IDs a space of d values holds before the collision risk passes epsilon.
+    """
+    if not 0 <= epsilon < 1:
+        raise ValueError("Collision budget 'epsilon' must be in [0, 1)")
+    if probs is not None:
+        if k != 2:
+            raise ValueError("k-way collisions need equally likely buckets")
+        p = _buckets(probs)
+        return _last_within(1 - _nonuniform_curve(p, len(p) + 1, stop=epsilon), epsilon)
+
+    d, k = _space(d, k)
+    # Doubling, then bisection on integers; the probability rises with n
+    high = k
+    if k > 2 and collision_probability(MAX_EXACT_ITEMS + 1, d, k) <= epsilon:
+        # Beyond the exact range; skip computing exact curves on the way there
+        high = MAX_EXACT_ITEMS + 1
+    while collision_probability(high, d, k) <= epsilon:
+        high *= 2
+    low = high // 2 if high > k else k - 1
+    cut = int(min(high, d, MAX_EXACT_ITEMS))
+    if k > 2 and cut > low:
+        # Up to n = d the recurrence gives the whole curve for the price of its last value
+        curve = collision_curve(cut, d, k)
+        if curve[-1] > epsilon:
+            return _last_within(curve, epsilon)
+        low = cut
+    while high - low > 1:
+        middle = (low + high) // 2
+        if collision_probability(middle, d, k) <= epsilon:
+            low = middle
+        else:
+            high = middle
+    return low
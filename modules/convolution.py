@@ -0,0 +1,229 @@
+"""
+Exact distributions of sums of independent integer-valued random variables.
+
+A distribution is a probability vector over consecutive integers starting at
+`low`; adding two independent variables convolves their vectors. Short
+vectors are convolved directly, long ones through the FFT, and sums of n
+identical variables use exponentiation by squaring (O(log n) convolutions).
+
+Direct convolution of non-negative vectors keeps every entry to relative
+precision, down to float underflow. The FFT only keeps an absolute precision
+of about machine epsilon times the largest entry: smaller entries, deep in
+the tails, are round-off noise. "auto" therefore convolves directly unless
+the vectors are so long that the direct sum gets expensive.
+"""
+from math import comb
+
+import numpy as np
+
+from modules import distributions
+
+# Below this length (of the shorter vector) direct convolution beats the FFT
+DIRECT_MAX_LENGTH = 500
+# Direct convolution up to this many multiply-adds (len(p) * len(q)), for its tail precision
+DIRECT_MAX_WORK = 1 << 26
+# Probability mass allowed to be cut from an unbounded (Poisson) tail
+TAIL_MASS = 1e-16
+
+def convolve(p, q, method="auto"):
+    """
+    Convolution of two probability vectors ("direct", "fft" or "auto").
+    FFT results are only accurate to about eps x their largest entry (see above).
+    """
+    p = np.asarray(p, dtype=float)
+    q = np.asarray(q, dtype=float)
+    if method == "auto":
+        direct = min(len(p), len(q)) < DIRECT_MAX_LENGTH or len(p) * len(q) <= DIRECT_MAX_WORK
+        method = "direct" if direct else "fft"
+    if method == "direct":
+        return np.convolve(p, q)
+    if method != "fft":
+        raise ValueError(f"Unknown convolution method '{method}'")
+
+    n = len(p) + len(q) - 1
+    size = 1 << (n - 1).bit_length()
+    result = np.fft.irfft(np.fft.rfft(p, size) * np.fft.rfft(q, size), size)[:n]
+    # Round-off can go negative but never reaches the ends of the support, which are exact products
+    result = np.maximum(result, 0.0)
+    result[0], result[-1] = p[0] * q[0], p[-1] * q[-1]
+    return result
+
+class DiscreteDistribution:
+    """
+    Exact distribution over the integers low, low + 1, ..., low + len(probs) - 1.
+    """
+    def __init__(self, probs, low=0):
+        probs = np.asarray(probs, dtype=float)
+        if probs.ndim != 1 or len(probs) == 0:
+            raise ValueError("Probabilities must be a non-empty 1-D sequence")
+        if np.any(probs < 0) or not np.isclose(probs.sum(), 1.0, atol=1e-9):
+            raise ValueError("Probabilities must be non-negative and sum to 1")
+        # Drop zero-probability ends so supports stay as short as possible
+        nonzero = np.flatnonzero(probs)
+        self.probs = probs[nonzero[0]:nonzero[-1] + 1]
+        self.low = int(low) + int(nonzero[0])
+
+    @property
+    def high(self):
+        return self.low + len(self.probs) - 1
+
+    @property
+    def values(self):
+        return np.arange(self.low, self.high + 1)
+
+    @property
+    def mean(self):
+        return float(np.dot(self.values, self.probs))
+
+    @property
+    def variance(self):
+        deviations = self.values - self.mean
+        return float(np.dot(deviations * deviations, self.probs))
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.variance))
+
+    def pmf(self, k):
+        """
+        P(S = k), vectorized over k.
+        """
+        k = np.asarray(k)
+        index = k - self.low
+        inside = (index >= 0) & (index < len(self.probs)) & (np.floor(k) == k)
+        result = np.where(inside, self.probs[np.clip(index, 0, len(self.probs) - 1).astype(int)], 0.0)
+        return result[()] if result.ndim == 0 else result
+
+    def cdf(self, k):
+        """
+        P(S <= k), vectorized over k.
+        """
+        cumulative = np.concatenate([[0.0], np.cumsum(self.probs)])
+        index = np.clip(np.floor(np.asarray(k, dtype=float)) - self.low + 1, 0, len(self.probs)).astype(int)
+        result = np.minimum(cumulative[index], 1.0)
+        return result[()] if result.ndim == 0 else result
+
+    def sf(self, k):
+        """
+        P(S > k), summed from the upper tail so small tail probabilities keep their precision.
+        """
+        tail = np.concatenate([np.cumsum(self.probs[::-1])[::-1], [0.0]])
+        index = np.clip(np.floor(np.asarray(k, dtype=float)) - self.low + 1, 0, len(self.probs)).astype(int)
+        result = np.minimum(tail[index], 1.0)
+        return result[()] if result.ndim == 0 else result
+
+    def add(self, other, method="auto"):
+        """
+        Distribution of the sum of independent variables with these two distributions.
+        """
+        return DiscreteDistribution(_normalized(convolve(self.probs, other.probs, method)), self.low + other.low)
+
+    __add__ = add
+
+    def power(self, n, method="auto"):
+        """
+        Distribution of the sum of n independent copies, by repeated squaring.
+        """
+        n = int(n)
+        if n < 1:
+            raise ValueError("Number of copies must be at least 1")
+        result, square = None, self
+        while True:
+            if n & 1:
+                result = square if result is None else result.add(square, method)
+            n >>= 1
+            if not n:
+                return result
+            square = square.add(square, method)
+
+def _normalized(probs):
+    # Keep the total at exactly 1 despite round-off over many convolutions
+    return probs / probs.sum()
+
+# ---------------------------------------------------------------------------
+# Building blocks
+# ---------------------------------------------------------------------------
+
+def custom(values, probs):
+    """
+    Distribution with P(X = values[i]) = probs[i] for integer values (repeats are added up).
+    """
+    values = np.asarray(values)
+    probs = np.asarray(probs, dtype=float)
+    if values.shape != probs.shape or values.ndim != 1 or len(values) == 0:
+        raise ValueError("Values and probabilities must be 1-D sequences of the same length")
+    if np.any(np.floor(values) != values):
+        raise ValueError("Values must be integers")
+    values = values.astype(np.int64)
+    low = values.min()
+    return DiscreteDistribution(np.bincount(values - low, weights=probs), low)
+
+def die(faces=6):
+    """
+    A fair die with faces 1..faces.
+    """
+    if faces < 1:
+        raise ValueError("A die needs at least one face")
+    return DiscreteDistribution(np.full(int(faces), 1.0 / faces), 1)
+
+def dice_sum(num_dice, faces=6):
+    """
+    Distribution of the sum of num_dice fair dice.
+    """
+    return die(faces).power(num_dice)
+
+def binomial(n, p):
+    """
+    Binomial(n, p) as an exact distribution.
+    """
+    return DiscreteDistribution(distributions.binomial_pmf(np.arange(int(n) + 1), n, p))
+
+def poisson(rate, tail_mass=TAIL_MASS):
+    """
+    Poisson(λ), truncated where the remaining upper tail is below tail_mass.
+    """
+    if rate < 0:
+        raise ValueError("Rate 'λ' must be non-negative")
+    # Mean + generous multiple of the std always covers the requested tail, then trim
+    high = int(rate + 12 * np.sqrt(rate) + 40)
+    k = np.arange(high + 1)
+    while distributions.poisson_sf(high, rate) > tail_mass:
+        high *= 2
+        k = np.arange(high + 1)
+    probs = distributions.poisson_pmf(k, rate)
+    return DiscreteDistribution(_normalized(probs))
+
+def sum_of(*components, method="auto"):
+    """
+    Distribution of the sum of independent components.
+    """
+    if not components:
+        raise ValueError("Need at least one component")
+    result = components[0]
+    for component in components[1:]:
+        result = result.add(component, method)
+    return result
+
+def card_sum(hand_size=5, suits=4, ranks=13):
+    """
+    Exact distribution of the summed values (1..ranks) of a hand dealt without
+    replacement from a deck of suits x ranks cards. Cards are not independent,
+    so this counts hands rank by rank instead of convolving.
+    """
+    deck_size = suits * ranks
+    if not (1 <= hand_size <= deck_size):
+        raise ValueError(f"Hand size must be between 1 and {deck_size}")
+    max_sum = hand_size * ranks
+    # ways[c, s]: number of ways to pick c cards with value sum s from the ranks so far
+    ways = np.zeros((hand_size + 1, max_sum + 1), dtype=object)
+    ways[0, 0] = 1
+    for value in range(1, ranks + 1):
+        updated = ways.copy()
+        for taken in range(1, suits + 1):
+            shift = taken * value
+            if taken > hand_size or shift > max_sum:
+                break
+            updated[taken:, shift:] += comb(suits, taken) * ways[:-taken, :max_sum + 1 - shift]
+        ways = updated
+    counts = ways[hand_size].astype(float)
+    return DiscreteDistribution(counts / comb(deck_size, hand_size))
@@ -0,0 +1,125 @@
+import os
+import re
+
+import numpy as np
+
+from modules.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+SUPPORTED_EXTENSIONS = (".csv", ".txt", ".npy", ".parquet")
+
+def _extension(source, name=None):
+    name = name or getattr(source, "name", None) or (source if isinstance(source, (str, os.PathLike)) else "")
+    return os.path.splitext(str(name))[1].lower()
+
+def parse_text(text):
+    """
+    Parse comma/whitespace separated numbers into a float array.
+    """
+    tokens = [t for t in re.split(r"[,\s;]+", text.strip()) if t]
+    return np.array(tokens, dtype=float)
+
+def _load_npy(source):
+    """
+    Memory-map .npy files on disk; for in-memory uploads, view the buffer without copying.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return np.load(source, mmap_mode="r")
+
+    if hasattr(source, "getbuffer"):
+        source.seek(0)
+        version = np.lib.format.read_magic(source)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(source)
+        elif version == (2, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(source)
+        else:
+            source.seek(0)
+            return np.load(source)
+        if dtype.hasobject:
+            raise ValueError("Object arrays are not supported")
+        count = int(np.prod(shape))
+        array = np.frombuffer(source.getbuffer(), dtype=dtype, count=count, offset=source.tell())
+        return array.reshape(shape, order="F" if fortran_order else "C")
+
+    return np.load(source)
+
+def _has_header(first_line):
+    try:
+        [float(field) for field in re.split(r"[,;\t]", first_line) if field.strip()]
+        return False
+    except ValueError:
+        return True
+
+def _load_csv(source):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source) as f:
+            first_line = f.readline()
+    else:
+        source.seek(0)
+        first_line = source.readline()
+        if isinstance(first_line, bytes):
+            first_line = first_line.decode("utf-8", errors="replace")
+        source.seek(0)
+
+    try:
+        import pyarrow  # noqa: F401 - pyarrow's CSV reader is multithreaded
+        engine = "pyarrow"
+    except ImportError:
+        engine = "c"
+    frame = pd.read_csv(source, header=0 if _has_header(first_line) else None, engine=engine)
+    if len(frame) == 1 and frame.shape[1] > 1:
+        # A single line of comma separated values: treat it as one column
+        frame = pd.DataFrame({"values": frame.iloc[0].to_numpy()})
+    return frame
+
+def _load_parquet(source):
+    try:
+        return pd.read_parquet(source)
+    except ImportError as e:
+        raise ImportError("Reading Parquet files requires 'pyarrow' or 'fastparquet'") from e
+
+def load_columns(source, name=None):
+    """
+    Load numeric columns from a CSV/TXT, NPY or Parquet file.
+    `source` is a path or a file-like object (e.g. a Streamlit upload); `name`
+    overrides the file name used to detect the format.
+    Returns: dict of column name -> 1-D float array
+    """
+    ext = _extension(source, name)
+    if ext == ".npy":
+        array = _load_npy(source)
+        if array.ndim == 1:
+            return {"values": array}
+        if array.ndim != 2:
+            raise ValueError(f"Expected a 1-D or 2-D array, got shape {array.shape}")
+        return {str(i): array[:, i] for i in range(array.shape[1])}
+
+    if ext in (".csv", ".txt"):
+        frame = _load_csv(source)
+    elif ext == ".parquet":
+        frame = _load_parquet(source)
+    else:
+        raise ValueError(f"Unsupported file type '{ext}'. Use one of {', '.join(SUPPORTED_EXTENSIONS)}")
+
+    columns = {}
+    for column in frame.columns:
+        values = pd.to_numeric(frame[column], errors="coerce").to_numpy(dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values):
+            columns[str(column)] = values
+    if not columns:
+        raise ValueError("No numeric columns found")
+    return columns
+
+def load_array(source, name=None, column=None):
+    """
+    Load a single numeric column (the first one by default) as a float array.
+    """
+    columns = load_columns(source, name)
+    if column is None:
+        return next(iter(columns.values()))
+    if column not in columns:
+        raise ValueError(f"Column '{column}' not found. Available: {', '.join(columns)}")
+    return columns[column]
@@ -1,5 +1,465 @@
+from functools import lru_cache
 
-from math import comb, exp, factorial, sqrt, pi, erf
+import numpy as np
+
+# scipy.special when installed, else the pure NumPy implementations
+from modules.fastmath import special
+
+# ---------------------------------------------------------------------------
+# Vectorized API
+#
+# Every function below takes scalars or NumPy arrays and broadcasts its
+# arguments against each other, so a whole support (or a grid of parameters)
+# is evaluated in a single call. Discrete PMFs are computed in log space with
+# log-gamma, which keeps them finite for large n / k where comb() and
+# factorial() overflow a float.
+# ---------------------------------------------------------------------------
+
+def _require(condition, message):
+    if not np.all(condition):
+        raise ValueError(message)
+
+def _result(value):
+    # Hand back a plain float for scalar input, an array otherwise
+    return value[()] if isinstance(value, np.ndarray) and value.ndim == 0 else value
+
+def _is_integer(k):
+    return np.floor(k) == k
+
+def binomial_logpmf(k, n, p):
+    """
+    log P(X=k) = lgamma(n+1) - lgamma(k+1) - lgamma(n-k+1) + k log p + (n-k) log(1-p)
+    """
+    k, n, p = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (k, n, p)))
+    _require((p >= 0) & (p <= 1), "Probability 'p' must be between 0 and 1")
+    _require((n >= 0) & _is_integer(n), "Number of trials 'n' must be a non-negative integer")
+
+    in_support = (k >= 0) & (k <= n) & _is_integer(k)
+    ks = np.where(in_support, k, 0)
+    log_comb = special.gammaln(n + 1) - special.gammaln(ks + 1) - special.gammaln(n - ks + 1)
+    logpmf = log_comb + special.xlogy(ks, p) + special.xlog1py(n - ks, -p)
+    return _result(np.where(in_support, logpmf, -np.inf))
+
+def binomial_pmf(k, n, p):
+    """
+    P(X=k) for Binomial(n, p), vectorized over k, n and p
+    """
+    return _result(np.exp(binomial_logpmf(k, n, p)))
+
+def binomial_cdf(k, n, p):
+    """
+    P(X<=k) for Binomial(n, p), via the regularized incomplete beta function
+    """
+    k, n, p = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (k, n, p)))
+    _require((p >= 0) & (p <= 1), "Probability 'p' must be between 0 and 1")
+    _require((n >= 0) & _is_integer(n), "Number of trials 'n' must be a non-negative integer")
+    k = np.floor(k)
+    # scipy's bdtr deprecates float n (and takes a much slower path for it)
+    cdf = special.bdtr(np.clip(k, 0, n), n.astype(np.int64), p)
+    return _result(np.where(k < 0, 0.0, np.where(k >= n, 1.0, cdf)))
+
+def binomial_sf(k, n, p):
+    """
+    P(X>k) for Binomial(n, p), computed directly rather than as 1 - cdf
+    """
+    k, n, p = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (k, n, p)))
+    _require((p >= 0) & (p <= 1), "Probability 'p' must be between 0 and 1")
+    _require((n >= 0) & _is_integer(n), "Number of trials 'n' must be a non-negative integer")
+    k = np.floor(k)
+    # scipy's bdtrc deprecates float n (and takes a much slower path for it)
+    sf = special.bdtrc(np.clip(k, 0, n), n.astype(np.int64), p)
+    return _result(np.where(k < 0, 1.0, np.where(k >= n, 0.0, sf)))
+
+def poisson_logpmf(k, rate):
+    """
+    log P(X=k) = k log λ - λ - lgamma(k+1)
+    """
+    k, rate = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (k, rate)))
+    _require(rate >= 0, "Rate 'λ' must be non-negative")
+
+    in_support = (k >= 0) & _is_integer(k)
+    ks = np.where(in_support, k, 0)
+    logpmf = special.xlogy(ks, rate) - rate - special.gammaln(ks + 1)
+    return _result(np.where(in_support, logpmf, -np.inf))
+
+def poisson_pmf(k, rate):
+    """
+    P(X=k) for Poisson(λ), vectorized over k and λ
+    """
+    return _result(np.exp(poisson_logpmf(k, rate)))
+
+def poisson_cdf(k, rate):
+    """
+    P(X<=k) for Poisson(λ), via the regularized upper incomplete gamma function
+    """
+    k, rate = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (k, rate)))
+    _require(rate >= 0, "Rate 'λ' must be non-negative")
+    k = np.floor(k)
+    cdf = special.pdtr(np.maximum(k, 0), rate)
+    return _result(np.where(k < 0, 0.0, cdf))
+
+def poisson_sf(k, rate):
+    """
+    P(X>k) for Poisson(λ)
+    """
+    k, rate = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (k, rate)))
+    _require(rate >= 0, "Rate 'λ' must be non-negative")
+    k = np.floor(k)
+    sf = special.pdtrc(np.maximum(k, 0), rate)
+    return _result(np.where(k < 0, 1.0, sf))
+
+def geometric_logpmf(k, p):
+    """
+    log P(X=k) = (k-1) log(1-p) + log p, k = 1, 2, ...
+    """
+    k, p = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (k, p)))
+    _require((p > 0) & (p <= 1), "Probability 'p' must be in (0, 1]")
+
+    in_support = (k >= 1) & _is_integer(k)
+    ks = np.where(in_support, k, 1)
+    logpmf = special.xlog1py(ks - 1, -p) + np.log(p)
+    return _result(np.where(in_support, logpmf, -np.inf))
+
+def geometric_pmf(k, p):
+    """
+    P(X=k) for Geometric(p): probability of the first success on trial k
+    """
+    return _result(np.exp(geometric_logpmf(k, p)))
+
+def geometric_cdf(k, p):
+    """
+    P(X<=k) = 1 - (1-p)^k
+    """
+    k, p = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (k, p)))
+    _require((p > 0) & (p <= 1), "Probability 'p' must be in (0, 1]")
+    k = np.maximum(np.floor(k), 0)
+    return _result(-np.expm1(special.xlog1py(k, -p)))
+
+def geometric_sf(k, p):
+    """
+    P(X>k) = (1-p)^k
+    """
+    k, p = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (k, p)))
+    _require((p > 0) & (p <= 1), "Probability 'p' must be in (0, 1]")
+    k = np.maximum(np.floor(k), 0)
+    return _result(np.exp(special.xlog1py(k, -p)))
+
+def normal_pdf(x, mean=0.0, std_dev=1.0):
+    """
+    Density of Normal(μ, σ) at x
+    """
+    x, mean, std_dev = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (x, mean, std_dev)))
+    _require(std_dev > 0, "Standard deviation must be positive")
+    z = (x - mean) / std_dev
+    return _result(np.exp(-0.5 * z * z) / (std_dev * np.sqrt(2 * np.pi)))
+
+def normal_cdf(x, mean=0.0, std_dev=1.0):
+    """
+    P(X<=x) for Normal(μ, σ)
+    """
+    x, mean, std_dev = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (x, mean, std_dev)))
+    _require(std_dev > 0, "Standard deviation must be positive")
+    return _result(special.ndtr((x - mean) / std_dev))
+
+def normal_sf(x, mean=0.0, std_dev=1.0):
+    """
+    P(X>x) for Normal(μ, σ), accurate far into the upper tail
+    """
+    x, mean, std_dev = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (x, mean, std_dev)))
+    _require(std_dev > 0, "Standard deviation must be positive")
+    return _result(special.ndtr((mean - x) / std_dev))
+
+def exponential_pdf(x, rate):
+    """
+    Density of Exponential(λ) at x: λ e^(-λx) for x >= 0
+    """
+    x, rate = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (x, rate)))
+    _require(rate > 0, "Rate 'λ' must be positive")
+    return _result(np.where(x < 0, 0.0, rate * np.exp(-rate * np.maximum(x, 0))))
+
+def exponential_cdf(x, rate):
+    """
+    P(X<=x) = 1 - e^(-λx)
+    """
+    x, rate = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (x, rate)))
+    _require(rate > 0, "Rate 'λ' must be positive")
+    return _result(-np.expm1(-rate * np.maximum(x, 0)))
+
+def exponential_sf(x, rate):
+    """
+    P(X>x) = e^(-λx)
+    """
+    x, rate = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (x, rate)))
+    _require(rate > 0, "Rate 'λ' must be positive")
+    return _result(np.exp(-rate * np.maximum(x, 0)))
+
+# ---------------------------------------------------------------------------
+# Quantiles
+#
+# ppf(q) is the smallest x with P(X<=x) >= q and isf(q) the smallest x with
+# P(X>x) <= q; isf works from the upper tail, so it stays precise for tiny q.
+# Discrete quantiles bisect over the integers with the CDF/SF above, every
+# query in a vector at once, inside a bracket around a Cornish-Fisher guess.
+# Continuous ones are closed form. For many queries on the same parameters,
+# quantile_table() caches cumulative log-PMFs and answers with a binary search.
+# ---------------------------------------------------------------------------
+
+# Upper tail probability below which unbounded supports are cut off in tables
+TABLE_TAIL = 1e-300
+# Largest support tabulated by quantile_table
+TABLE_MAX_SIZE = 10**7
+
+def _quantile_level(q):
+    q = np.asarray(q, dtype=float)
+    _require((q >= 0) & (q <= 1), "Probability 'q' must be between 0 and 1")
+    return q
+
+def _bisect(reached, low, high):
+    # Smallest integer k in [low, high] with reached(k) True (reached is monotone in k)
+    low, high = np.array(low, dtype=float), np.array(high, dtype=float)
+    while np.any(low < high):
+        middle = np.floor((low + high) / 2)
+        ok = reached(middle)
+        high = np.where(ok, middle, high)
+        low = np.where(ok, low, middle + 1)
+    return low
+
+def _upper_bracket(reached, start):
+    # A point where reached() holds, doubling from `start` (unbounded supports)
+    high = np.array(start, dtype=float)
+    while True:
+        short = ~reached(high)
+        if not np.any(short):
+            return high
+        high = np.where(short, 2 * high + 1, high)
+
+def _split(q, lower, upper, *params):
+    # reached(k) from lower(k, q, *params) where q <= 1/2 and upper(...) above it, so each
+    # test compares probabilities on the tail where they keep their precision
+    high = q > 0.5
+    def reached(k):
+        ok = np.empty(np.shape(k), dtype=bool)
+        for part, test in ((~high, lower), (high, upper)):
+            if np.any(part):
+                ok[part] = test(k[part], q[part], *(a[part] for a in params))
+        return ok
+    return reached
+
+# P(X<=k) >= q, as P(X>k) <= 1 - q above q = 1/2 where the CDF rounds to 1 long before the tail ends
+def _cdf_at_least(q, cdf, sf, *params):
+    return _split(q, lambda k, q, *a: cdf(k, *a) >= q, lambda k, q, *a: sf(k, *a) <= 1 - q, *params)
+
+# P(X>k) <= q, as P(X<=k) >= 1 - q above q = 1/2
+def _sf_at_most(q, cdf, sf, *params):
+    return _split(q, lambda k, q, *a: sf(k, *a) <= q, lambda k, q, *a: cdf(k, *a) >= 1 - q, *params)
+
+# Half-width of the initial bracket around the Cornish-Fisher guess
+BRACKET_WIDTH = 4
+
+def _search(reached, z, mean, std, skew, low, high):
+    # Bracketed search: start from a Cornish-Fisher estimate mean + std * (z + (z^2 - 1) skew / 6)
+    # and widen to the whole support [low, high] only where the bracket misses
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        guess = np.round(mean + std * (z + (z * z - 1) * skew / 6))
+    guess = np.clip(np.nan_to_num(guess, nan=low, posinf=high, neginf=low), low, high)
+    lower = np.maximum(guess - BRACKET_WIDTH, low)
+    lower = np.where((lower > low) & reached(lower - 1), low, lower)
+    upper = np.minimum(_upper_bracket(reached, np.minimum(guess + BRACKET_WIDTH, high)), high)
+    return _bisect(reached, lower, upper)
+
+def _binomial_search(reached, z, n, p):
+    std = np.sqrt(n * p * (1 - p))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        skew = (1 - 2 * p) / std
+    return _search(reached, z, n * p, std, skew, np.zeros_like(n), n)
+
+def binomial_ppf(q, n, p):
+    """
+    Smallest k with P(X<=k) >= q for Binomial(n, p), vectorized over q, n and p
+    """
+    q, n, p = np.broadcast_arrays(_quantile_level(q), *(np.asarray(a, dtype=float) for a in (n, p)))
+    _require((p >= 0) & (p <= 1), "Probability 'p' must be between 0 and 1")
+    _require((n >= 0) & _is_integer(n), "Number of trials 'n' must be a non-negative integer")
+    # P(X>k) underflows to 0 well before n, so q = 1 is answered directly
+    k = _binomial_search(_cdf_at_least(q, binomial_cdf, binomial_sf, n, p), special.ndtri(q), n, p)
+    return _result(np.where(q == 1, n, k))
+
+def binomial_isf(q, n, p):
+    """
+    Smallest k with P(X>k) <= q for Binomial(n, p)
+    """
+    q, n, p = np.broadcast_arrays(_quantile_level(q), *(np.asarray(a, dtype=float) for a in (n, p)))
+    _require((p >= 0) & (p <= 1), "Probability 'p' must be between 0 and 1")
+    _require((n >= 0) & _is_integer(n), "Number of trials 'n' must be a non-negative integer")
+    # P(X>k) underflows to 0 well before n, so q = 0 is answered directly
+    k = _binomial_search(_sf_at_most(q, binomial_cdf, binomial_sf, n, p), -special.ndtri(q), n, p)
+    return _result(np.where(q == 0, n, k))
+
+def _poisson_search(reached, z, rate):
+    std = np.sqrt(rate)
+    with np.errstate(divide="ignore"):
+        skew = 1 / std
+    return _search(reached, z, rate, std, skew, np.zeros_like(rate), np.inf)
+
+def poisson_ppf(q, rate):
+    """
+    Smallest k with P(X<=k) >= q for Poisson(λ) (inf for q = 1)
+    """
+    q, rate = np.broadcast_arrays(_quantile_level(q), np.asarray(rate, dtype=float))
+    _require(rate >= 0, "Rate 'λ' must be non-negative")
+    finite = q < 1
+    qf, rf = q[finite], rate[finite]
+    k = np.full(q.shape, np.inf)
+    k[finite] = _poisson_search(_cdf_at_least(qf, poisson_cdf, poisson_sf, rf), special.ndtri(qf), rf)
+    return _result(k)
+
+def poisson_isf(q, rate):
+    """
+    Smallest k with P(X>k) <= q for Poisson(λ) (inf for q = 0)
+    """
+    q, rate = np.broadcast_arrays(_quantile_level(q), np.asarray(rate, dtype=float))
+    _require(rate >= 0, "Rate 'λ' must be non-negative")
+    finite = q > 0
+    qf, rf = q[finite], rate[finite]
+    k = np.full(q.shape, np.inf)
+    k[finite] = _poisson_search(_sf_at_most(qf, poisson_cdf, poisson_sf, rf), -special.ndtri(qf), rf)
+    return _result(k)
+
+def geometric_ppf(q, p):
+    """
+    Smallest k with P(X<=k) >= q for Geometric(p): ceil(log(1-q) / log(1-p)),
+    nudged by one where rounding puts it on the wrong side
+    """
+    q, p = np.broadcast_arrays(_quantile_level(q), np.asarray(p, dtype=float))
+    _require((p > 0) & (p <= 1), "Probability 'p' must be in (0, 1]")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = np.where(p < 1, np.ceil(np.log1p(-q) / np.log1p(-p)), 1.0)
+    k = np.where(np.isnan(k), 1.0, np.maximum(k, 1.0))
+    finite = np.isfinite(k)
+    reached = _cdf_at_least(q, geometric_cdf, geometric_sf, p)
+    k = np.where(finite & (k > 1) & reached(k - 1), k - 1, k)
+    k = np.where(finite & ~reached(np.where(finite, k, 1)), k + 1, k)
+    return _result(k)
+
+def geometric_isf(q, p):
+    """
+    Smallest k with P(X>k) <= q for Geometric(p): ceil(log q / log(1-p))
+    """
+    q, p = np.broadcast_arrays(_quantile_level(q), np.asarray(p, dtype=float))
+    _require((p > 0) & (p <= 1), "Probability 'p' must be in (0, 1]")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = np.where(p < 1, np.ceil(np.log(q) / np.log1p(-p)), 1.0)
+    k = np.where(np.isnan(k), 1.0, np.maximum(k, 1.0))
+    finite = np.isfinite(k)
+    reached = _sf_at_most(q, geometric_cdf, geometric_sf, p)
+    k = np.where(finite & (k > 1) & reached(k - 1), k - 1, k)
+    k = np.where(finite & ~reached(np.where(finite, k, 1)), k + 1, k)
+    return _result(k)
+
+def normal_ppf(q, mean=0.0, std_dev=1.0):
+    """
+    x with P(X<=x) = q for Normal(μ, σ)
+    """
+    q, mean, std_dev = np.broadcast_arrays(_quantile_level(q), *(np.asarray(a, dtype=float) for a in (mean, std_dev)))
+    _require(std_dev > 0, "Standard deviation must be positive")
+    return _result(mean + std_dev * special.ndtri(q))
+
+def normal_isf(q, mean=0.0, std_dev=1.0):
+    """
+    x with P(X>x) = q for Normal(μ, σ), precise for tiny q
+    """
+    q, mean, std_dev = np.broadcast_arrays(_quantile_level(q), *(np.asarray(a, dtype=float) for a in (mean, std_dev)))
+    _require(std_dev > 0, "Standard deviation must be positive")
+    return _result(mean - std_dev * special.ndtri(q))
+
+def exponential_ppf(q, rate):
+    """
+    x with P(X<=x) = q for Exponential(λ): -log(1-q) / λ
+    """
+    q, rate = np.broadcast_arrays(_quantile_level(q), np.asarray(rate, dtype=float))
+    _require(rate > 0, "Rate 'λ' must be positive")
+    with np.errstate(divide="ignore"):
+        return _result(-np.log1p(-q) / rate)
+
+def exponential_isf(q, rate):
+    """
+    x with P(X>x) = q for Exponential(λ): -log(q) / λ
+    """
+    q, rate = np.broadcast_arrays(_quantile_level(q), np.asarray(rate, dtype=float))
+    _require(rate > 0, "Rate 'λ' must be positive")
+    with np.errstate(divide="ignore"):
+        return _result(-np.log(q) / rate)
+
+class QuantileTable:
+    """
+    Cumulative log-PMF tables over the support low, low + 1, ..., high of a
+    discrete distribution; ppf/isf are one binary search per query, in the CDF
+    table for levels up to 1/2 and in the SF table above, so levels near 1 keep
+    their precision. Unbounded supports (high = inf) are tabulated until the
+    tail is under TABLE_TAIL, whose log mass is passed as log_tail; queries
+    beyond the table give inf.
+    """
+    def __init__(self, logpmf, low=0, high=None, log_tail=-np.inf):
+        logpmf = np.asarray(logpmf, dtype=float)
+        self.low = low
+        self.high = low + len(logpmf) - 1 if high is None else high
+        log_cdf = np.logaddexp.accumulate(logpmf)
+        log_sf = np.logaddexp.accumulate(np.append(logpmf, log_tail)[::-1])[::-1]
+        # Renormalised by the total mass, so a complete table ends at P(X <= high) = 1 exactly
+        # and starts at P(X >= low) = 1, whatever the round-off in the running sums
+        self.log_cdf = log_cdf - np.logaddexp(log_cdf[-1], log_tail)
+        # log P(X > k): the reversed running sum, shifted by one
+        self.log_sf = log_sf[1:] - log_sf[0]
+
+    def ppf(self, q):
+        q = _quantile_level(q)
+        with np.errstate(divide="ignore"):
+            # P(X <= k) >= q, or P(X > k) <= 1 - q (1 - q is exact for q > 1/2)
+            index = np.where(q > 0.5, np.searchsorted(-self.log_sf, -np.log1p(-q)),
+                             np.searchsorted(self.log_cdf, np.log(q)))
+        return self._value(index, q == 0, q == 1)
+
+    def isf(self, q):
+        q = _quantile_level(q)
+        with np.errstate(divide="ignore"):
+            # P(X > k) <= q, or P(X <= k) >= 1 - q
+            index = np.where(q > 0.5, np.searchsorted(self.log_cdf, np.log1p(-q)),
+                             np.searchsorted(-self.log_sf, -np.log(q)))
+        return self._value(index, q == 1, q == 0)
+
+    def _value(self, index, lowest, highest):
+        value = np.where(index < len(self.log_sf), index + self.low, self.high)
+        return _result(np.select([lowest, highest], [self.low, self.high], value).astype(float))
+
+def quantile_table(distribution, *params):
+    """
+    Cached QuantileTable for "binomial" (n, p), "poisson" (λ) or "geometric" (p).
+    """
+    return _quantile_table(distribution, *(float(x) for x in params))
+
+@lru_cache(maxsize=64)
+def _quantile_table(distribution, *params):
+    if distribution == "binomial":
+        n, p = params
+        logpmf, low, high, tail = binomial_logpmf(np.arange(n + 1), n, p), 0, n, 0.0
+    elif distribution == "poisson":
+        (rate,) = params
+        last = poisson_isf(TABLE_TAIL, rate)
+        logpmf, low, high, tail = poisson_logpmf(np.arange(last + 1), rate), 0, np.inf, poisson_sf(last, rate)
+    elif distribution == "geometric":
+        (p,) = params
+        last = geometric_isf(TABLE_TAIL, p)
+        logpmf, low, high, tail = geometric_logpmf(np.arange(1, last + 1), p), 1, np.inf, geometric_sf(last, p)
+    else:
+        raise ValueError(f"No quantile table for '{distribution}'. Choose from binomial, poisson, geometric")
+    if len(logpmf) > TABLE_MAX_SIZE:
+        raise ValueError(f"Support too large to tabulate ({len(logpmf):,} values)")
+    with np.errstate(divide="ignore"):
+        return QuantileTable(logpmf, low, high, np.log(tail))
+
+# ---------------------------------------------------------------------------
+# Scalar calculators (thin wrappers over the vectorized API)
+# ---------------------------------------------------------------------------
 
 def calculate_binomial_probability(n, k, p):
     """
@@ -10,7 +470,7 @@ def calculate_binomial_probability(n, k, p):
     if k < 0 or k > n:
         raise ValueError("Number of successes 'k' must be between 0 and 'n'")
 
-    return comb(n, k) * (p**k) * ((1-p)**(n-k))
+    return float(binomial_pmf(k, n, p))
 
 def calculate_poisson_distribution(rate, k):
     """
@@ -21,7 +481,7 @@ def calculate_poisson_distribution(rate, k):
     if k < 0:
         raise ValueError("Number of events 'k' must be non-negative")
 
-    return (rate**k * exp(-rate)) / factorial(k)
+    return float(poisson_pmf(k, rate))
 
 def calculate_normal_distribution(mean, std_dev, lower, upper):
     """
@@ -29,11 +489,8 @@ def calculate_normal_distribution(mean, std_dev, lower, upper):
     """
     if std_dev <= 0:
         raise ValueError("Standard deviation must be positive")
-    
-    def cdf(x):
-        return 0.5 * (1 + erf((x - mean) / (std_dev * sqrt(2))))
-    
-    return cdf(upper) - cdf(lower)
+
+    return float(normal_cdf(upper, mean, std_dev) - normal_cdf(lower, mean, std_dev))
 
 def calculate_geometric_distribution(p, k):
     """
@@ -44,8 +501,8 @@ def calculate_geometric_distribution(p, k):
         raise ValueError("Probability 'p' must be in (0, 1]")
     if k < 1:
         raise ValueError("Number of trials 'k' must be >= 1")
-        
-    return ((1 - p)**(k - 1)) * p
+
+    return float(geometric_pmf(k, p))
 
 def calculate_exponential_distribution(rate, lower, upper):
     """
@@ -54,9 +511,5 @@ def calculate_exponential_distribution(rate, lower, upper):
     """
     if rate <= 0:
         raise ValueError("Rate 'λ' must be positive")
-    
-    def cdf(x):
-        if x < 0: return 0
-        return 1 - exp(-rate * x)
-        
-    return cdf(upper) - cdf(lower)
+
+    return float(exponential_cdf(upper, rate) - exponential_cdf(lower, rate))
@@ -0,0 +1,458 @@
+"""
+Special functions used by the calculators, with a pure NumPy / `math`
+implementation for environments without scipy (e.g. the stlite/Pyodide build).
+
+`special` is scipy.special when scipy is installed and this module otherwise;
+both provide ndtr, ndtri, gammaln, xlogy, xlog1py, bdtr, bdtrc, pdtr, pdtrc and stdtr
+with scipy's signatures. Set PROBCALC_PURE_MATH=1 to force the fallback.
+
+The fallback is whole-array NumPy: cephes' erf/erfc rational approximations,
+AS241 for ndtri, and Stirling's series for log-gamma. Only log-gamma below
+STIRLING_MIN is taken from math.lgamma one element at a time. Expect it to run
+about 1.5-3x slower than scipy; the incomplete beta/gamma functions iterate
+until the slowest element converges.
+"""
+import importlib.util
+import math
+import os
+import sys
+
+import numpy as np
+
+from modules.lazy import lazy_import
+
+HAVE_SCIPY = importlib.util.find_spec("scipy") is not None
+PURE = not HAVE_SCIPY or os.environ.get("PROBCALC_PURE_MATH", "").lower() in ("1", "true", "yes", "on")
+
+# Continued fraction / series settings: stop once a term changes the result by < 2 ulp
+EPSILON = 2 * np.finfo(float).eps
+TINY = 1e-300
+MAX_ITERATIONS = 100_000
+
+def _as_float(*args):
+    arrays = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in args))
+    return [np.array(a) for a in arrays]
+
+def _result(value):
+    return value[()] if isinstance(value, np.ndarray) and value.ndim == 0 else value
+
+# ---------------------------------------------------------------------------
+# Elementary pieces
+# ---------------------------------------------------------------------------
+
+# From here on log-gamma comes from Stirling's series; the incomplete beta
+# prefactors below also rearrange around it, so that large, nearly cancelling
+# log-gamma terms never appear
+STIRLING_MIN = 10.0
+_HALF_LOG_2PI = 0.5 * math.log(2 * math.pi)
+
+def _stirling_correction(x):
+    # lgamma(x) - ((x - 0.5) log x - x + log(2π)/2), accurate to 1e-16 for x >= 10
+    w = 1.0 / x
+    z = w * w
+    return (1 / 12 - z * (1 / 360 - z * (1 / 1260 - z * (1 / 1680 - z * (1 / 1188 - z * (691 / 360360 - z / 156)))))) * w
+
+def _lgamma(x):
+    try:
+        return math.lgamma(x)
+    except ValueError:
+        # Poles at 0, -1, -2, ...
+        return math.inf
+
+_LGAMMA = np.frompyfunc(_lgamma, 1, 1)
+
+def gammaln(x):
+    """
+    log|Γ(x)|: Stirling's series, vectorized, for x >= STIRLING_MIN; math.lgamma
+    element by element below that, where roots and poles need its care.
+    """
+    x = np.asarray(x, dtype=float)
+    large = (x >= STIRLING_MIN) & (x < np.inf)
+    out = np.empty_like(x)
+    with np.errstate(over="ignore"):
+        X = x[large]
+        out[large] = (X - 0.5) * np.log(X) - X + _HALF_LOG_2PI + _stirling_correction(X)
+    out[~large] = _LGAMMA(x[~large]).astype(float)
+    return _result(out)
+
+# erfc(x) is below the smallest subnormal float from here on
+ERFC_MAX = 27.3
+# erf and erfc rational approximations from cephes (ndtr.c), highest power first
+_ERF_T = [9.60497373987051638749e0, 9.00260197203842689217e1, 2.23200534594684319226e3,
+          7.00332514112805075473e3, 5.55923013010394962768e4]
+_ERF_U = [1.0, 3.35617141647503099647e1, 5.21357949780152679795e2, 4.59432382970980127987e3,
+          2.26290000613890934246e4, 4.92673942608635921086e4]
+_ERFC_P = [2.46196981473530512524e-10, 5.64189564831068821977e-1, 7.46321056442269912687e0,
+           4.86371970985681366614e1, 1.96520832956077098242e2, 5.26445194995477358631e2,
+           9.34528527171957607540e2, 1.02755188689515710272e3, 5.57535335369399327526e2]
+_ERFC_Q = [1.0, 1.32281951154744992508e1, 8.67072140885989742329e1, 3.54937778887819891062e2,
+           9.75708501743205489753e2, 1.82390916687909736289e3, 2.24633760818710981792e3,
+           1.65666309194161350182e3, 5.57535340817727675546e2]
+_ERFC_R = [5.64189583547755073984e-1, 1.27536670759978104416e0, 5.01905042251180477414e0,
+           6.16021097993053585195e0, 7.40974269950448939160e0, 2.97886665372100240670e0]
+_ERFC_S = [1.0, 2.26052863220117276590e0, 9.39603524938001434673e0, 1.20489539808096656605e1,
+           1.70814450747565897222e1, 9.60896809063285878019e0, 3.36907645100081516050e0]
+
+def _polyval(coefficients, x):
+    # Horner's rule in place (np.polyval allocates a new array per coefficient)
+    y = np.full_like(x, coefficients[0])
+    for c in coefficients[1:]:
+        y *= x
+        y += c
+    return y
+
+def _erf(x):
+    # |x| <= 1
+    z = x * x
+    return x * _polyval(_ERF_T, z) / _polyval(_ERF_U, z)
+
+def _erfc(a):
+    # a >= 0; erfc underflows to 0 past ERFC_MAX, so only smaller a are evaluated
+    out = np.zeros_like(a)
+    small = a < 1
+    out[small] = 1 - _erf(a[small])
+    for low, high, P, Q in ((1, 8, _ERFC_P, _ERFC_Q), (8, ERFC_MAX, _ERFC_R, _ERFC_S)):
+        part = (a >= low) & (a < high)
+        b = a[part]
+        # exp(-b²) as exp(-m²) exp(-(2m + f) f) with m = b rounded to 1/128, so m² is exact
+        m = np.round(b * 128) / 128
+        f = b - m
+        out[part] = np.exp(-m * m) * np.exp(-(2 * m + f) * f) * _polyval(P, b) / _polyval(Q, b)
+    out[np.isnan(a)] = np.nan
+    return out
+
+def xlogy(x, y):
+    """
+    x * log(y), defined as 0 where x == 0
+    """
+    x, y = _as_float(x, y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = x * np.log(y)
+    return _result(np.where((x == 0) & ~np.isnan(y), 0.0, value))
+
+def xlog1py(x, y):
+    """
+    x * log1p(y), defined as 0 where x == 0
+    """
+    x, y = _as_float(x, y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = x * np.log1p(y)
+    return _result(np.where((x == 0) & ~np.isnan(y), 0.0, value))
+
+def ndtr(x):
+    """
+    Standard normal CDF, via erf near 0 and erfc in the tails (as cephes does).
+    """
+    x = np.asarray(x, dtype=float)
+    z = x * math.sqrt(0.5)
+    central = np.abs(z) < math.sqrt(0.5)
+    out = np.empty_like(z)
+    out[central] = 0.5 + 0.5 * _erf(z[central])
+    tail = ~central
+    half_erfc = 0.5 * _erfc(np.abs(z[tail]))
+    out[tail] = np.where(z[tail] > 0, 1.0 - half_erfc, half_erfc)
+    out[np.isnan(x)] = np.nan
+    return _result(out)
+
+# Wichura's AS241 coefficients (numerator, denominator; highest power first), as in statistics.NormalDist
+_AS241_CENTRAL = ([2.5090809287301226727e+3, 3.3430575583588128105e+4, 6.7265770927008700853e+4,
+                   4.5921953931549871457e+4, 1.3731693765509461125e+4, 1.9715909503065514427e+3,
+                   1.3314166789178437745e+2, 3.3871328727963666080e+0],
+                  [5.2264952788528545610e+3, 2.8729085735721942674e+4, 3.9307895800092710610e+4,
+                   2.1213794301586595867e+4, 5.3941960214247511077e+3, 6.8718700749205790830e+2,
+                   4.2313330701600911252e+1, 1.0])
+_AS241_NEAR = ([7.7454501427834140764e-4, 2.2723844989269184583e-2, 2.4178072517745061177e-1,
+                1.2704582524523683826e+0, 3.6478483247632046050e+0, 5.7694972214606914055e+0,
+                4.6303378461565452959e+0, 1.4234371107496835773e+0],
+               [1.0507500716444168432e-9, 5.4759380849953449460e-4, 1.5198666563616457197e-2,
+                1.4810397642748007459e-1, 6.8976733498510000455e-1, 1.6763848301838038494e+0,
+                2.0531916266377588219e+0, 1.0])
+_AS241_FAR = ([2.0103343992922881327e-7, 2.7115555687434875782e-5, 1.2426609473880784386e-3,
+               2.6532189526576123093e-2, 2.9656057182850489123e-1, 1.7848265399172913358e+0,
+               5.4637849111641143699e+0, 6.6579046435011037772e+0],
+              [2.0442631033899397856e-15, 1.4215117583164458887e-7, 1.8463183175100546818e-5,
+               7.8686913114561325910e-4, 1.4875361290850614853e-2, 1.3692988092273580531e-1,
+               5.9983220655588793769e-1, 1.0])
+
+def _rational(coefficients, r):
+    numerator, denominator = coefficients
+    return _polyval(numerator, r) / _polyval(denominator, r)
+
+def _as241(p):
+    # Standard normal quantile for 0 < p <= 0.5
+    x = np.empty_like(p)
+    q = p - 0.5
+    central = q >= -0.425
+    x[central] = q[central] * _rational(_AS241_CENTRAL, 0.180625 - q[central] ** 2)
+    r = np.sqrt(-np.log(p[~central]))
+    near = r <= 5.0
+    r[near] = _rational(_AS241_NEAR, r[near] - 1.6)
+    r[~near] = _rational(_AS241_FAR, r[~near] - 5.0)
+    x[~central] = -r
+    return x
+
+def ndtri(q):
+    """
+    Inverse of ndtr: Wichura's AS241 (the algorithm of statistics.NormalDist) on
+    the smaller of q and 1 - q, refined by one Newton step against ndtr.
+    """
+    q = np.asarray(q, dtype=float)
+    lower = np.minimum(q, 1 - q)
+    inside = (lower > 0) & ~np.isnan(q)
+    x = np.where(q < 0.5, -np.inf, np.inf)
+    if np.any(inside):
+        z = _as241(lower[inside])
+        z -= (ndtr(z) - lower[inside]) / (np.exp(-0.5 * z * z) / math.sqrt(2 * math.pi))
+        x[inside] = np.where(q[inside] < 0.5, z, -z)
+    x[(q == 0.5)] = 0.0
+    x[np.isnan(q) | (q < 0) | (q > 1)] = np.nan
+    return _result(x)
+
+# ---------------------------------------------------------------------------
+# Regularized incomplete beta and gamma functions
+# ---------------------------------------------------------------------------
+
+def _log_beta_front(a, b, x, y):
+    """
+    log(x^a y^b / B(a, b)) with y = 1 - x.
+    """
+    out = a * np.log(x) + b * np.log(y) - (gammaln(a) + gammaln(b) - gammaln(a + b))
+    both = (a >= STIRLING_MIN) & (b >= STIRLING_MIN)
+    if np.any(both):
+        # a log(x/x0) + b log(y/y0) + log(ab/(a+b)/2π)/2 - corrections, x0 = a/(a+b)
+        A, B, X, Y = a[both], b[both], x[both], y[both]
+        total = A + B
+        x0, y0 = A / total, B / total
+        out[both] = (A * np.log1p((X - x0) / x0) + B * np.log1p((Y - y0) / y0)
+                     + 0.5 * np.log(A * B / total) - _HALF_LOG_2PI
+                     - _stirling_correction(A) - _stirling_correction(B) + _stirling_correction(total))
+    for big, small, big_x, small_x in ((a, b, x, y), (b, a, y, x)):
+        one = (big >= STIRLING_MIN) & (small < STIRLING_MIN)
+        if np.any(one):
+            # Stirling for Γ(big) / Γ(big + small) only; Γ(small) is taken as is
+            A, B, X, Y = big[one], small[one], big_x[one], small_x[one]
+            out[one] = (A * np.log(X) + B * np.log(Y * (A + B)) + (A - 0.5) * np.log1p(B / A) - B
+                        - gammaln(B) - _stirling_correction(A) + _stirling_correction(A + B))
+    return out
+
+def _log_gamma_front(a, x):
+    """
+    log(x^a e^-x / Γ(a)).
+    """
+    out = a * np.log(x) - x - gammaln(a)
+    big = a >= STIRLING_MIN
+    if np.any(big):
+        A, X = a[big], x[big]
+        u = (X - A) / A
+        out[big] = A * (np.log1p(u) - u) + 0.5 * np.log(A) - _HALF_LOG_2PI - _stirling_correction(A)
+    return out
+
+def _lentz(step, shape):
+    """
+    Modified Lentz evaluation of a1 / (b1 + a2 / (b2 + ...)) over arrays.
+    `step(m, idx)` returns (a_{m+1}, b_{m+1}) for the still-active indices.
+    """
+    h = np.full(shape, TINY)
+    c = np.full(shape, TINY)
+    d = np.zeros(shape)
+    active = np.arange(int(np.prod(shape)))
+    h, c, d = h.ravel(), c.ravel(), d.ravel()
+    for m in range(MAX_ITERATIONS):
+        if len(active) == 0:
+            break
+        num, den = step(m, active)
+        dm = den + num * d[active]
+        dm = np.where(np.abs(dm) < TINY, TINY, dm)
+        cm = den + num / c[active]
+        cm = np.where(np.abs(cm) < TINY, TINY, cm)
+        dm = 1.0 / dm
+        delta = cm * dm
+        d[active], c[active] = dm, cm
+        h[active] *= delta
+        active = active[np.abs(delta - 1.0) > EPSILON]
+    return h.reshape(shape)
+
+def _beta_fraction(a, b, x):
+    """
+    Continued fraction for I_x(a, b) (Numerical Recipes betacf); converges for x < (a+1)/(a+b+2).
+    """
+    a, b, x = a.ravel(), b.ravel(), x.ravel()
+
+    def step(m, i):
+        if m == 0:
+            return np.ones(len(i)), np.ones(len(i))
+        k = m // 2
+        if m % 2 == 0:
+            num = k * (b[i] - k) * x[i] / ((a[i] + 2 * k - 1) * (a[i] + 2 * k))
+        else:
+            num = -(a[i] + k) * (a[i] + b[i] + k) * x[i] / ((a[i] + 2 * k) * (a[i] + 2 * k + 1))
+        return num, np.ones(len(i))
+
+    return _lentz(step, a.shape)
+
+def _betainc(a, b, x, y):
+    """
+    I_x(a, b) with y = 1 - x passed separately so it keeps full precision.
+    """
+    out = np.where(x <= 0, 0.0, 1.0)
+    inner = (x > 0) & (y > 0)
+    if not np.any(inner):
+        return out
+    a, b, x, y = a[inner], b[inner], x[inner], y[inner]
+    swap = x > (a + 1) / (a + b + 2)
+    # Evaluate the fraction where it converges fast, using I_x(a,b) = 1 - I_y(b,a)
+    aa, bb = np.where(swap, b, a), np.where(swap, a, b)
+    xx, yy = np.where(swap, y, x), np.where(swap, x, y)
+    value = np.exp(_log_beta_front(aa, bb, xx, yy)) * _beta_fraction(aa, bb, xx) / aa
+    out[inner] = np.where(swap, 1.0 - value, value)
+    return out
+
+def betainc(a, b, x):
+    """
+    Regularized incomplete beta function I_x(a, b)
+    """
+    a, b, x = _as_float(a, b, x)
+    return _result(_betainc(a, b, x, 1.0 - x))
+
+def _gamma_series(a, x):
+    # P(a, x) = x^a e^-x / Γ(a+1) * Σ x^n / ((a+1)...(a+n))
+    total = np.ones_like(x)
+    term = np.ones_like(x)
+    active = np.arange(len(x))
+    n = 0
+    while len(active) and n < MAX_ITERATIONS:
+        n += 1
+        term[active] *= x[active] / (a[active] + n)
+        total[active] += term[active]
+        active = active[term[active] > total[active] * EPSILON]
+    return np.exp(_log_gamma_front(a, x)) * total / a
+
+def _gamma_fraction(a, x):
+    # Q(a, x) = x^a e^-x / Γ(a) * 1 / (x + 1 - a - 1(1-a) / (x + 3 - a - ...))
+    def step(m, i):
+        if m == 0:
+            return np.ones(len(i)), x[i] + 1 - a[i]
+        return -m * (m - a[i]), x[i] + 2 * m + 1 - a[i]
+
+    return np.exp(_log_gamma_front(a, x)) * _lentz(step, x.shape)
+
+def _gammainc_pair(a, x):
+    """
+    (P, Q) = lower and upper regularized incomplete gamma functions.
+    """
+    a, x = _as_float(a, x)
+    a, x = a.ravel(), x.ravel()
+    lower, upper = np.zeros_like(x), np.ones_like(x)
+    lower[np.isinf(x)], upper[np.isinf(x)] = 1.0, 0.0
+    series = (x > 0) & (x < a + 1)
+    fraction = (x >= a + 1) & np.isfinite(x)
+    lower[series] = _gamma_series(a[series], x[series])
+    upper[series] = 1.0 - lower[series]
+    upper[fraction] = _gamma_fraction(a[fraction], x[fraction])
+    lower[fraction] = 1.0 - upper[fraction]
+    return lower, upper
+
+def gammainc(a, x):
+    """
+    Regularized lower incomplete gamma function P(a, x)
+    """
+    shape = np.broadcast(np.asarray(a), np.asarray(x)).shape
+    return _result(_gammainc_pair(a, x)[0].reshape(shape))
+
+def gammaincc(a, x):
+    """
+    Regularized upper incomplete gamma function Q(a, x)
+    """
+    shape = np.broadcast(np.asarray(a), np.asarray(x)).shape
+    return _result(_gammainc_pair(a, x)[1].reshape(shape))
+
+# ---------------------------------------------------------------------------
+# Distribution functions (scipy.special names and argument order)
+# ---------------------------------------------------------------------------
+
+def bdtr(k, n, p):
+    """
+    Binomial CDF P(X<=k) = I_{1-p}(n-k, k+1)
+    """
+    k, n, p = _as_float(k, n, p)
+    k = np.floor(k)
+    inner = (k >= 0) & (k < n)
+    out = np.where(k >= n, 1.0, 0.0)
+    out[inner] = _betainc(n[inner] - k[inner], k[inner] + 1, 1.0 - p[inner], p[inner])
+    return _result(out)
+
+def bdtrc(k, n, p):
+    """
+    Binomial survival function P(X>k) = I_p(k+1, n-k)
+    """
+    k, n, p = _as_float(k, n, p)
+    k = np.floor(k)
+    inner = (k >= 0) & (k < n)
+    out = np.where(k < 0, 1.0, 0.0)
+    out[inner] = _betainc(k[inner] + 1, n[inner] - k[inner], p[inner], 1.0 - p[inner])
+    return _result(out)
+
+def pdtr(k, m):
+    """
+    Poisson CDF P(X<=k) = Q(k+1, m)
+    """
+    k, m = _as_float(k, m)
+    return _result(np.where(k < 0, 0.0, gammaincc(np.floor(np.maximum(k, 0)) + 1, m)))
+
+def pdtrc(k, m):
+    """
+    Poisson survival function P(X>k) = P(k+1, m)
+    """
+    k, m = _as_float(k, m)
+    return _result(np.where(k < 0, 1.0, gammainc(np.floor(np.maximum(k, 0)) + 1, m)))
+
+def stdtr(df, t):
+    """
+    Student-t CDF with df degrees of freedom, via I_{df/(df+t^2)}(df/2, 1/2)
+    """
+    df, t = _as_float(df, t)
+    t2 = t * t
+    with np.errstate(invalid="ignore"):
+        x = np.where(np.isinf(t), 0.0, df / (df + t2))
+        y = np.where(np.isinf(t), 1.0, t2 / (df + t2))
+    tail = 0.5 * _betainc(df / 2, np.full_like(df, 0.5), x, y)
+    out = np.where(t < 0, tail, 1.0 - tail)
+    out[np.isnan(t) | np.isnan(df)] = np.nan
+    return _result(out)
+
+# ---------------------------------------------------------------------------
+# Sample statistics (scipy.stats semantics, NumPy only)
+# ---------------------------------------------------------------------------
+
+def skew(data):
+    """
+    Biased sample skewness m3 / m2^1.5, like scipy.stats.skew; NaN for constant data.
+    """
+    data = np.asarray(data, dtype=float)
+    mean = data.mean()
+    deviations = data - mean
+    m2 = np.mean(deviations ** 2)
+    m3 = np.mean(deviations ** 3)
+    if m2 <= (np.finfo(float).resolution * mean) ** 2:
+        return float("nan")
+    return m3 / m2 ** 1.5
+
+def mode(data):
+    """
+    Most frequent value (the smallest one on ties), like scipy.stats.mode.
+    """
+    values, counts = np.unique(np.asarray(data), return_counts=True)
+    return values[np.argmax(counts)]
+
+def ttest_1samp(data, population_mean):
+    """
+    One-sample two-sided t-test. Returns (t statistic, p-value).
+    """
+    data = np.asarray(data, dtype=float)
+    n = len(data)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_stat = (data.mean() - population_mean) / (data.std(ddof=1) / np.sqrt(n))
+    p_value = 2 * special.stdtr(n - 1, -np.abs(t_stat))
+    return t_stat, p_value
+
+special = sys.modules[__name__] if PURE else lazy_import("scipy.special")
@@ -0,0 +1,212 @@
+"""
+Opt-in latency instrumentation.
+
+Set PROBCALC_METRICS=1 to record call counts and latency histograms for the
+instrumented functions; PROBCALC_METRICS_PORT=<port> additionally serves them
+in Prometheus text format at http://localhost:<port>/metrics. When disabled,
+decorators return the original function and proxies return the wrapped
+module untouched, so there is no per-call overhead.
+"""
+import bisect
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ENABLED = os.environ.get("PROBCALC_METRICS", "").lower() in ("1", "true", "yes", "on")
+
+# Histogram bucket upper bounds in seconds (Prometheus "le" labels)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+_METRICS = {}
+_LOCK = threading.Lock()
+_SERVER = None
+
+class Metric:
+    """
+    Call count, total time and latency histogram for one instrumented name.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(BUCKETS, seconds)
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+            self.buckets[index] += 1
+
+    def percentile(self, q):
+        """
+        Upper bound of the bucket holding the q-quantile (q in [0, 1]).
+        """
+        if self.count == 0:
+            return float("nan")
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.buckets):
+            seen += n
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "calls": self.count,
+            "total_s": self.total,
+            "mean_ms": 1e3 * self.total / self.count if self.count else float("nan"),
+            "p50_ms": 1e3 * self.percentile(0.5),
+            "p95_ms": 1e3 * self.percentile(0.95),
+            "max_ms": 1e3 * self.max,
+        }
+
+def get_metric(name):
+    with _LOCK:
+        if name not in _METRICS:
+            _METRICS[name] = Metric(name)
+        return _METRICS[name]
+
+@contextmanager
+def _timer(name):
+    metric = get_metric(name)
+    start = time.perf_counter()
+    try:
+        yield metric
+    finally:
+        metric.observe(time.perf_counter() - start)
+
+def timed(name):
+    """
+    Time a block (`with timed("x"):`) or a function (`@timed("x")`).
+    Disabled instrumentation returns a no-op context / the undecorated function.
+    """
+    return _Timed(name)
+
+class _Timed:
+    def __init__(self, name):
+        self.name = name
+        self._context = None
+
+    def __call__(self, func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _timer(self.name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def __enter__(self):
+        self._context = _timer(self.name) if ENABLED else nullcontext()
+        return self._context.__enter__()
+
+    def __exit__(self, *exc):
+        return self._context.__exit__(*exc)
+
+class InstrumentedModule:
+    """
+    Attribute proxy timing every public function of a module (or module proxy).
+    """
+    def __init__(self, module, prefix):
+        self._module = module
+        self._prefix = prefix
+        self._wrapped = {}
+
+    def __getattr__(self, attr):
+        value = getattr(self._module, attr)
+        if attr.startswith("_") or not inspect.isfunction(value):
+            return value
+        if attr not in self._wrapped:
+            self._wrapped[attr] = timed(f"{self._prefix}.{attr}")(value)
+        return self._wrapped[attr]
+
+_PROXIES = {}
+
+def instrumented(module, prefix=None):
+    """
+    Return a timing proxy for `module`, or the module itself when disabled.
+    """
+    if not ENABLED:
+        return module
+    prefix = prefix or getattr(module, "__name__", type(module).__name__).split(".")[-1]
+    if prefix not in _PROXIES:
+        _PROXIES[prefix] = InstrumentedModule(module, prefix)
+    return _PROXIES[prefix]
+
+def snapshot():
+    """
+    Summary of every metric, keyed by name.
+    """
+    with _LOCK:
+        metrics = list(_METRICS.values())
+    return {m.name: m.summary() for m in sorted(metrics, key=lambda m: m.name)}
+
+def export_json():
+    return json.dumps(snapshot(), indent=2)
+
+def export_prometheus():
+    """
+    Metrics in the Prometheus text exposition format.
+    """
+    lines = [
+        "# HELP probcalc_call_duration_seconds Latency of instrumented calls.",
+        "# TYPE probcalc_call_duration_seconds histogram",
+    ]
+    with _LOCK:
+        metrics = sorted(_METRICS.values(), key=lambda m: m.name)
+    for metric in metrics:
+        label = metric.name.replace("\\", "\\\\").replace('"', '\\"')
+        cumulative = 0
+        for bound, n in zip(BUCKETS, metric.buckets):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'probcalc_call_duration_seconds_bucket{{name="{label}",le="{le}"}} {cumulative}')
+        lines.append(f'probcalc_call_duration_seconds_sum{{name="{label}"}} {metric.total}')
+        lines.append(f'probcalc_call_duration_seconds_count{{name="{label}"}} {metric.count}')
+    return "\n".join(lines) + "\n"
+
+def reset():
+    with _LOCK:
+        _METRICS.clear()
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("/metrics", ""):
+            self.send_error(404)
+            return
+        body = export_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def start_http_server(port=None, host="127.0.0.1"):
+    """
+    Serve /metrics for a local scraper (once per process). Returns the server or None.
+    """
+    global _SERVER
+    port = port or os.environ.get("PROBCALC_METRICS_PORT")
+    if not ENABLED or not port or _SERVER is not None:
+        return _SERVER
+    try:
+        _SERVER = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+    except OSError:
+        # Another app process on this host already serves the port
+        return None
+    threading.Thread(target=_SERVER.serve_forever, name="metrics-server", daemon=True).start()
+    return _SERVER
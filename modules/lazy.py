@@ -0,0 +1,29 @@
+import importlib
+import sys
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access, so
+    heavy dependencies (scipy, pandas, plotly) only load when a code path needs them.
+    """
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+def lazy_import(name):
+    """
+    Return the module if it is already imported, else a LazyModule for it.
+    """
+    return sys.modules.get(name) or LazyModule(name)
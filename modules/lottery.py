@@ -0,0 +1,211 @@
+"""
+Lottery games: exact odds of every prize tier, ticket expected value, and a
+ticket simulator.
+
+A game draws `pick` of `pool` white balls and, from a separate drum,
+`bonus_pick` of `bonus_pool` bonus balls. Tier (w, b) is a ticket matching
+exactly w white and b bonus balls; its probability is a product of two
+hypergeometric terms.
+
+    prize_tiers(69, 5, 26, 1)[(5, 1)]                  # Powerball jackpot, 1 / 292,201,338
+    expected_value(69, 5, 26, 1, {**POWERBALL_PRIZES, (5, 1): 500e6}, ticket_price=2, tickets_sold=100e6)
+
+Simulated tickets are bitmasks packed into uint64 words (one bit per ball),
+so matching a ticket against the draw is an AND followed by a popcount.
+Tickets are generated and scored in chunks, which bounds memory for runs of
+hundreds of millions of tickets.
+"""
+from fractions import Fraction
+from math import comb, prod
+
+import numpy as np
+
+# Powerball fixed prizes by (white, bonus) matches; the jackpot tier (5, 1) is pari-mutuel
+POWERBALL = (69, 5, 26, 1)
+POWERBALL_PRIZES = {
+    (5, 0): 1_000_000, (4, 1): 50_000, (4, 0): 100, (3, 1): 100,
+    (3, 0): 7, (2, 1): 7, (1, 1): 4, (0, 1): 4,
+}
+# Tickets generated and scored per chunk
+TICKET_CHUNK = 1 << 20
+# Tickets are drawn with replacement and redrawn on a repeat while P(no repeat) is at least this;
+# below it, Floyd's sampling without replacement
+REDRAW_MIN = 0.5
+# Masks for the bit-parallel (SWAR) popcount of a 64-bit word
+M1, M2, M4 = np.uint64(0x5555555555555555), np.uint64(0x3333333333333333), np.uint64(0x0F0F0F0F0F0F0F0F)
+H01 = np.uint64(0x0101010101010101)
+ONE, SIX, LOW = np.uint64(1), np.uint64(6), np.uint64(63)
+
+def _game(pool, pick, bonus_pool=0, bonus_pick=0):
+    values = (pool, pick, bonus_pool, bonus_pick)
+    if any(v != int(v) or v < 0 for v in values):
+        raise ValueError("Ball counts must be non-negative integers")
+    pool, pick, bonus_pool, bonus_pick = (int(v) for v in values)
+    if not 0 < pick <= pool:
+        raise ValueError("Balls to pick must be between 1 and the number of balls")
+    if bonus_pick > bonus_pool:
+        raise ValueError("Bonus balls to pick cannot exceed the number of bonus balls")
+    return pool, pick, bonus_pool, bonus_pick
+
+def match_probabilities(pool, pick):
+    """
+    P(a ticket of `pick` numbers matches exactly m of the `pick` drawn from `pool`), for m = 0..pick.
+    """
+    pool, pick, _, _ = _game(pool, pick)
+    total = comb(pool, pick)
+    return [Fraction(comb(pick, m) * comb(pool - pick, pick - m), total) for m in range(pick + 1)]
+
+def prize_tiers(pool, pick, bonus_pool=0, bonus_pick=0):
+    """
+    Exact probability of every (white matches, bonus matches) tier, best tier first.
+    Returns: dict (w, b) -> probability
+    """
+    pool, pick, bonus_pool, bonus_pick = _game(pool, pick, bonus_pool, bonus_pick)
+    white = match_probabilities(pool, pick)
+    bonus = match_probabilities(bonus_pool, bonus_pick) if bonus_pick else [Fraction(1)]
+    return {(w, b): float(white[w] * bonus[b])
+            for w in range(pick, -1, -1) for b in range(len(bonus) - 1, -1, -1)}
+
+def jackpot_probability(pool, pick, bonus_pool=0, bonus_pick=0):
+    """
+    P(matching every white and every bonus ball).
+    """
+    pool, pick, bonus_pool, bonus_pick = _game(pool, pick, bonus_pool, bonus_pick)
+    return 1 / (comb(pool, pick) * comb(bonus_pool, bonus_pick))
+
+def jackpot_share(probability, tickets_sold):
+    """
+    Expected fraction of the jackpot a winning ticket keeps when `tickets_sold`
+    independent random tickets (including it) are in play: E[1 / (1 + K)] with
+    K ~ Binomial(tickets_sold - 1, p), which is (1 - (1 - p)^N) / (N p).
+    """
+    if not 0 < probability <= 1:
+        raise ValueError("Jackpot probability must be in (0, 1]")
+    if tickets_sold < 1:
+        return 1.0
+    if probability == 1:
+        return 1 / tickets_sold
+    return float(-np.expm1(tickets_sold * np.log1p(-probability)) / (tickets_sold * probability))
+
+def expected_value(pool, pick, bonus_pool=0, bonus_pick=0, prizes=None, ticket_price=0.0, tickets_sold=0):
+    """
+    Expected winnings of one ticket for a prize table (dict (w, b) -> amount;
+    missing tiers pay nothing). With tickets_sold, the jackpot tier's prize is
+    shared with the other expected winners (see jackpot_share).
+    """
+    tiers = prize_tiers(pool, pick, bonus_pool, bonus_pick)
+    prizes = dict(prizes or {})
+    unknown = [tier for tier in prizes if tuple(tier) not in tiers]
+    if unknown:
+        raise ValueError(f"Unknown prize tiers {unknown}; tiers are (white matches, bonus matches)")
+    top = next(iter(tiers))
+    share = jackpot_share(tiers[top], tickets_sold)
+    expected = sum(tiers[tuple(tier)] * amount * (share if tuple(tier) == top else 1.0)
+                   for tier, amount in prizes.items())
+    return {
+        "Expected Prize": expected,
+        "Expected Value": expected - ticket_price,
+        "Return per Dollar": expected / ticket_price if ticket_price > 0 else float("nan"),
+        "Win Probability": sum(tiers[tuple(tier)] for tier, amount in prizes.items() if amount > 0),
+        "Jackpot Share": share,
+    }
+
+# ---------------------------------------------------------------------------
+# Simulation
+# ---------------------------------------------------------------------------
+
+def popcount(words):
+    """
+    Set bits in each row of a (rows, words) uint64 array, counted a word at a
+    time with shifts and masks (numpy 1.x has no popcount ufunc).
+    """
+    x = np.asarray(words, dtype=np.uint64)
+    x = x - ((x >> ONE) & M1)
+    x = (x & M2) + ((x >> np.uint64(2)) & M2)
+    x = (x + (x >> np.uint64(4))) & M4
+    counts = (x * H01) >> np.uint64(56)
+    return counts.sum(axis=-1, dtype=np.int64)
+
+def _draw_mask(balls, pool, pick, name):
+    # Bitmask of a fixed draw given as ball numbers 1..pool
+    balls = np.asarray(balls, dtype=np.int64).ravel()
+    if len(balls) != pick or len(set(balls.tolist())) != pick or np.any((balls < 1) | (balls > pool)):
+        raise ValueError(f"The {name} draw needs {pick} distinct numbers from 1 to {pool}")
+    mask = np.zeros((1, (pool + 63) // 64), dtype=np.uint64)
+    for ball in (balls - 1).tolist():
+        mask[0, ball // 64] |= np.uint64(1 << (ball % 64))
+    return mask
+
+def _redraw_masks(rng, masks, todo, pool, pick):
+    # Draw with replacement, OR-ing one column of balls at a time; rows that repeated a number redraw
+    while len(todo):
+        balls = rng.integers(0, pool, size=(pick, len(todo)), dtype=np.uint64)
+        bits = ONE << (balls & LOW)
+        word = balls >> SIX
+        if len(masks) == 1:
+            new = np.bitwise_or.reduce(bits, axis=0)[None]
+        else:
+            # Scatter every ball's bit into its word in one unbuffered OR
+            new = np.zeros((len(masks), len(todo)), dtype=np.uint64)
+            np.bitwise_or.at(new, (word.astype(np.intp), np.broadcast_to(np.arange(len(todo)), word.shape)), bits)
+        masks[:, todo] = new
+        todo = todo[popcount(new.T) < pick]
+
+def _floyd_masks(rng, masks, pool, pick):
+    # Floyd's algorithm: for j = pool - pick .. pool - 1, take a uniform t <= j, or j itself if t is taken
+    rows = np.arange(masks.shape[1])
+    for j in range(pool - pick, pool):
+        t = rng.integers(0, j + 1, size=len(rows), dtype=np.uint64)
+        taken = ((masks[(t >> SIX).astype(np.intp), rows] >> (t & LOW)) & ONE).astype(bool)
+        t[taken] = j
+        masks[(t >> SIX).astype(np.intp), rows] |= ONE << (t & LOW)
+
+def random_masks(rng, rows, pool, pick):
+    """
+    `rows` random tickets of `pick` distinct numbers out of `pool`, as bitmasks
+    of shape (rows, ceil(pool / 64)).
+    """
+    masks = np.zeros(((pool + 63) // 64, rows), dtype=np.uint64)
+    if prod((pool - j) / pool for j in range(pick)) >= REDRAW_MIN:
+        _redraw_masks(rng, masks, np.arange(rows), pool, pick)
+    else:
+        _floyd_masks(rng, masks, pool, pick)
+    return masks.T
+
+def simulate_tickets(pool, pick, bonus_pool=0, bonus_pick=0, num_tickets=10**6, draw=None, bonus_draw=None,
+                     seed=None, chunk_size=TICKET_CHUNK):
+    """
+    Score `num_tickets` random tickets against one draw (ball numbers from 1;
+    drawn at random when not given). Returns Tickets, Draw, Bonus Draw, Tier
+    Counts (dict (w, b) -> tickets, best tier first) and Jackpot Winners.
+    """
+    pool, pick, bonus_pool, bonus_pick = _game(pool, pick, bonus_pool, bonus_pick)
+    if num_tickets < 0:
+        raise ValueError("Number of tickets must be non-negative")
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be at least 1")
+    rng = np.random.default_rng(seed)
+    if draw is None:
+        draw = np.sort(rng.choice(pool, pick, replace=False)) + 1
+    if bonus_draw is None:
+        bonus_draw = np.sort(rng.choice(bonus_pool, bonus_pick, replace=False)) + 1
+    white_mask = _draw_mask(draw, pool, pick, "white")
+    bonus_mask = _draw_mask(bonus_draw, bonus_pool, bonus_pick, "bonus") if bonus_pick else None
+
+    tiers = (pick + 1) * (bonus_pick + 1)
+    counts = np.zeros(tiers, dtype=np.int64)
+    for start in range(0, int(num_tickets), int(chunk_size)):
+        rows = min(int(chunk_size), int(num_tickets) - start)
+        tier = popcount(random_masks(rng, rows, pool, pick) & white_mask) * (bonus_pick + 1)
+        if bonus_pick:
+            tier += popcount(random_masks(rng, rows, bonus_pool, bonus_pick) & bonus_mask)
+        counts += np.bincount(tier, minlength=tiers)
+
+    counts = counts.reshape(pick + 1, bonus_pick + 1)
+    return {
+        "Tickets": int(num_tickets),
+        "Draw": [int(b) for b in draw],
+        "Bonus Draw": [int(b) for b in bonus_draw],
+        "Tier Counts": {(w, b): int(counts[w, b]) for w in range(pick, -1, -1) for b in range(bonus_pick, -1, -1)},
+        "Jackpot Winners": int(counts[pick, bonus_pick]),
+    }
@@ -0,0 +1,315 @@
+from itertools import chain, combinations, combinations_with_replacement, islice
+from math import comb
+
+import numpy as np
+
+# Cards are integers 0..51: rank = card // 4 (0 = deuce ... 12 = ace), suit = card % 4
+RANKS = "23456789TJQKA"
+SUITS = "cdhs"
+
+HAND_CATEGORIES = [
+    "High Card", "Pair", "Two Pair", "Three of a Kind", "Straight",
+    "Flush", "Full House", "Four of a Kind", "Straight Flush",
+]
+
+# Runout/opponent combinations up to which equity is enumerated exactly; a
+# flop (<= 1,081 runouts) is instant, preflop (~1.7M) goes to Monte Carlo
+MAX_EXACT_RUNOUTS = 100_000
+
+# Hands evaluated per vectorized block
+EVAL_BLOCK = 1 << 18
+
+# ---------------------------------------------------------------------------
+# Lookup tables, indexed by a 13-bit rank mask (bit r set = rank r present)
+# ---------------------------------------------------------------------------
+
+def _build_tables():
+    masks = np.arange(1 << 13)
+    bits = (masks[:, None] >> np.arange(13)) & 1
+
+    popcount = bits.sum(axis=1)
+    # Highest rank present (0 for the empty mask; callers never rely on that)
+    high = np.where(masks > 0, 12 - np.argmax(bits[:, ::-1], axis=1), 0)
+
+    # Five highest ranks packed into 4-bit nibbles, highest first
+    top5 = np.zeros(len(masks), dtype=np.int64)
+    remaining = masks.copy()
+    for shift in (16, 12, 8, 4, 0):
+        h = np.where(remaining > 0, 12 - np.argmax(((remaining[:, None] >> np.arange(13)) & 1)[:, ::-1], axis=1), 0)
+        top5 |= np.where(remaining > 0, h, 0) << shift
+        remaining = np.where(remaining > 0, remaining & ~(1 << h), 0)
+
+    # Highest straight (rank of its top card), 0 when there is none; A-2-3-4-5 counts as 5-high (3)
+    straight = np.zeros(len(masks), dtype=np.int64)
+    for top in range(12, 3, -1):
+        window = 0b11111 << (top - 4)
+        straight = np.where((straight == 0) & ((masks & window) == window), top, straight)
+    wheel = (1 << 12) | 0b1111
+    straight = np.where((straight == 0) & ((masks & wheel) == wheel), 3, straight)
+
+    return popcount, high, top5, straight
+
+POPCOUNT, HIGH_RANK, TOP5, STRAIGHT_HIGH = _build_tables()
+
+# ---------------------------------------------------------------------------
+# Card parsing
+# ---------------------------------------------------------------------------
+
+def parse_card(card):
+    """
+    Convert a card like "As", "Td" or "9h" to its integer code.
+    """
+    if isinstance(card, (int, np.integer)):
+        if not 0 <= card < 52:
+            raise ValueError(f"Card code {card} out of range 0-51")
+        return int(card)
+    card = card.strip()
+    if len(card) != 2 or card[0].upper() not in RANKS or card[1].lower() not in SUITS:
+        raise ValueError(f"Invalid card '{card}'. Use rank (2-9, T, J, Q, K, A) + suit (c, d, h, s)")
+    return RANKS.index(card[0].upper()) * 4 + SUITS.index(card[1].lower())
+
+def parse_cards(cards):
+    """
+    Parse a list of cards or a string like "As Kd" / "AsKd" into integer codes.
+    """
+    if isinstance(cards, str):
+        text = cards.replace(",", " ").replace(" ", "")
+        cards = [text[i:i + 2] for i in range(0, len(text), 2)]
+    return [parse_card(c) for c in cards]
+
+# ---------------------------------------------------------------------------
+# Evaluator
+# ---------------------------------------------------------------------------
+
+def _evaluate_block(hands):
+    """
+    Direct (table-free) scoring of an (N, 5-7) block; used to build the lookup tables.
+    """
+    n = len(hands)
+    rows = np.arange(n)[:, None]
+    ranks = hands >> 2
+    suits = hands & 3
+
+    # Per-row histograms via one flat bincount each: rank counts, and one 13-bit
+    # rank mask per suit (a suit holds each rank at most once, so sum == OR)
+    counts = np.bincount((rows * 13 + ranks).ravel(), minlength=n * 13).reshape(n, 13)
+    suit_masks = np.bincount((rows * 4 + suits).ravel(), weights=np.left_shift(1, ranks).ravel(),
+                             minlength=n * 4).reshape(n, 4).astype(np.int64)
+
+    rank_mask = np.bitwise_or.reduce(suit_masks, axis=1)
+    # Rank masks grouped by multiplicity: column c holds the ranks seen exactly c times
+    weights = np.broadcast_to(np.left_shift(1, np.arange(13)), counts.shape)
+    by_count = np.bincount((rows * 5 + counts).ravel(), weights=weights.ravel(),
+                           minlength=n * 5).reshape(n, 5).astype(np.int64)
+    pair_mask, trip_mask, quad_mask = by_count[:, 2], by_count[:, 3], by_count[:, 4]
+
+    flush_mask = np.where(POPCOUNT[suit_masks] >= 5, suit_masks, 0).max(axis=1)
+    straight_flush = STRAIGHT_HIGH[flush_mask]
+    straight = STRAIGHT_HIGH[rank_mask]
+
+    quad = HIGH_RANK[quad_mask]
+    trip = HIGH_RANK[trip_mask]
+    # Full house pair: the best remaining trips or pair
+    full_pair = HIGH_RANK[(trip_mask & ~(1 << trip)) | pair_mask]
+    pair1 = HIGH_RANK[pair_mask]
+    pair2 = HIGH_RANK[pair_mask & ~(1 << pair1)]
+
+    without_quad = rank_mask & ~(1 << quad)
+    without_trip = rank_mask & ~(1 << trip)
+    without_pair = rank_mask & ~(1 << pair1)
+    without_pairs = without_pair & ~(1 << pair2)
+
+    conditions = [
+        straight_flush > 0,
+        quad_mask > 0,
+        (trip_mask > 0) & ((POPCOUNT[trip_mask] >= 2) | (pair_mask > 0)),
+        flush_mask > 0,
+        straight > 0,
+        trip_mask > 0,
+        POPCOUNT[pair_mask] >= 2,
+        pair_mask > 0,
+    ]
+    values = [
+        (8 << 20) | (straight_flush << 16),
+        (7 << 20) | (quad << 16) | (HIGH_RANK[without_quad] << 12),
+        (6 << 20) | (trip << 16) | (full_pair << 12),
+        (5 << 20) | TOP5[flush_mask],
+        (4 << 20) | (straight << 16),
+        (3 << 20) | (trip << 16) | ((TOP5[without_trip] >> 12) << 8),
+        (2 << 20) | (pair1 << 16) | (pair2 << 12) | (HIGH_RANK[without_pairs] << 8),
+        (1 << 20) | (pair1 << 16) | ((TOP5[without_pair] >> 8) << 4),
+    ]
+    return np.select(conditions, values, default=TOP5[rank_mask])
+
+# Rank weights whose sums differ for any two multisets of the same size (5, 6
+# or 7 cards, at most 4 of a rank), so a hand's rank sum indexes a table directly
+RANK_WEIGHTS = np.array([0, 1, 5, 22, 98, 453, 2031, 8698, 22854, 83661, 262349, 636345, 1479181], dtype=np.int64)
+# Card keys: the rank weight in the low SUIT_SHIFT bits, 8**suit above them, so one
+# sum per hand gives both the rank key and a suit histogram (no carries for 7 cards)
+SUIT_SHIFT = 23
+_CARD_KEYS = RANK_WEIGHTS[np.arange(52) >> 2] | (8 ** (np.arange(52) & 3)) << SUIT_SHIFT
+_TABLES = {}
+
+def _hand_tables():
+    """
+    Build (once) the flush tables: the flush score for every 13-bit rank mask,
+    and the flush suit (or -1) for every suit histogram.
+    """
+    if not _TABLES:
+        flush_scores = np.where(STRAIGHT_HIGH > 0, (8 << 20) | (STRAIGHT_HIGH << 16), (5 << 20) | TOP5)
+        _TABLES["flush"] = np.where(POPCOUNT >= 5, flush_scores, -1)
+
+        suit_keys = np.arange(8 ** 4)
+        suit_counts = (suit_keys[:, None] >> (3 * np.arange(4))) & 7
+        _TABLES["flush_suit"] = np.where((suit_counts >= 5).any(axis=1), np.argmax(suit_counts >= 5, axis=1), -1)
+    return _TABLES
+
+def _rank_table(size):
+    """
+    Build (once per hand size) the non-flush score of every rank multiset,
+    indexed directly by its rank key: a uint16 index into the distinct scores.
+    """
+    key = f"ranks{size}"
+    if key not in _TABLES:
+        ranks = np.array(list(combinations_with_replacement(range(13), size)))
+        # Sorted tuples: a rank appears 5+ times iff some m[i] == m[i + 4]
+        ranks = ranks[~(ranks[:, 4:] == ranks[:, :-4]).any(axis=1)]
+        keys = RANK_WEIGHTS[ranks].sum(axis=1)
+        # Dealing suits round-robin keeps equal ranks apart and never makes a flush
+        scores, index = np.unique(_evaluate_block(ranks * 4 + np.arange(size) % 4), return_inverse=True)
+        table = np.zeros(keys.max() + 1, dtype=np.uint16)
+        table[keys] = index
+        _TABLES[key] = (table, scores)
+    return _TABLES[key]
+
+def _lookup_block(hands):
+    tables = _hand_tables()
+    table, distinct = _rank_table(hands.shape[1])
+    keys = _CARD_KEYS[hands].sum(axis=1)
+    scores = distinct[table[keys & ((1 << SUIT_SHIFT) - 1)]]
+
+    # With 5+ cards of one suit the flush always beats the best non-flush hand
+    flush_suit = tables["flush_suit"][keys >> SUIT_SHIFT]
+    flushed = np.flatnonzero(flush_suit >= 0)
+    if len(flushed):
+        cards = hands[flushed]
+        in_suit = (cards & 3) == flush_suit[flushed, None]
+        flush_mask = np.where(in_suit, np.left_shift(1, cards >> 2), 0).sum(axis=1)
+        scores[flushed] = tables["flush"][flush_mask]
+    return scores
+
+def evaluate_hands(hands):
+    """
+    Score 5-7 card hands given as an (N, cards) array of card codes.
+    Higher scores are better hands; equal scores tie. The category index
+    (see HAND_CATEGORIES) is score >> 20.
+    """
+    hands = np.asarray(hands, dtype=np.int64)
+    if hands.ndim == 1:
+        return int(evaluate_hands(hands[None, :])[0])
+    if not 5 <= hands.shape[1] <= 7:
+        raise ValueError("Hands must have between 5 and 7 cards")
+    scores = np.empty(len(hands), dtype=np.int64)
+    for start in range(0, len(hands), EVAL_BLOCK):
+        scores[start:start + EVAL_BLOCK] = _lookup_block(hands[start:start + EVAL_BLOCK])
+    return scores
+
+def hand_category(score):
+    return HAND_CATEGORIES[int(score) >> 20]
+
+# ---------------------------------------------------------------------------
+# Equity
+# ---------------------------------------------------------------------------
+
+def _showdown(player_cards, boards):
+    """
+    player_cards: (players, N, 2); boards: (N, 5).
+    Returns per-player counts of outright wins, split pots and losses, plus the
+    pot share (a k-way split counts 1/k).
+    """
+    scores = np.stack([evaluate_hands(np.concatenate([holes, boards], axis=1)) for holes in player_cards])
+    winners = scores == scores.max(axis=0)
+    n_winners = winners.sum(axis=0)
+    win = (winners & (n_winners == 1)).sum(axis=1)
+    tie = (winners & (n_winners > 1)).sum(axis=1)
+    lose = (~winners).sum(axis=1)
+    share = np.where(winners, 1.0 / n_winners, 0.0).sum(axis=1)
+    return np.array([win, tie, lose, share], dtype=float)
+
+def _equity_exact(known_holes, board, deck):
+    # Runouts are streamed in blocks of EVAL_BLOCK, so memory stays flat however many there are
+    missing = 5 - len(board)
+    runouts, total = combinations(deck, missing), comb(len(deck), missing)
+    totals = np.zeros((4, len(known_holes)))
+    for start in range(0, total, EVAL_BLOCK):
+        size = min(EVAL_BLOCK, total - start)
+        block = np.fromiter(chain.from_iterable(islice(runouts, size)), dtype=np.int64, count=size * missing)
+        boards = np.concatenate([np.broadcast_to(np.array(board, dtype=np.int64), (size, len(board))),
+                                 block.reshape(size, missing)], axis=1)
+        players = np.stack([np.broadcast_to(np.array(h, dtype=np.int64), (size, 2)) for h in known_holes])
+        totals += _showdown(players, boards)
+    return totals, total
+
+def _equity_monte_carlo(known_holes, num_random, board, deck, iterations, rng):
+    deck = np.array(deck, dtype=np.int64)
+    needed = 2 * num_random + 5 - len(board)
+    totals = np.zeros((4, len(known_holes) + num_random))
+    for start in range(0, iterations, EVAL_BLOCK):
+        size = min(EVAL_BLOCK, iterations - start)
+        # Random keys + argpartition = `needed` distinct cards per row
+        picks = deck[np.argpartition(rng.random((size, len(deck))), needed - 1, axis=1)[:, :needed]]
+        boards = np.concatenate([np.broadcast_to(np.array(board, dtype=np.int64), (size, len(board))),
+                                 picks[:, 2 * num_random:]], axis=1)
+        players = [np.broadcast_to(np.array(h, dtype=np.int64), (size, 2)) for h in known_holes]
+        players += [picks[:, 2 * i:2 * i + 2] for i in range(num_random)]
+        totals += _showdown(np.stack(players), boards)
+    return totals, iterations
+
+def calculate_equity(hole_cards, board=(), opponents=(), num_random_opponents=0,
+                     iterations=200_000, seed=None, exact=None):
+    """
+    Texas Hold'em equity for the hero against known and/or random opponents.
+    hole_cards: hero's two cards, e.g. "AsKs"; board: 0, 3, 4 or 5 cards;
+    opponents: list of known opponent hands.
+    Runouts are enumerated exactly when every hand is known and the number of
+    runouts is at most MAX_EXACT_RUNOUTS; otherwise Monte Carlo is used.
+    Returns: dict with the hero's Win/Tie/Lose probabilities, every player's
+    equity (pot share, split pots count 1/k), the method and sample count.
+    """
+    hero = parse_cards(hole_cards)
+    board = parse_cards(board)
+    known = [hero] + [parse_cards(o) for o in opponents]
+    if any(len(h) != 2 for h in known):
+        raise ValueError("Each player needs exactly two hole cards")
+    if len(board) not in (0, 3, 4, 5):
+        raise ValueError("Board must have 0, 3, 4 or 5 cards")
+    if len(known) + num_random_opponents < 2:
+        raise ValueError("Need at least one opponent")
+    used = [c for h in known for c in h] + board
+    if len(set(used)) != len(used):
+        raise ValueError("Duplicate cards")
+    deck = [c for c in range(52) if c not in set(used)]
+
+    runouts = comb(len(deck), 5 - len(board))
+    if exact is None:
+        exact = num_random_opponents == 0 and runouts <= MAX_EXACT_RUNOUTS
+    if exact and num_random_opponents:
+        raise ValueError("Exact enumeration needs every opponent's hole cards")
+
+    if exact:
+        totals, samples = _equity_exact(known, board, deck)
+        method = "exact"
+    else:
+        rng = np.random.default_rng(seed)
+        totals, samples = _equity_monte_carlo(known, num_random_opponents, board, deck, iterations, rng)
+        method = "monte carlo"
+
+    win, tie, lose, share = totals / samples
+    return {
+        "Win": win[0],
+        "Tie": tie[0],
+        "Lose": lose[0],
+        "Equity": share,
+        "Method": method,
+        "Samples": samples,
+    }
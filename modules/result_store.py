@@ -0,0 +1,204 @@
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sqlite3
+import sys
+import time
+import zlib
+from contextlib import closing
+
+from modules.cache import normalize
+
+DEFAULT_PATH = os.environ.get("PROBCALC_RESULT_STORE", os.path.join(".cache", "results.sqlite"))
+DEFAULT_MAX_BYTES = int(os.environ.get("PROBCALC_RESULT_STORE_MAX_BYTES", 512 * 2**20))
+
+# A computation claimed by a process that has not finished after this many
+# seconds is assumed dead and may be taken over
+LEASE_SECONDS = 3600
+POLL_SECONDS = 0.25
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    function TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL,
+    payload BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed);
+CREATE TABLE IF NOT EXISTS pending (
+    key TEXT PRIMARY KEY,
+    claimed REAL NOT NULL
+);
+"""
+
+def encode(value):
+    """
+    Compact binary form: pickle (arrays stored as raw buffers) + zlib.
+    """
+    return zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 6)
+
+def decode(payload):
+    return pickle.loads(zlib.decompress(payload))
+
+@functools.lru_cache(maxsize=None)
+def code_version(module_name):
+    """
+    Hash of a module's source, so stored results are invalidated when the code changes.
+    """
+    try:
+        source = inspect.getsource(sys.modules[module_name])
+    except (KeyError, OSError, TypeError):
+        return "unknown"
+    return hashlib.sha256(source.encode()).hexdigest()[:16]
+
+def make_key(function, params, seed=None):
+    """
+    Key from function name, normalized parameters, seed and code version.
+    """
+    name = f"{function.__module__}.{function.__qualname__}"
+    parts = (name, normalize(params), normalize(seed), code_version(function.__module__))
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+class ResultStore:
+    """
+    SQLite-backed result store shared by every process on the host.
+    WAL mode lets readers run alongside a writer; writes take an immediate
+    lock and evict least-recently-accessed rows once the payloads exceed max_bytes.
+    """
+    def __init__(self, path=DEFAULT_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = int(max_bytes)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as db:
+            db.executescript(_SCHEMA)
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def get(self, key, default=None):
+        with closing(self._connect()) as db:
+            row = db.execute("SELECT payload FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return default
+            db.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+        return decode(row[0])
+
+    def put(self, key, function_name, value):
+        payload = encode(value)
+        now = time.time()
+        with closing(self._connect()) as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                           (key, function_name, now, now, len(payload), payload))
+                self._evict(db)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+    def _evict(self, db):
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        for key, size in db.execute("SELECT key, size FROM results ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        db.executemany("DELETE FROM results WHERE key = ?", doomed)
+
+    def _claim(self, key):
+        """
+        Try to become the one process computing `key`. True on success.
+        """
+        now = time.time()
+        with closing(self._connect()) as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute("SELECT claimed FROM pending WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[0] < LEASE_SECONDS:
+                db.execute("ROLLBACK")
+                return False
+            db.execute("INSERT OR REPLACE INTO pending VALUES (?, ?)", (key, now))
+            db.execute("COMMIT")
+        return True
+
+    def _release(self, key):
+        with closing(self._connect()) as db:
+            db.execute("DELETE FROM pending WHERE key = ?", (key,))
+
+    def get_or_compute(self, key, function_name, compute):
+        """
+        Return the stored result for `key`, computing it at most once across
+        processes: while another process holds the claim, wait for its result.
+        """
+        missing = object()
+        while True:
+            value = self.get(key, missing)
+            if value is not missing:
+                return value
+            if self._claim(key):
+                break
+            time.sleep(POLL_SECONDS)
+
+        try:
+            value = compute()
+            self.put(key, function_name, value)
+            return value
+        finally:
+            self._release(key)
+
+    def stats(self):
+        with closing(self._connect()) as db:
+            count, size = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {"entries": count, "bytes": size, "max_bytes": self.max_bytes}
+
+    def clear(self):
+        with closing(self._connect()) as db:
+            db.execute("DELETE FROM results")
+            db.execute("DELETE FROM pending")
+
+_STORES = {}
+
+def get_store(path=DEFAULT_PATH, max_bytes=DEFAULT_MAX_BYTES):
+    if path not in _STORES:
+        _STORES[path] = ResultStore(path, max_bytes)
+    return _STORES[path]
+
+def persistent(func=None, store=None):
+    """
+    Decorator persisting results of seeded calls in a ResultStore. Calls with
+    seed=None are not reproducible, so they always run and are never stored.
+    """
+    if func is None:
+        return functools.partial(persistent, store=store)
+
+    name = f"{func.__module__}.{func.__qualname__}"
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        params = dict(bound.arguments)
+        seed = params.pop("seed", None)
+        if seed is None:
+            return func(*args, **kwargs)
+        try:
+            target = store or get_store()
+        except (OSError, sqlite3.Error):
+            # No writable location (e.g. a read-only deploy): just compute
+            return func(*args, **kwargs)
+        key = make_key(func, params, seed)
+        return target.get_or_compute(key, name, lambda: func(*args, **kwargs))
+
+    return wrapper
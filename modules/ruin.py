@@ -0,0 +1,290 @@
+"""
+Risk of ruin for repeated bets with arbitrary payoffs.
+
+Bets whose payoffs are all multiples of a common unit make the bankroll a
+Markov chain on the integers. The probability of ever reaching 0 solves a
+sparse banded linear system (scipy.sparse, or banded elimination in NumPy
+when scipy is unavailable). Ruin within a finite number of bets comes from
+iterating the chain backwards. Other payoffs, and lattices so fine that the
+banded system would be too large, fall back to simulating paths.
+
+The infinite-horizon chain is truncated at a ceiling. States above it take the
+Lundberg bound ψ(x) <= exp(-R x) as their value, which is exact for ±1 bets,
+and the ceiling is placed where that bound is negligible. Solutions cover
+every bankroll up to a power-of-two size and are cached, so nearby bankrolls
+reuse the same solve.
+"""
+from fractions import Fraction
+from functools import lru_cache
+from math import ceil, gcd, lcm, log, sqrt
+
+import numpy as np
+
+from modules import fastmath
+
+# Ruin probability treated as negligible when placing the ceiling
+TAIL = 1e-16
+# Largest chain (number of bankroll states) solved exactly
+MAX_STATES = 1 << 21
+# Largest banded system solved exactly, as states x bandwidth (its memory), and for the
+# NumPy elimination as states x lower x (upper + 1) bandwidths (its work); payoffs on a
+# finer lattice than these allow are simulated instead
+MAX_BAND_CELLS = 1 << 24
+MAX_ELIMINATION_WORK = 1 << 30
+# Largest horizon x states x payoffs product iterated exactly for finite horizons
+MAX_HORIZON_WORK = 1 << 28
+# Payoffs are put on a lattice when they are multiples of 1/MAX_DENOMINATOR
+MAX_DENOMINATOR = 1000
+# Simulation defaults for payoffs that do not fit on a lattice
+SIM_PATHS = 100_000
+SIM_HORIZON = 10_000
+# Payoffs drawn per vectorized simulation step (paths x bets)
+SIM_ELEMENTS = 1 << 22
+# Most payoffs (paths x horizon) risk_of_ruin simulates; long horizons get fewer paths
+MAX_SIM_WORK = 1 << 25
+
+def _outcomes(steps, probs):
+    # Validated (steps, probs) tuples with repeated steps merged and impossible ones dropped
+    steps = np.asarray(steps)
+    probs = np.asarray(probs, dtype=float)
+    if steps.shape != probs.shape or steps.ndim != 1 or len(steps) == 0:
+        raise ValueError("Payoffs and probabilities must be 1-D sequences of the same length")
+    if np.any(probs < 0) or not np.isclose(probs.sum(), 1.0, atol=1e-9):
+        raise ValueError("Probabilities must be non-negative and sum to 1")
+    if np.any(np.floor(steps) != steps):
+        raise ValueError("Payoffs must be whole numbers of units")
+    unique, inverse = np.unique(steps.astype(np.int64), return_inverse=True)
+    merged = np.bincount(inverse, weights=probs)
+    keep = merged > 0
+    return tuple(unique[keep].tolist()), tuple((merged[keep] / merged.sum()).tolist())
+
+def adjustment_coefficient(amounts, probs):
+    """
+    Lundberg adjustment coefficient R > 0 solving E[exp(-R X)] = 1 for a bet
+    paying X. Ruin from bankroll x is at most exp(-R x). Returns 0 when
+    E[X] <= 0 and inf when no payoff is negative.
+    """
+    amounts = np.asarray(amounts, dtype=float)
+    probs = np.asarray(probs, dtype=float)
+    if np.dot(amounts, probs) <= 0:
+        return 0.0
+    if np.all(amounts[probs > 0] >= 0):
+        return float("inf")
+    amounts, probs = amounts[probs > 0], probs[probs > 0]
+
+    def excess(r):
+        # log E[exp(-r X)], computed without overflow; negative on (0, R), positive beyond
+        exponents = -r * amounts
+        top = exponents.max()
+        return top + log(np.dot(probs, np.exp(exponents - top)))
+
+    low, high = 0.0, 1.0
+    while excess(high) < 0:
+        low, high = high, 2 * high
+    while high - low > 1e-15 * high:
+        middle = (low + high) / 2
+        if excess(middle) < 0:
+            low = middle
+        else:
+            high = middle
+    return low
+
+def _solve_banded(band, lower, rhs):
+    # Solve A x = rhs with band[i, lower + j - i] = A[i, j] by Gaussian elimination
+    # without pivoting; the ruin system I - P is an M-matrix, for which that is stable
+    n, width = band.shape
+    upper = width - lower - 1
+    band = np.vstack([band, np.zeros((lower, width))])
+    rhs = np.concatenate([rhs, np.zeros(lower)])
+    # Row i + d holds A[i + d, i..i + upper] at columns lower - d .. lower - d + upper, i.e.
+    # (width - 1) elements on from row i + d - 1's; a strided view lines them up, so
+    # blocks[i] is the pivot row (d = 0) above the lower rows it eliminates from
+    item = band.itemsize
+    blocks = np.lib.stride_tricks.as_strided(band.ravel()[lower:], shape=(n, lower + 1, upper + 1),
+                                             strides=(width * item, (width - 1) * item, item))
+    for i in range(n):
+        block = blocks[i]
+        factors = block[1:, 0] / block[0, 0]
+        block[1:] -= factors[:, None] * block[0]
+        rhs[i + 1:i + lower + 1] -= factors * rhs[i]
+    x = np.zeros(n + upper)
+    for i in range(n - 1, -1, -1):
+        x[i] = (rhs[i] - np.dot(band[i, lower + 1:], x[i + 1:i + upper + 1])) / band[i, lower]
+    return x[:n]
+
+@lru_cache(maxsize=32)
+def _absorption(steps, probs, size):
+    # P(ever ruined) from bankrolls 0..size-1; states >= size take the Lundberg bound
+    rate = adjustment_coefficient(steps, probs)
+    n = size - 1
+    x = np.arange(1, n + 1)
+    rhs = np.zeros(n)
+    for step, p in zip(steps, probs):
+        target = x + step
+        rhs[target <= 0] += p
+        above = target > n
+        rhs[above] += p * np.exp(-rate * target[above])
+
+    # A = I - P restricted to the transient states 1..n
+    inside = [(step, p) for step, p in zip(steps, probs) if abs(step) < n]
+    if fastmath.PURE:
+        lower, upper = max(-min(steps), 0), max(max(steps), 0)
+        band = np.zeros((n, lower + upper + 1))
+        band[:, lower] = 1.0
+        for step, p in inside:
+            rows = slice(max(0, -step), n - max(0, step))
+            band[rows, lower + step] -= p
+        psi = _solve_banded(band, lower, rhs)
+    else:
+        from scipy.sparse import diags, identity
+        from scipy.sparse.linalg import spsolve
+        matrix = identity(n, format="csc") - diags([p for _, p in inside], [s for s, _ in inside], shape=(n, n), format="csc")
+        psi = spsolve(matrix, rhs)
+    return np.concatenate([[1.0], np.clip(psi, 0.0, 1.0)])
+
+def _horizon_length(steps, horizon, size):
+    # Values only travel down by `up` per bet, and bankrolls above horizon * down
+    # cannot be ruined in time, so truncating with zeros here is exact
+    down, up = max(-min(steps), 0), max(max(steps), 0)
+    return min(size + horizon * up, max(size, horizon * down + 1))
+
+@lru_cache(maxsize=32)
+def _finite_horizon(steps, probs, horizon, size):
+    # P(ruined within `horizon` bets) from bankrolls 0..size-1
+    down, up = max(-min(steps), 0), max(max(steps), 0)
+    length = _horizon_length(steps, horizon, size)
+    psi = np.zeros(down + length + up)
+    psi[:down + 1] = 1.0
+    for _ in range(horizon):
+        updated = np.zeros(length - 1)
+        for step, p in zip(steps, probs):
+            updated += p * psi[down + 1 + step:down + length + step]
+        psi[down + 1:down + length] = updated
+    return psi[down:down + size]
+
+def _bucket(n):
+    # Next power of two, so nearby bankrolls share a cached solution
+    return 1 << max(int(n) - 1, 1).bit_length()
+
+def ruin_curve(steps, probs, max_bankroll, horizon=None):
+    """
+    Ruin probabilities for every integer bankroll 0..max_bankroll, for a bet paying
+    steps[i] units (losses negative) with probability probs[i]: ever when horizon
+    is None, otherwise within `horizon` bets.
+    """
+    steps, probs = _outcomes(steps, probs)
+    max_bankroll = int(max_bankroll)
+    if max_bankroll < 0:
+        raise ValueError("Bankroll must be non-negative")
+    size = _bucket(max_bankroll + 1)
+    if min(steps) >= 0:
+        curve = np.zeros(size)
+        curve[0] = 1.0
+    elif horizon is not None:
+        if horizon < 0:
+            raise ValueError("Horizon must be non-negative")
+        if int(horizon) * _horizon_length(steps, int(horizon), size) * len(steps) > MAX_HORIZON_WORK:
+            raise ValueError("Horizon too long to iterate exactly; use simulate_ruin")
+        curve = _finite_horizon(steps, probs, int(horizon), size)
+    elif np.dot(steps, probs) <= 0:
+        curve = np.ones(size)
+    else:
+        ceiling = ceil(-log(TAIL) / adjustment_coefficient(steps, probs)) + max(steps)
+        size = max(size, _bucket(min(ceiling, MAX_STATES)))
+        if size > MAX_STATES:
+            raise ValueError(f"Bankroll too large for the exact solver (at most {MAX_STATES - 1:,} units)")
+        lower, upper = -min(steps), max(steps)
+        if (size * (lower + upper + 1) > MAX_BAND_CELLS
+                or fastmath.PURE and size * lower * (upper + 1) > MAX_ELIMINATION_WORK):
+            raise ValueError("Payoffs too fine-grained for the exact solver; use simulate_ruin")
+        curve = _absorption(steps, probs, size)
+    return curve[:max_bankroll + 1].copy()
+
+def ruin_probability(steps, probs, bankroll, horizon=None):
+    """
+    Exact ruin probability from an integer bankroll, for a bet paying steps[i]
+    units with probability probs[i] (see ruin_curve).
+    """
+    return float(ruin_curve(steps, probs, bankroll, horizon)[int(bankroll)])
+
+def simulate_ruin(sample, bankroll, horizon=SIM_HORIZON, num_paths=SIM_PATHS, seed=None):
+    """
+    Fraction of simulated bankroll paths ruined within `horizon` bets, for any
+    payoff distribution: sample(rng, shape) draws an array of payoffs.
+    Returns: dict with Risk of Ruin, Std Error, Paths and Horizon
+    """
+    if bankroll <= 0:
+        raise ValueError("Bankroll must be positive")
+    if num_paths < 1 or horizon < 1:
+        raise ValueError("Need at least one path and one bet")
+    rng = np.random.default_rng(seed)
+    wealth = np.full(int(num_paths), float(bankroll))
+    ruined, done = 0, 0
+    while done < horizon and len(wealth):
+        # Surviving paths advance a block of bets at a time
+        block = int(min(horizon - done, max(1, SIM_ELEMENTS // len(wealth))))
+        paths = wealth[:, None] + np.cumsum(sample(rng, (len(wealth), block)), axis=1)
+        hit = np.any(paths <= 0, axis=1)
+        ruined += int(hit.sum())
+        wealth = paths[~hit, -1]
+        done += block
+    p = ruined / num_paths
+    return {"Risk of Ruin": p, "Std Error": sqrt(p * (1 - p) / num_paths), "Paths": int(num_paths), "Horizon": int(horizon)}
+
+def lattice_unit(amounts):
+    """
+    Largest unit of which every amount is a whole multiple (amounts taken as
+    fractions with denominators up to MAX_DENOMINATOR), or None if there is none.
+    """
+    fractions = [Fraction(float(a)).limit_denominator(MAX_DENOMINATOR) for a in amounts]
+    if any(abs(float(f) - a) > 1e-9 * max(1.0, abs(a)) for f, a in zip(fractions, amounts)):
+        return None
+    denominator = lcm(*(f.denominator for f in fractions))
+    numerator = gcd(*(int(f * denominator) for f in fractions))
+    return float(Fraction(numerator, denominator)) if numerator else None
+
+def risk_of_ruin(amounts, probs, bankroll, horizon=None, num_paths=SIM_PATHS, seed=None):
+    """
+    Probability of losing the whole bankroll betting repeatedly on a bet that
+    pays amounts[i] (losses negative) with probability probs[i]: ever, or within
+    `horizon` bets. Solved exactly on the bankroll Markov chain when the amounts
+    share a common unit, otherwise by simulation (over SIM_HORIZON bets when
+    horizon is None, and with at most MAX_SIM_WORK / horizon paths).
+    Returns: dict with Risk of Ruin, Std Error (0 when exact), Method, Lundberg
+    Bound and Note (why the exact solver was skipped, else None)
+    """
+    amounts = np.asarray(amounts, dtype=float)
+    probs = np.asarray(probs, dtype=float)
+    if amounts.shape != probs.shape or amounts.ndim != 1 or len(amounts) == 0:
+        raise ValueError("Payoffs and probabilities must be 1-D sequences of the same length")
+    if np.any(probs < 0) or not np.isclose(probs.sum(), 1.0, atol=1e-9):
+        raise ValueError("Probabilities must be non-negative and sum to 1")
+    if bankroll <= 0:
+        raise ValueError("Bankroll must be positive")
+    rate = adjustment_coefficient(amounts, probs)
+    bound = min(1.0, float(np.exp(-rate * bankroll)))
+    result = {"Lundberg Bound": bound if horizon is None else None, "Note": None}
+
+    unit = lattice_unit(amounts)
+    if unit is None:
+        result["Note"] = "Payoffs share no common unit"
+    else:
+        steps = np.round(amounts / unit).astype(np.int64)
+        # Ruin is reaching <= 0, i.e. losing at least ceil(bankroll / unit) units
+        units = ceil(bankroll / unit - 1e-9)
+        try:
+            p = ruin_probability(steps, probs, units, horizon)
+        except ValueError as e:
+            result["Note"] = str(e)
+        else:
+            return {"Risk of Ruin": p, "Std Error": 0.0, "Method": "Markov chain", **result}
+
+    if horizon is None and rate == 0.0 and np.any(amounts[probs > 0] < 0):
+        # Non-positive drift: ruin is certain eventually
+        return {"Risk of Ruin": 1.0, "Std Error": 0.0, "Method": "Drift", **result}
+    horizon = int(horizon or SIM_HORIZON)
+    num_paths = min(int(num_paths), max(1, MAX_SIM_WORK // horizon))
+    sim = simulate_ruin(lambda rng, shape: rng.choice(amounts, size=shape, p=probs / probs.sum()),
+                        bankroll, horizon, num_paths, seed)
+    method = f"Simulation ({sim['Paths']:,} paths, {sim['Horizon']:,} bets)"
+    return {"Risk of Ruin": sim["Risk of Ruin"], "Std Error": sim["Std Error"], "Method": method, **result}
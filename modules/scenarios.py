@@ -1,39 +1,36 @@
 
 import math
-from math import comb
-import scipy.stats as stats
+from statistics import NormalDist
+
+import numpy as np
+
+from modules import collision, lottery, ruin
+from modules.fastmath import special
+from modules.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+P_VALUE_CORRECTIONS = ("holm", "bh", "none")
 
 def calculate_lottery_probability(total_balls, balls_to_pick, bonus_balls=0, bonus_to_pick=0):
     """
     Calculate probability of winning a lottery (Jakpot).
     Powerball style: Match 5 of 69 (white) AND 1 of 26 (red).
+    Other prize tiers: lottery.prize_tiers. Raises ValueError for an impossible game.
     """
-    try:
-        white_prob = 1 / comb(total_balls, balls_to_pick)
-        
-        bonus_prob = 1.0
-        if bonus_balls > 0 and bonus_to_pick > 0:
-            bonus_prob = 1 / comb(bonus_balls, bonus_to_pick)
-            
-        return white_prob * bonus_prob
-    except ValueError:
-        return 0.0
+    if bonus_balls > 0 and bonus_to_pick > 0:
+        return lottery.jackpot_probability(total_balls, balls_to_pick, bonus_balls, bonus_to_pick)
+    return lottery.jackpot_probability(total_balls, balls_to_pick)
 
-def calculate_birthday_paradox(n_people):
+def calculate_birthday_paradox(n_people, days=365):
     """
-    Calculate probability that at least two people share a birthday in a group of n.
+    Calculate probability that at least two people share a birthday in a group of n,
+    with `days` equally likely birthdays (or any collision space, e.g. days=2**64 hashes).
     P(shared) = 1 - P(all unique)
     """
-    if n_people > 365:
-        return 1.0
-    if n_people <= 1:
-        return 0.0
-        
-    prob_unique = 1.0
-    for i in range(n_people):
-        prob_unique *= (365 - i) / 365.0
-        
-    return 1 - prob_unique
+    if days < 1:
+        raise ValueError("Number of days must be at least 1")
+    return float(collision.collision_probability(max(n_people, 0), days))
 
 def calculate_poker_outs(outs, cards_to_come):
     """
@@ -67,25 +64,19 @@ def calculate_poker_outs(outs, cards_to_come):
 
 def calculate_risk_of_ruin(win_rate, win_amount, loss_amount, bankroll):
     """
-    Calculate Risk of Ruin using Kelly criterion approximation or simple Random Walk.
-    RoR = ((1 - W)/(1 + W))^Units if win/loss amounts are equal.
-    Here we generalize slightly for simple edge.
-    
-    Equation: ((1 - edge) / (1 + edge)) ^ bankroll_units
-    Edge = P(Win) - P(Loss)
-    Only valid if P(Win) > 0.5. If P(Win) <= 0.5, RoR is 1.0 (eventual rune).
-    """
-    # Simplyfy to binary outcome for this tool: Win 1 unit vs Lose 1 unit
-    # Win rate p
-    # q = 1 - p
-    # if p <= 0.5, RoR = 1
-    # if p > 0.5, RoR = (q/p)^bankroll
-    
-    if win_rate <= 0.5:
-        return 1.0
-        
-    q = 1 - win_rate
-    return (q / win_rate) ** bankroll
+    Calculate Risk of Ruin: the probability of eventually losing the whole
+    bankroll when each bet wins win_amount with probability win_rate and
+    otherwise loses loss_amount.
+    For equal amounts this is ((1 - p) / p) ^ (bankroll / amount) if p > 0.5,
+    and 1 when the expected payoff per bet is not positive.
+    See modules.ruin for finite horizons and multi-outcome bets.
+    """
+    if not (0 <= win_rate <= 1):
+        raise ValueError("Win rate must be between 0 and 1")
+    if win_amount < 0 or loss_amount <= 0:
+        raise ValueError("Win amount must be non-negative and loss amount positive")
+    result = ruin.risk_of_ruin([win_amount, -loss_amount], [win_rate, 1 - win_rate], bankroll)
+    return result["Risk of Ruin"]
 
 def calculate_ab_test_significance(conversions_a, visitors_a, conversions_b, visitors_b):
     """
@@ -102,7 +93,114 @@ def calculate_ab_test_significance(conversions_a, visitors_a, conversions_b, vis
         return 0.0, 1.0 # No variance
         
     z_score = (p_b - p_a) / se_pool
-    p_value = 2 * (1 - stats.norm.cdf(abs(z_score))) # Two-tailed
+    p_value = 2 * (1 - special.ndtr(abs(z_score))) # Two-tailed
     
     confidence = 1 - p_value
     return p_value, confidence
+
+# ---------------------------------------------------------------------------
+# Bulk A/B testing
+# ---------------------------------------------------------------------------
+
+def adjust_p_values(p_values, method="holm"):
+    """
+    Multiple-comparison adjusted p-values: "holm" (Holm-Bonferroni, controls the
+    family-wise error rate), "bh" (Benjamini-Hochberg, controls the false
+    discovery rate) or "none".
+    """
+    p_values = np.asarray(p_values, dtype=float)
+    if method not in P_VALUE_CORRECTIONS:
+        raise ValueError(f"Unknown correction '{method}'. Choose from {P_VALUE_CORRECTIONS}")
+    if np.any(~((p_values >= 0) & (p_values <= 1))):
+        raise ValueError("P-values must be between 0 and 1")
+    m = p_values.size
+    if method == "none" or m == 0:
+        return p_values.copy()
+
+    order = np.argsort(p_values, axis=None, kind="stable")
+    ranked = p_values.ravel()[order]
+    if method == "holm":
+        # p_(i) * (m - i + 1), made non-decreasing in i
+        adjusted = np.maximum.accumulate(ranked * np.arange(m, 0, -1))
+    else:
+        # p_(i) * m / i, made non-increasing from the largest p-value down
+        adjusted = np.minimum.accumulate((ranked * m / np.arange(1, m + 1))[::-1])[::-1]
+    result = np.empty(m)
+    result[order] = np.minimum(adjusted, 1.0)
+    return result.reshape(p_values.shape)
+
+def ab_test_bulk(conversions_a, visitors_a, conversions_b, visitors_b, confidence=0.95, correction="holm", alpha=0.05):
+    """
+    Two-proportion z-tests for many A/B comparisons in one vectorized pass.
+    Each argument is an array with one entry per comparison; B is tested against A.
+    Returns: dict of arrays (rates, difference B - A with its unpooled confidence
+    interval, z-score, two-tailed p-value, corrected p-value, significance at alpha)
+    """
+    conversions_a, visitors_a, conversions_b, visitors_b = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (conversions_a, visitors_a, conversions_b, visitors_b)))
+    if np.any(visitors_a <= 0) or np.any(visitors_b <= 0):
+        raise ValueError("Visitors must be positive")
+    if np.any(conversions_a < 0) or np.any(conversions_b < 0) or np.any(conversions_a > visitors_a) or np.any(conversions_b > visitors_b):
+        raise ValueError("Conversions must be between 0 and the number of visitors")
+    if not (0 < confidence < 1):
+        raise ValueError("Confidence must be between 0 and 1")
+
+    p_a = conversions_a / visitors_a
+    p_b = conversions_b / visitors_b
+    p_pool = (conversions_a + conversions_b) / (visitors_a + visitors_b)
+    se_pool = np.sqrt(p_pool * (1 - p_pool) * (1 / visitors_a + 1 / visitors_b))
+    difference = p_b - p_a
+    # No variance (both rates 0 or both 1): no evidence of a difference
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z_score = np.where(se_pool > 0, difference / se_pool, 0.0)
+    p_value = 2 * special.ndtr(-np.abs(z_score))
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    half_width = z * np.sqrt(p_a * (1 - p_a) / visitors_a + p_b * (1 - p_b) / visitors_b)
+    adjusted = adjust_p_values(p_value, correction)
+    return {
+        "Rate A": p_a,
+        "Rate B": p_b,
+        "Difference": difference,
+        "CI Low": difference - half_width,
+        "CI High": difference + half_width,
+        "Z-Score": z_score,
+        "P-Value": p_value,
+        "Adjusted P-Value": adjusted,
+        "Significant": adjusted < alpha,
+    }
+
+def ab_test_frame(data, experiment="experiment", variant="variant", conversions="conversions", visitors="visitors",
+                  control=None, confidence=0.95, correction="holm", alpha=0.05):
+    """
+    Bulk A/B tests from a DataFrame with one row per (experiment, variant).
+    Every variant is compared with its experiment's control: the variant named
+    `control`, or the experiment's first row when control is None. The
+    correction runs over all comparisons in the frame.
+    Returns: DataFrame with one row per non-control variant
+    """
+    missing = [c for c in (experiment, variant, conversions, visitors) if c not in data.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {missing}")
+    frame = data.reset_index(drop=True)
+    is_control = ~frame.duplicated(experiment) if control is None else frame[variant] == control
+    controls = frame[is_control]
+    if controls[experiment].duplicated().any():
+        raise ValueError("Each experiment needs exactly one control row")
+    treatments = frame[~is_control]
+    index = pd.Index(controls[experiment]).get_indexer(treatments[experiment])
+    if np.any(index < 0):
+        lacking = treatments[experiment].to_numpy()[index < 0][0]
+        raise ValueError(f"Experiment '{lacking}' has no control row")
+
+    results = ab_test_bulk(controls[conversions].to_numpy()[index], controls[visitors].to_numpy()[index],
+                           treatments[conversions].to_numpy(), treatments[visitors].to_numpy(),
+                           confidence=confidence, correction=correction, alpha=alpha)
+    output = pd.DataFrame({
+        experiment: treatments[experiment].to_numpy(),
+        "Control": controls[variant].to_numpy()[index],
+        variant: treatments[variant].to_numpy(),
+    })
+    for name, values in results.items():
+        output[name] = values
+    return output
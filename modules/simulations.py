@@ -1,7 +1,11 @@
 
+import os
 import random
+import time
 import numpy as np
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
 
 def simulate_dice_rolls(num_dice, num_rolls):
     """
@@ -35,3 +39,515 @@ def simulate_card_draws(num_draws, hand_size=5):
         hand = random.sample(deck, hand_size)
         results.append(sum(hand)) # simplified analytic
     return results
+
+# ---------------------------------------------------------------------------
+# Chunked engine
+#
+# The functions below draw trials from a numpy.random.Generator in fixed-size
+# blocks and fold each block into a SumHistogram, so memory use depends on the
+# block size and the outcome support, never on the number of trials.
+# ---------------------------------------------------------------------------
+
+# Upper bound on the number of random values held in memory per block
+CHUNK_ELEMENTS = 1 << 22
+
+class SumHistogram:
+    """
+    Counts of integer outcomes over the fixed support [low, high].
+    """
+    def __init__(self, low, high):
+        if high < low:
+            raise ValueError("Histogram support is empty")
+        self.low = int(low)
+        self.high = int(high)
+        self.counts = np.zeros(self.high - self.low + 1, dtype=np.int64)
+
+    def add(self, samples):
+        """
+        Fold a block of integer samples into the counts.
+        """
+        samples = np.asarray(samples, dtype=np.int64)
+        self.counts += np.bincount(samples - self.low, minlength=len(self.counts))
+        return self
+
+    def merge(self, other):
+        """
+        Add the counts of another histogram over the same support.
+        """
+        if (other.low, other.high) != (self.low, self.high):
+            raise ValueError("Cannot merge histograms with different supports")
+        self.counts += other.counts
+        return self
+
+    @property
+    def values(self):
+        return np.arange(self.low, self.high + 1)
+
+    @property
+    def trials(self):
+        return int(self.counts.sum())
+
+    @property
+    def mean(self):
+        return float(np.dot(self.values, self.counts) / self.trials)
+
+    @property
+    def variance(self):
+        """
+        Sample variance (ddof=1), matching statistics.calculate_descriptive_stats
+        """
+        n = self.trials
+        deviations = self.values - self.mean
+        return float(np.dot(deviations * deviations, self.counts) / (n - 1))
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.variance))
+
+    def pmf(self):
+        """
+        Empirical probability of each value in `values`.
+        """
+        return self.counts / self.trials
+
+    def describe(self):
+        """
+        Descriptive statistics computed from the counts, with the same keys as
+        statistics.calculate_descriptive_stats on the expanded samples.
+        """
+        n = self.trials
+        if n == 0:
+            return {}
+        values = self.values
+        cumulative = np.cumsum(self.counts)
+        lower, upper = np.searchsorted(cumulative, [(n - 1) // 2 + 1, n // 2 + 1])
+        deviations = values - self.mean
+        m2 = np.dot(deviations ** 2, self.counts) / n
+        m3 = np.dot(deviations ** 3, self.counts) / n
+        occupied = np.flatnonzero(self.counts)
+        return {
+            "Mean": self.mean,
+            "Median": (values[lower] + values[upper]) / 2,
+            "Mode": float(values[np.argmax(self.counts)]),
+            "Variance": self.variance if n > 1 else float("nan"),
+            "Std Dev": self.std if n > 1 else float("nan"),
+            "Skewness": float(m3 / m2 ** 1.5) if m2 > 0 else float("nan"),
+            "Min": int(values[occupied[0]]),
+            "Max": int(values[occupied[-1]]),
+        }
+
+    def to_samples(self):
+        """
+        Expand back to a (sorted) array of samples, for small runs only.
+        """
+        return np.repeat(self.values, self.counts)
+
+def _block_sizes(num_trials, width, chunk_size=None):
+    if chunk_size is None:
+        chunk_size = max(1, CHUNK_ELEMENTS // max(1, width))
+    full, rest = divmod(int(num_trials), int(chunk_size))
+    for _ in range(full):
+        yield chunk_size
+    if rest:
+        yield rest
+
+def _dice_sums(rng, size, num_dice, faces=6):
+    rolls = rng.integers(1, faces + 1, size=(size, num_dice), dtype=np.int16)
+    return rolls.sum(axis=1, dtype=np.int64)
+
+def _coin_heads(rng, size, num_coins):
+    return rng.binomial(num_coins, 0.5, size)
+
+def _card_sums(rng, size, hand_size):
+    # Partial Fisher-Yates shuffle of one 52-card deck per row; card c has value c % 13 + 1
+    decks = np.tile(np.arange(52, dtype=np.int8), (size, 1))
+    rows = np.arange(size)
+    for j in range(hand_size):
+        swap = rng.integers(j, 52, size=size)
+        picked = decks[rows, swap]
+        decks[rows, swap] = decks[:, j]
+        decks[:, j] = picked
+    return (decks[:, :hand_size] % 13 + 1).sum(axis=1, dtype=np.int64)
+
+def _fill(histogram, sample, num_trials, width, chunk_size):
+    """
+    Add blocks from sample(size) to the histogram, yielding it after each block
+    (or once, empty, when there are no trials).
+    """
+    filled = False
+    for size in _block_sizes(num_trials, width, chunk_size):
+        histogram.add(sample(size))
+        filled = True
+        yield histogram
+    if not filled:
+        yield histogram
+
+def iter_dice_histogram(num_dice, num_rolls, seed=None, chunk_size=None, faces=6):
+    """
+    Generator form of simulate_dice_histogram: yields the growing histogram after each block.
+    """
+    if num_dice < 1 or faces < 1:
+        raise ValueError("Need at least one die with at least one face")
+    rng = np.random.default_rng(seed)
+    histogram = SumHistogram(num_dice, num_dice * faces)
+    yield from _fill(histogram, lambda size: _dice_sums(rng, size, num_dice, faces), num_rolls, num_dice, chunk_size)
+
+def iter_coin_histogram(num_coins, num_flips, seed=None, chunk_size=None):
+    """
+    Generator form of simulate_coin_histogram: yields the growing histogram after each block.
+    """
+    if num_coins < 1:
+        raise ValueError("Need at least one coin")
+    rng = np.random.default_rng(seed)
+    histogram = SumHistogram(0, num_coins)
+    yield from _fill(histogram, lambda size: _coin_heads(rng, size, num_coins), num_flips, 1, chunk_size)
+
+def iter_card_histogram(num_draws, hand_size=5, seed=None, chunk_size=None):
+    """
+    Generator form of simulate_card_histogram: yields the growing histogram after each block.
+    """
+    if not (1 <= hand_size <= 52):
+        raise ValueError("Hand size must be between 1 and 52")
+    rng = np.random.default_rng(seed)
+    # Lowest/highest possible sums: the hand_size smallest/largest values in the deck
+    deck_values = np.sort(np.arange(52) % 13 + 1)
+    histogram = SumHistogram(deck_values[:hand_size].sum(), deck_values[-hand_size:].sum())
+    yield from _fill(histogram, lambda size: _card_sums(rng, size, hand_size), num_draws, 52, chunk_size)
+
+def _last(blocks):
+    for histogram in blocks:
+        pass
+    return histogram
+
+def simulate_dice_histogram(num_dice, num_rolls, seed=None, chunk_size=None, faces=6):
+    """
+    Simulate rolling N dice K times in constant memory.
+    Returns: SumHistogram of the sums
+    """
+    return _last(iter_dice_histogram(num_dice, num_rolls, seed, chunk_size, faces))
+
+def simulate_coin_histogram(num_coins, num_flips, seed=None, chunk_size=None):
+    """
+    Simulate flipping N coins K times in constant memory.
+    Returns: SumHistogram of the heads counts
+    """
+    return _last(iter_coin_histogram(num_coins, num_flips, seed, chunk_size))
+
+def simulate_card_histogram(num_draws, hand_size=5, seed=None, chunk_size=None):
+    """
+    Simulate drawing hands from a deck in constant memory.
+    Returns: SumHistogram of the summed card values (1-13)
+    """
+    return _last(iter_card_histogram(num_draws, hand_size, seed, chunk_size))
+
+# ---------------------------------------------------------------------------
+# Parallel execution
+# ---------------------------------------------------------------------------
+
+# kind -> (histogram simulator, name of its trial-count argument)
+HISTOGRAM_SIMULATORS = {
+    "dice": (simulate_dice_histogram, "num_rolls"),
+    "coin": (simulate_coin_histogram, "num_flips"),
+    "card": (simulate_card_histogram, "num_draws"),
+}
+
+def _simulate_share(kind, num_trials, seed, chunk_size, params):
+    simulator, trials_arg = HISTOGRAM_SIMULATORS[kind]
+    return simulator(**{trials_arg: num_trials}, seed=seed, chunk_size=chunk_size, **params)
+
+def split_trials(num_trials, workers):
+    """
+    Split num_trials into `workers` near-equal shares (the first ones get the remainder).
+    """
+    base, extra = divmod(int(num_trials), int(workers))
+    return [base + (i < extra) for i in range(workers)]
+
+def simulate_parallel(kind, num_trials, seed=None, workers=None, chunk_size=None, **params):
+    """
+    Run a histogram simulation ("dice", "coin" or "card") across a process pool.
+    Each worker draws from its own stream spawned from SeedSequence(seed), and the
+    partial histograms are merged in worker order, so a given seed and worker count
+    always reproduce the same counts. Extra keyword arguments go to the simulator,
+    e.g. simulate_parallel("dice", 10**8, seed=42, num_dice=2).
+    """
+    if kind not in HISTOGRAM_SIMULATORS:
+        raise ValueError(f"Unknown simulation '{kind}'. Choose from {sorted(HISTOGRAM_SIMULATORS)}")
+    workers = int(workers or os.cpu_count() or 1)
+    if workers < 1:
+        raise ValueError("Need at least one worker")
+
+    streams = np.random.SeedSequence(seed).spawn(workers)
+    shares = split_trials(num_trials, workers)
+    jobs = [(kind, share, stream, chunk_size, params) for share, stream in zip(shares, streams)]
+
+    partials = None
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                partials = [f.result() for f in [pool.submit(_simulate_share, *job) for job in jobs]]
+        except (NotImplementedError, OSError):
+            # No process support (e.g. Pyodide); the streams are the same, so run them inline
+            partials = None
+    if partials is None:
+        partials = [_simulate_share(*job) for job in jobs]
+
+    histogram = partials[0]
+    for partial in partials[1:]:
+        histogram.merge(partial)
+    return histogram
+
+# ---------------------------------------------------------------------------
+# Streaming
+# ---------------------------------------------------------------------------
+
+# kind -> (histogram generator, name of its trial-count argument)
+HISTOGRAM_STREAMS = {
+    "dice": (iter_dice_histogram, "num_rolls"),
+    "coin": (iter_coin_histogram, "num_flips"),
+    "card": (iter_card_histogram, "num_draws"),
+}
+
+# Rows per block when streaming, small enough for several updates per second
+STREAM_CHUNK_ROWS = 1 << 16
+
+def simulate_stream(kind, num_trials, seed=None, interval=0.25, confidence=0.95, chunk_size=STREAM_CHUNK_ROWS, **params):
+    """
+    Run a histogram simulation ("dice", "coin" or "card") as a generator of
+    progress snapshots, yielded at most every `interval` seconds and after the
+    last block. Each snapshot is a dict with Histogram (the live accumulator),
+    Trials, Total, Elapsed, Rate (trials/sec), Mean, CI Low, CI High and Done.
+    Stopping iteration early (or closing the generator) cancels the run; the
+    last snapshot's histogram keeps every trial simulated so far.
+    """
+    if kind not in HISTOGRAM_STREAMS:
+        raise ValueError(f"Unknown simulation '{kind}'. Choose from {sorted(HISTOGRAM_STREAMS)}")
+    if not (0 < confidence < 1):
+        raise ValueError("Confidence must be between 0 and 1")
+    generator, trials_arg = HISTOGRAM_STREAMS[kind]
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+    def snapshot(histogram, done):
+        trials = histogram.trials
+        elapsed = time.perf_counter() - start
+        mean = histogram.mean if trials else float("nan")
+        half_width = z * histogram.std / np.sqrt(trials) if trials > 1 else float("nan")
+        return {
+            "Histogram": histogram,
+            "Trials": trials,
+            "Total": int(num_trials),
+            "Elapsed": elapsed,
+            "Rate": trials / elapsed if elapsed > 0 else float("nan"),
+            "Mean": mean,
+            "CI Low": mean - half_width,
+            "CI High": mean + half_width,
+            "Done": done,
+        }
+
+    start = time.perf_counter()
+    last_update = start
+    histogram = None
+    for histogram in generator(**{trials_arg: num_trials}, seed=seed, chunk_size=chunk_size, **params):
+        now = time.perf_counter()
+        if now - last_update >= interval and histogram.trials < num_trials:
+            last_update = now
+            yield snapshot(histogram, False)
+    yield snapshot(histogram, True)
+
+# ---------------------------------------------------------------------------
+# Precision-targeted estimation
+#
+# Trials are generated from uniforms, so one mapping per kind serves plain
+# Monte Carlo, antithetic pairs (u, 1 - u) and scrambled Sobol points. Batches
+# are drawn until the standard error of the estimate reaches the target.
+# ---------------------------------------------------------------------------
+
+ESTIMATION_METHODS = ("plain", "antithetic", "control", "qmc")
+# Independent Sobol scrambles used to estimate the QMC standard error
+QMC_REPLICATES = 16
+
+def _dice_from_uniforms(u, faces):
+    return (np.minimum(np.floor(u * faces), faces - 1) + 1).sum(axis=1, dtype=np.int64)
+
+def _coins_from_uniforms(u):
+    return (u < 0.5).sum(axis=1, dtype=np.int64)
+
+def _cards_from_uniforms(u):
+    # The partial Fisher-Yates shuffle of _card_sums, driven by one uniform per card
+    size, hand_size = u.shape
+    decks = np.tile(np.arange(52, dtype=np.int8), (size, 1))
+    rows = np.arange(size)
+    for j in range(hand_size):
+        swap = j + np.minimum(np.floor(u[:, j] * (52 - j)), 51 - j).astype(np.int64)
+        picked = decks[rows, swap]
+        decks[rows, swap] = decks[:, j]
+        decks[:, j] = picked
+    return (decks[:, :hand_size] % 13 + 1).sum(axis=1, dtype=np.int64)
+
+def _uniform_model(kind, params):
+    """
+    (uniforms -> sums, uniforms per trial, exact mean of the sum) for a simulation kind.
+    """
+    try:
+        if kind == "dice":
+            num_dice, faces = int(params["num_dice"]), int(params.get("faces", 6))
+            if num_dice < 1 or faces < 1:
+                raise ValueError("Need at least one die with at least one face")
+            return (lambda u: _dice_from_uniforms(u, faces)), num_dice, num_dice * (faces + 1) / 2
+        if kind == "coin":
+            num_coins = int(params["num_coins"])
+            if num_coins < 1:
+                raise ValueError("Need at least one coin")
+            return _coins_from_uniforms, num_coins, num_coins / 2
+        if kind == "card":
+            hand_size = int(params.get("hand_size", 5))
+            if not (1 <= hand_size <= 52):
+                raise ValueError("Hand size must be between 1 and 52")
+            return _cards_from_uniforms, hand_size, hand_size * 7.0
+    except KeyError as e:
+        raise ValueError(f"Missing parameter {e} for '{kind}' simulation") from None
+    raise ValueError(f"Unknown simulation '{kind}'. Choose from {sorted(HISTOGRAM_SIMULATORS)}")
+
+class _Moments:
+    """
+    Running means and co-moments of (y, x) pairs, merged batch by batch (Chan et al.).
+    """
+    def __init__(self):
+        self.n = 0
+        self.mean_y = self.mean_x = 0.0
+        self.cyy = self.cxx = self.cxy = 0.0
+
+    def add(self, y, x):
+        n = len(y)
+        mean_y, mean_x = y.mean(), x.mean()
+        dy, dx = y - mean_y, x - mean_x
+        total = self.n + n
+        delta_y, delta_x = mean_y - self.mean_y, mean_x - self.mean_x
+        weight = self.n * n / total
+        self.cyy += np.dot(dy, dy) + delta_y * delta_y * weight
+        self.cxx += np.dot(dx, dx) + delta_x * delta_x * weight
+        self.cxy += np.dot(dy, dx) + delta_y * delta_x * weight
+        self.mean_y += delta_y * n / total
+        self.mean_x += delta_x * n / total
+        self.n = total
+
+def _estimate_sequential(draw, statistic, control_mean, batch_size, max_trials, target, method):
+    moments = _Moments()
+    trials = 0
+    while trials < max_trials:
+        size = min(batch_size, max_trials - trials)
+        if method == "antithetic":
+            # Each pair (u, 1 - u) counts as two trials and yields one averaged sample
+            pairs = max(1, size // 2)
+            u = draw(pairs)
+            y = (statistic(u) + statistic(1.0 - u)) / 2
+            moments.add(y, y)
+            trials += 2 * pairs
+        else:
+            u = draw(size)
+            y, x = statistic(u, with_sum=True)
+            moments.add(y, x)
+            trials += size
+
+        n = moments.n
+        estimate = moments.mean_y
+        residual = moments.cyy
+        if method == "control" and moments.cxx > 0:
+            beta = moments.cxy / moments.cxx
+            estimate -= beta * (moments.mean_x - control_mean)
+            residual = max(moments.cyy - moments.cxy * beta, 0.0)
+        std_error = np.sqrt(residual / max(n - 1, 1) / n)
+        if moments.cyy == 0:
+            # No variation seen yet (e.g. a rare event): do not trust a zero error
+            std_error = max(std_error, 1.0 / n)
+        if n > 1 and std_error <= target:
+            return estimate, std_error, trials, True
+    return estimate, std_error, trials, False
+
+def _estimate_qmc(dim, statistic, batch_size, max_trials, target, seed):
+    try:
+        from scipy.stats import qmc
+    except ImportError:
+        raise ImportError("Quasi-Monte Carlo needs scipy (scipy.stats.qmc)") from None
+    engines = []
+    for stream in np.random.SeedSequence(seed).spawn(QMC_REPLICATES):
+        try:
+            engines.append(qmc.Sobol(dim, scramble=True, rng=np.random.default_rng(stream)))
+        except TypeError:
+            # scipy < 1.15 names the argument `seed`
+            engines.append(qmc.Sobol(dim, scramble=True, seed=np.random.default_rng(stream)))
+
+    sums = np.zeros(QMC_REPLICATES)
+    count = 0
+    # Sobol points keep their balance properties when the total stays a power of two
+    draw = 2 ** max(0, int(np.ceil(np.log2(max(batch_size, 1) / QMC_REPLICATES))))
+    while True:
+        for r, engine in enumerate(engines):
+            sums[r] += statistic(engine.random(draw)).sum()
+        count += draw
+        means = sums / count
+        std_error = means.std(ddof=1) / np.sqrt(QMC_REPLICATES)
+        trials = count * QMC_REPLICATES
+        if std_error <= target:
+            return means.mean(), std_error, trials, True
+        draw = count
+        if trials + draw * QMC_REPLICATES > max_trials:
+            return means.mean(), std_error, trials, False
+
+def estimate_adaptive(kind, threshold=None, target_se=None, target_half_width=None, confidence=0.95,
+                      method="plain", batch_size=10_000, max_trials=10_000_000, seed=None, **params):
+    """
+    Estimate the mean sum of a simulation ("dice", "coin" or "card"), or
+    P(sum >= threshold) when a threshold is given, drawing batches until the
+    standard error reaches target_se (or the confidence interval half-width
+    reaches target_half_width) or max_trials trials have been used.
+
+    Methods:
+        plain       independent pseudo-random trials
+        antithetic  pairs of trials driven by u and 1 - u
+        control     the sum, whose exact mean is known, as a control variate
+                    (threshold estimates only: for the mean it is the target itself)
+        qmc         scrambled Sobol points; the error comes from 16 independent scrambles
+
+    Returns: dict with Estimate, Std Error, CI Low, CI High, Trials, Method, Converged
+    """
+    if method not in ESTIMATION_METHODS:
+        raise ValueError(f"Unknown method '{method}'. Choose from {', '.join(ESTIMATION_METHODS)}")
+    if method == "control" and threshold is None:
+        # The control would be the estimate itself, giving a spurious zero-width interval
+        raise ValueError("The control variate needs a threshold; the mean sum is already known exactly")
+    if not (0 < confidence < 1):
+        raise ValueError("Confidence must be between 0 and 1")
+    if (target_se is None) == (target_half_width is None):
+        raise ValueError("Give exactly one of target_se and target_half_width")
+    if batch_size < 2 or max_trials < 2:
+        raise ValueError("batch_size and max_trials must be at least 2")
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    target = target_se if target_se is not None else target_half_width / z
+    if target <= 0:
+        raise ValueError("Target precision must be positive")
+
+    sums_of, dim, exact_mean = _uniform_model(kind, params)
+
+    def statistic(u, with_sum=False):
+        sums = sums_of(u)
+        y = sums.astype(float) if threshold is None else (sums >= threshold).astype(float)
+        return (y, sums.astype(float)) if with_sum else y
+
+    if method == "qmc":
+        estimate, std_error, trials, converged = _estimate_qmc(dim, statistic, batch_size, max_trials, target, seed)
+    else:
+        rng = np.random.default_rng(seed)
+        draw = lambda n: rng.random((n, dim))
+        estimate, std_error, trials, converged = _estimate_sequential(
+            draw, statistic, exact_mean, int(batch_size), int(max_trials), target, method)
+
+    return {
+        "Estimate": float(estimate),
+        "Std Error": float(std_error),
+        "CI Low": float(estimate - z * std_error),
+        "CI High": float(estimate + z * std_error),
+        "Trials": int(trials),
+        "Method": method,
+        "Converged": bool(converged),
+    }
@@ -1,6 +1,11 @@
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
-import scipy.stats as stats
+
+from modules import fastmath
+from modules.fastmath import special
 
 def calculate_descriptive_stats(data):
     """
@@ -12,10 +17,10 @@ def calculate_descriptive_stats(data):
     return {
         "Mean": np.mean(data),
         "Median": np.median(data),
-        "Mode": float(stats.mode(data, keepdims=True)[0][0]),
+        "Mode": float(fastmath.mode(data)),
         "Variance": np.var(data, ddof=1), # Sample variance
         "Std Dev": np.std(data, ddof=1),
-        "Skewness": stats.skew(data),
+        "Skewness": fastmath.skew(data),
         "Min": np.min(data),
         "Max": np.max(data)
     }
@@ -28,7 +33,7 @@ def perform_z_test(data, population_mean, population_std):
     sample_mean = np.mean(data)
     standard_error = population_std / np.sqrt(n)
     z_score = (sample_mean - population_mean) / standard_error
-    p_value = 2 * (1 - stats.norm.cdf(abs(z_score))) # Two-tailed
+    p_value = 2 * (1 - special.ndtr(abs(z_score))) # Two-tailed
     
     return {
         "Sample Mean": sample_mean,
@@ -40,8 +45,412 @@ def perform_t_test(data, population_mean):
     """
     Perform One-Sample T-Test
     """
-    t_stat, p_value = stats.ttest_1samp(data, population_mean)
+    t_stat, p_value = fastmath.ttest_1samp(data, population_mean)
     return {
         "T-Statistic": t_stat,
         "P-Value": p_value
     }
+
+# ---------------------------------------------------------------------------
+# Streaming / mergeable summaries
+#
+# StreamingStats consumes data chunk by chunk in a single pass with bounded
+# memory, and partial summaries built on different chunks (or in different
+# workers) can be merged. Mean, variance, skewness, min and max are exact;
+# the median comes from a quantile sketch and the mode from a heavy-hitter
+# summary, both approximate with bounded error.
+# ---------------------------------------------------------------------------
+
+class QuantileSketch:
+    """
+    KLL-style mergeable quantile sketch.
+    Items at level h stand for 2**h original values. A level that exceeds its
+    capacity is sorted and every other item (random offset) is promoted, which
+    keeps about O(k) items in total. Rank error is roughly 1.7/k with high probability.
+    """
+    def __init__(self, k=1024, seed=None):
+        if k < 8:
+            raise ValueError("Sketch size 'k' must be at least 8")
+        self.k = int(k)
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                items = np.sort(items)
+                # An odd item out stays at this level so no weight is lost
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                pairs = items[:len(items) - len(keep)]
+                promoted = pairs[self._rng.integers(2)::2]
+                self.levels[level] = keep
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compress()
+        return self
+
+    @property
+    def count(self):
+        return int(sum(len(items) << level for level, items in enumerate(self.levels)))
+
+    def quantile(self, q):
+        """
+        Approximate q-quantile(s) of everything seen so far.
+        """
+        items = np.concatenate(self.levels)
+        if len(items) == 0:
+            raise ValueError("Sketch is empty")
+        weights = np.concatenate([np.full(len(items), 1 << level) for level, items in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        ranks = np.asarray(q, dtype=float) * cumulative[-1]
+        idx = np.minimum(np.searchsorted(cumulative, ranks, side="left"), len(items) - 1)
+        result = items[order][idx]
+        return float(result) if np.ndim(result) == 0 else result
+
+class HeavyHitters:
+    """
+    Misra-Gries frequent-items summary with at most `capacity` counters.
+    Estimated counts undercount by at most n / (capacity + 1), and the summary
+    stays mergeable (counters are added, then reduced back to capacity).
+    """
+    def __init__(self, capacity=1024):
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+        self.capacity = int(capacity)
+        self.items = np.empty(0)
+        self.counts = np.empty(0, dtype=np.int64)
+
+    def _combine(self, items, counts):
+        items = np.concatenate([self.items, items])
+        counts = np.concatenate([self.counts, counts])
+        self.items, inverse = np.unique(items, return_inverse=True)
+        self.counts = np.bincount(inverse.ravel(), weights=counts, minlength=len(self.items)).astype(np.int64)
+        if len(self.items) > self.capacity:
+            threshold = np.sort(self.counts)[::-1][self.capacity]
+            self.counts -= threshold
+            keep = self.counts > 0
+            self.items, self.counts = self.items[keep], self.counts[keep]
+
+    def update(self, values):
+        items, counts = np.unique(np.asarray(values, dtype=float).ravel(), return_counts=True)
+        self._combine(items, counts)
+        return self
+
+    def merge(self, other):
+        self._combine(other.items, other.counts)
+        return self
+
+    def most_common(self):
+        """
+        The item with the largest estimated count (smallest value on ties, like stats.mode).
+        NaN when no item is frequent enough to survive, e.g. all-distinct data.
+        """
+        if len(self.items) == 0:
+            return np.nan
+        return float(self.items[np.argmax(self.counts)])
+
+class StreamingStats:
+    """
+    One-pass, mergeable replacement for calculate_descriptive_stats.
+    Feed chunks with update(); combine partial results with merge().
+    """
+    def __init__(self, sketch_size=1024, mode_capacity=1024, seed=None):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Σ(x - mean)^2
+        self.m3 = 0.0  # Σ(x - mean)^3
+        self.min = np.inf
+        self.max = -np.inf
+        self.quantiles = QuantileSketch(sketch_size, seed=seed)
+        self.mode = HeavyHitters(mode_capacity)
+
+    def _combine_moments(self, n, mean, m2, m3):
+        # Pairwise update of the central moments (Chan et al. / Pébay)
+        total = self.n + n
+        delta = mean - self.mean
+        new_mean = self.mean + delta * n / total
+        new_m2 = self.m2 + m2 + delta**2 * self.n * n / total
+        new_m3 = (self.m3 + m3
+                  + delta**3 * self.n * n * (self.n - n) / total**2
+                  + 3 * delta * (self.n * m2 - n * self.m2) / total)
+        self.n, self.mean, self.m2, self.m3 = total, new_mean, new_m2, new_m3
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk, dtype=float).ravel()
+        if len(chunk) == 0:
+            return self
+        chunk_mean = chunk.mean()
+        deviations = chunk - chunk_mean
+        squared = deviations * deviations
+        self._combine_moments(len(chunk), chunk_mean, squared.sum(), (squared * deviations).sum())
+        self.min = min(self.min, chunk.min())
+        self.max = max(self.max, chunk.max())
+        self.quantiles.update(chunk)
+        self.mode.update(chunk)
+        return self
+
+    def merge(self, other):
+        if other.n == 0:
+            return self
+        self._combine_moments(other.n, other.mean, other.m2, other.m3)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.quantiles.merge(other.quantiles)
+        self.mode.merge(other.mode)
+        return self
+
+    def result(self):
+        """
+        Same keys as calculate_descriptive_stats; Median and Mode are approximate.
+        """
+        if self.n == 0:
+            return {}
+        variance = self.m2 / (self.n - 1) if self.n > 1 else np.nan
+        skewness = (self.m3 / self.n) / (self.m2 / self.n) ** 1.5 if self.m2 > 0 else np.nan
+        return {
+            "Mean": self.mean,
+            "Median": self.quantiles.quantile(0.5),
+            "Mode": self.mode.most_common(),
+            "Variance": variance,
+            "Std Dev": np.sqrt(variance),
+            "Skewness": skewness,
+            "Min": float(self.min),
+            "Max": float(self.max)
+        }
+
+def summarize_chunks(chunks, **kwargs):
+    """
+    Calculate descriptive stats over an iterable of array chunks in one pass
+    """
+    accumulator = StreamingStats(**kwargs)
+    for chunk in chunks:
+        accumulator.update(chunk)
+    return accumulator.result()
+
+# ---------------------------------------------------------------------------
+# Resampling
+#
+# Bootstrap replicates and permutations are drawn in blocks of at most
+# RESAMPLE_CELLS values, so memory stays bounded whatever the data size.
+# Block i always draws from the i-th stream spawned from SeedSequence(seed);
+# blocks are split into contiguous shares, one per worker, so a given seed
+# gives the same replicates for any number of workers.
+# ---------------------------------------------------------------------------
+
+# Values per resampling block (~25 MB of indices and gathered data)
+RESAMPLE_CELLS = 1 << 21
+# Callable statistics get a grouped jackknife with at most this many groups
+JACKKNIFE_GROUPS = 1000
+BOOTSTRAP_METHODS = ("percentile", "bca")
+ALTERNATIVES = ("two-sided", "greater", "less")
+
+def _block_skewness(block, axis=-1):
+    deviations = block - block.mean(axis=axis, keepdims=True)
+    squared = deviations * deviations
+    m2 = np.mean(squared, axis=axis)
+    m3 = np.mean(squared * deviations, axis=axis)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(m2 > 0, m3 / m2 ** 1.5, np.nan)
+
+# name -> statistic of each row of a (resamples, n) block
+RESAMPLING_STATISTICS = {
+    "mean": np.mean,
+    "median": np.median,
+    "std": lambda block, axis=-1: np.std(block, axis=axis, ddof=1),
+    "variance": lambda block, axis=-1: np.var(block, axis=axis, ddof=1),
+    "skewness": _block_skewness,
+}
+
+def _statistic(statistic):
+    if callable(statistic):
+        return statistic
+    if statistic not in RESAMPLING_STATISTICS:
+        raise ValueError(f"Unknown statistic '{statistic}'. Choose from {list(RESAMPLING_STATISTICS)} or pass a function")
+    return RESAMPLING_STATISTICS[statistic]
+
+def _sample(data, name):
+    data = np.asarray(data, dtype=float).ravel()
+    if len(data) < 2:
+        raise ValueError(f"{name} needs at least 2 data points")
+    return data
+
+def _blocks(num_draws, row_size, seed):
+    # (rows, seed stream) per block; fixed by the seed and the data size only
+    rows = max(1, RESAMPLE_CELLS // row_size)
+    sizes = [min(rows, num_draws - start) for start in range(0, num_draws, rows)]
+    return list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+
+def _bootstrap_share(data, statistic, blocks):
+    statistic = _statistic(statistic)
+    dtype = np.int32 if len(data) < 2**31 else np.int64
+    replicates = []
+    for rows, stream in blocks:
+        indices = np.random.default_rng(stream).integers(0, len(data), size=(rows, len(data)), dtype=dtype)
+        replicates.append(statistic(data[indices], axis=-1))
+    return np.concatenate(replicates)
+
+def _permutation_share(pooled, size_x, statistic, blocks):
+    statistic = _statistic(statistic)
+    differences = []
+    for rows, stream in blocks:
+        shuffled = np.random.default_rng(stream).permuted(np.broadcast_to(pooled, (rows, len(pooled))), axis=1)
+        differences.append(statistic(shuffled[:, :size_x], axis=-1) - statistic(shuffled[:, size_x:], axis=-1))
+    return np.concatenate(differences)
+
+def _run_blocks(share, args, blocks, workers):
+    # Contiguous shares keep the block order, so results do not depend on `workers`
+    workers = max(1, min(int(workers or os.cpu_count() or 1), len(blocks)))
+    bounds = np.linspace(0, len(blocks), workers + 1).astype(int)
+    shares = [blocks[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                return np.concatenate([f.result() for f in [pool.submit(share, *args, s) for s in shares]])
+        except (NotImplementedError, OSError):
+            # No process support (e.g. Pyodide); the streams are the same, so run them inline
+            pass
+    return np.concatenate([share(*args, s) for s in shares])
+
+def bootstrap_distribution(data, statistic="mean", num_resamples=10_000, seed=None, workers=1):
+    """
+    Bootstrap replicates of a statistic: its value on `num_resamples` samples
+    drawn with replacement from the data. `statistic` is a name from
+    RESAMPLING_STATISTICS or a function called like np.mean(block, axis=-1) on
+    a (resamples, n) block. workers=None uses every CPU.
+    """
+    data = _sample(data, "Bootstrap")
+    if num_resamples < 1:
+        raise ValueError("Number of resamples must be at least 1")
+    _statistic(statistic)
+    return _run_blocks(_bootstrap_share, (data, statistic), _blocks(int(num_resamples), len(data), seed), workers)
+
+def _jackknife(data, statistic):
+    # Leave-one-out values in closed form for the named statistics; callables
+    # get a delete-a-group jackknife over consecutive groups (exact when n <= JACKKNIFE_GROUPS)
+    n = len(data)
+    if statistic == "median":
+        order = np.argsort(data, kind="stable")
+        s = data[order]
+        m = n // 2
+        if n % 2:
+            low, high = (s[m - 1] + s[m]) / 2, (s[m] + s[m + 1]) / 2
+            by_rank = np.where(np.arange(n) < m, high, low)
+            by_rank[m] = (s[m - 1] + s[m + 1]) / 2
+        else:
+            by_rank = np.where(np.arange(n) < m, s[m], s[m - 1])
+        values = np.empty(n)
+        values[order] = by_rank
+        return values
+    if isinstance(statistic, str):
+        # Central sums about the full-sample mean, minus each point's share
+        d = data - data.mean()
+        shift = -d / (n - 1)
+        s2 = (np.sum(d ** 2) - d ** 2) / (n - 1)
+        m2 = s2 - shift ** 2
+        if statistic == "mean":
+            return data.mean() + shift
+        if statistic == "variance":
+            return m2 * (n - 1) / (n - 2)
+        if statistic == "std":
+            return np.sqrt(m2 * (n - 1) / (n - 2))
+        s3 = (np.sum(d ** 3) - d ** 3) / (n - 1)
+        m3 = s3 - 3 * shift * s2 + 2 * shift ** 3
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(m2 > 0, m3 / m2 ** 1.5, np.nan)
+    groups = np.array_split(np.arange(n), min(n, JACKKNIFE_GROUPS))
+    return np.array([statistic(np.delete(data, group)[None, :], axis=-1)[0] for group in groups])
+
+def bootstrap_ci(data, statistic="mean", confidence=0.95, method="bca", num_resamples=10_000, seed=None, workers=1):
+    """
+    Bootstrap confidence interval for a statistic (see bootstrap_distribution).
+    "percentile" takes quantiles of the replicates; "bca" corrects them for
+    bias and skewness, with the acceleration estimated by the jackknife.
+    """
+    if not 0 < confidence < 1:
+        raise ValueError("Confidence must be between 0 and 1")
+    if method not in BOOTSTRAP_METHODS:
+        raise ValueError(f"Unknown method '{method}'. Choose from {list(BOOTSTRAP_METHODS)}")
+    data = _sample(data, "Bootstrap")
+    if method == "bca" and len(data) < 3:
+        raise ValueError("BCa intervals need at least 3 data points")
+    estimate = float(_statistic(statistic)(data[None, :], axis=-1)[0])
+    replicates = bootstrap_distribution(data, statistic, num_resamples, seed, workers)
+    replicates = replicates[np.isfinite(replicates)]
+    if len(replicates) == 0:
+        raise ValueError("The statistic is undefined on every resample")
+    levels = np.array([(1 - confidence) / 2, (1 + confidence) / 2])
+
+    if method == "bca":
+        # Bias correction from the share of replicates below the estimate, kept off 0 and 1
+        below = (np.sum(replicates < estimate) + 0.5 * np.sum(replicates == estimate)) / len(replicates)
+        below = np.clip(below, 1 / (len(replicates) + 1), len(replicates) / (len(replicates) + 1))
+        z0 = float(special.ndtri(below))
+        jackknife = _jackknife(data, statistic)
+        d = np.mean(jackknife) - jackknife
+        denominator = 6 * np.sum(d ** 2) ** 1.5
+        acceleration = np.sum(d ** 3) / denominator if denominator > 0 else 0.0
+        z = special.ndtri(levels)
+        levels = special.ndtr(z0 + (z0 + z) / (1 - acceleration * (z0 + z)))
+
+    low, high = np.quantile(replicates, levels)
+    return {
+        "Estimate": estimate,
+        "CI Low": float(low),
+        "CI High": float(high),
+        "Std Error": float(np.std(replicates, ddof=1)) if len(replicates) > 1 else float("nan"),
+        "Bias": float(np.mean(replicates) - estimate),
+        "Method": method,
+        "Resamples": len(replicates),
+    }
+
+def permutation_test(x, y, statistic="mean", alternative="two-sided", num_permutations=10_000, seed=None, workers=1):
+    """
+    Two-sample permutation test of statistic(x) - statistic(y): the pooled data
+    are shuffled and re-split `num_permutations` times. The p-value counts the
+    observed split as one of the permutations, so it is never zero.
+    """
+    x, y = _sample(x, "Sample A"), _sample(y, "Sample B")
+    if alternative not in ALTERNATIVES:
+        raise ValueError(f"Unknown alternative '{alternative}'. Choose from {list(ALTERNATIVES)}")
+    if num_permutations < 1:
+        raise ValueError("Number of permutations must be at least 1")
+    function = _statistic(statistic)
+    observed = float(function(x[None, :], axis=-1)[0] - function(y[None, :], axis=-1)[0])
+    pooled = np.concatenate([x, y])
+    differences = _run_blocks(_permutation_share, (pooled, len(x), statistic),
+                              _blocks(int(num_permutations), len(pooled), seed), workers)
+
+    # Ties within round-off of the observed value count as at least as extreme
+    tolerance = 1e-12 * max(abs(observed), 1.0)
+    if alternative == "greater":
+        extreme = np.sum(differences >= observed - tolerance)
+    elif alternative == "less":
+        extreme = np.sum(differences <= observed + tolerance)
+    else:
+        extreme = np.sum(np.abs(differences) >= abs(observed) - tolerance)
+    return {
+        "Difference": observed,
+        "P-Value": float((extreme + 1) / (len(differences) + 1)),
+        "Permutations": len(differences),
+    }
@@ -0,0 +1,198 @@
+"""
+Parameter sweeps: evaluate a calculator over a whole grid of parameter values.
+
+    result = sweep("distributions.binomial_sf", {"k": np.arange(1000), "p": np.linspace(0, 1, 1000)}, {"n": 1000})
+    result.values.shape          # (1000, 1000), axes in the order given
+    result.to_frame()            # long DataFrame with columns k, p, Value
+
+Functions from the vectorized API, and the scalar calculators that batch.py
+maps onto it, get the whole grid in one broadcast call. Discrete CDF/SF sweeps
+over k take a single cumulative sum along the k axis. Any other function,
+e.g. a simulation, is called once per grid point, in chunks that can be
+spread over a process pool; points where it raises ValueError are NaN.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from math import prod
+
+import numpy as np
+
+from modules import batch, distributions
+from modules.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+# Grid points per task when calling a function point by point
+CHUNK_SIZE = 256
+# Largest (grid cells x support) array built by the cumulative CDF/SF path
+MAX_CUMULATIVE_CELLS = 5 * 10**7
+# Functions of the vectorized API with these suffixes broadcast over every argument
+VECTOR_SUFFIXES = ("_logpmf", "_pmf", "_cdf", "_sf", "_pdf", "_ppf", "_isf")
+
+# distribution -> (shape parameters, lowest value of the support)
+_CUMULATIVE = {
+    "binomial": (("n", "p"), 0),
+    "poisson": (("rate",), 0),
+    "geometric": (("p",), 1),
+}
+
+class SweepResult:
+    """
+    Values of a function over a parameter grid, one array axis per swept parameter.
+    """
+    def __init__(self, function, axes, values, method):
+        self.function = function
+        self.axes = axes
+        self.values = values
+        self.method = method
+
+    @property
+    def names(self):
+        return list(self.axes)
+
+    def to_frame(self):
+        """
+        Long DataFrame: one column per swept parameter plus Value.
+        """
+        grids = np.meshgrid(*self.axes.values(), indexing="ij")
+        frame = pd.DataFrame({name: grid.ravel() for name, grid in zip(self.axes, grids)})
+        frame["Value"] = self.values.ravel()
+        return frame
+
+    def to_pivot(self):
+        """
+        2-D sweeps as a DataFrame indexed by the first parameter, one column per value of the second.
+        """
+        if len(self.axes) != 2:
+            raise ValueError("A pivot table needs exactly two swept parameters")
+        (row, rows), (column, columns) = self.axes.items()
+        return pd.DataFrame(self.values, index=pd.Index(rows, name=row), columns=pd.Index(columns, name=column))
+
+def _cumulative(name, grid, fixed, shape):
+    # Discrete CDF/SF swept over k: PMF over the support, then one cumulative sum
+    module, _, function = name.partition(".")
+    dist, _, kind = function.rpartition("_")
+    if module != "distributions" or dist not in _CUMULATIVE or kind not in ("cdf", "sf") or "k" not in grid:
+        return None
+    params, low = _CUMULATIVE[dist]
+    if any(p not in grid and p not in fixed for p in params):
+        return None
+    args = [np.asarray(grid[p] if p in grid else fixed[p], dtype=float) for p in params]
+    axis = list(grid).index("k")
+    k = np.floor(np.asarray(grid["k"], dtype=float))
+
+    if kind == "cdf":
+        top = max(k.max(), low)
+    elif dist == "binomial":
+        top = args[0].max()
+    elif dist == "poisson":
+        top = distributions.poisson_isf(distributions.TABLE_TAIL, args[0].max())
+    else:
+        top = distributions.geometric_isf(distributions.TABLE_TAIL, args[0].min())
+    support = np.arange(low, top + 1)
+    if not np.isfinite(top) or len(support) * prod(shape) // shape[axis] > MAX_CUMULATIVE_CELLS:
+        return None
+
+    support = support.reshape([-1 if i == axis else 1 for i in range(len(shape))])
+    pmf = np.exp(getattr(distributions, f"{dist}_logpmf")(support, *args))
+    index = np.clip(k - low, -1, pmf.shape[axis] - 1).astype(int)
+    if kind == "cdf":
+        table = np.minimum(np.cumsum(pmf, axis=axis), 1.0)
+        values = np.where(index < 0, 0.0, np.take_along_axis(table, np.maximum(index, 0), axis=axis))
+    else:
+        # P(X > k) summed from the top of the support, so upper tails keep their precision
+        tail = np.flip(np.cumsum(np.flip(pmf, axis=axis), axis=axis), axis=axis)
+        tail = np.concatenate([tail, np.zeros_like(np.take(tail, [0], axis=axis))], axis=axis)
+        values = np.minimum(np.take_along_axis(tail, index + 1, axis=axis), 1.0)
+    return np.broadcast_to(values, shape)
+
+def _broadcast(name, function, grid, fixed, shape):
+    if name in batch.VECTORIZED:
+        names, valid, vector = batch.VECTORIZED[name]
+        missing = [n for n in names if n not in grid and n not in fixed]
+        if missing:
+            raise ValueError(f"Missing parameters: {missing}")
+        arrays = np.broadcast_arrays(*(np.asarray(grid[n] if n in grid else fixed[n], dtype=float) for n in names))
+        arrays = [np.broadcast_to(a, shape) for a in arrays]
+        # Points the scalar calculator would reject are NaN instead of an error
+        mask = np.broadcast_to(valid(*arrays), shape)
+        values = np.full(shape, np.nan)
+        try:
+            values[mask] = vector(*(a[mask] for a in arrays))
+        except (ArithmeticError, ValueError):
+            # A point the mask missed; the pointwise path turns it into NaN
+            return None
+        return values
+    module, _, function_name = name.partition(".")
+    if module == "distributions" and function_name.endswith(VECTOR_SUFFIXES):
+        return np.broadcast_to(np.asarray(function(**grid, **fixed), dtype=float), shape)
+    return None
+
+def _pick(result, output):
+    if output is not None:
+        result = result[output]
+    return float(result)
+
+def evaluate_points(function, names, points, fixed, output=None):
+    """
+    Call function(**fixed, **dict(zip(names, point))) for each point; NaN where it raises ValueError.
+    """
+    if isinstance(function, str):
+        function = batch.resolve(function)
+    values = []
+    for point in points:
+        try:
+            values.append(_pick(function(**fixed, **dict(zip(names, point))), output))
+        except (ValueError, ZeroDivisionError):
+            values.append(float("nan"))
+    return values
+
+def _pointwise(function, axes, fixed, output, shape, workers, chunk_size):
+    grids = np.meshgrid(*axes.values(), indexing="ij")
+    # Plain Python numbers, so calculators see the same types as a direct call
+    points = list(zip(*(g.ravel().tolist() for g in grids)))
+    chunks = [points[i:i + chunk_size] for i in range(0, len(points), chunk_size)]
+    names = list(axes)
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(evaluate_points, function, names, chunk, fixed, output) for chunk in chunks]
+            values = [v for future in futures for v in future.result()]
+    else:
+        values = [v for chunk in chunks for v in evaluate_points(function, names, chunk, fixed, output)]
+    return np.array(values, dtype=float).reshape(shape)
+
+def sweep(function, axes, fixed=None, output=None, workers=1, chunk_size=CHUNK_SIZE):
+    """
+    Evaluate `function` ("module.name" or a callable) over the grid spanned by
+    `axes` (dict parameter -> 1-D values), with the `fixed` keyword arguments.
+    `output` picks one entry (key or index) of dict/tuple results; such sweeps,
+    and functions without a vectorized form, are called point by point,
+    over `workers` processes if more than one.
+    Returns: SweepResult with values of shape (len(values) for each axis)
+    """
+    fixed = dict(fixed or {})
+    if not axes:
+        raise ValueError("Sweep at least one parameter")
+    axes = {name: np.asarray(values).ravel() for name, values in axes.items()}
+    if any(len(values) == 0 for values in axes.values()):
+        raise ValueError("Every swept parameter needs at least one value")
+    overlap = set(axes) & set(fixed)
+    if overlap:
+        raise ValueError(f"Parameters both swept and fixed: {sorted(overlap)}")
+    if isinstance(function, str):
+        name, callable_ = function, batch.resolve(function)
+    else:
+        name, callable_ = f"{function.__module__.rpartition('.')[2]}.{function.__name__}", function
+
+    shape = tuple(len(values) for values in axes.values())
+    # Open grid: each parameter varies along its own axis and broadcasts along the rest
+    grid = {n: values.reshape([-1 if i == j else 1 for j in range(len(shape))])
+            for i, (n, values) in enumerate(axes.items())}
+    values, method = None, "pointwise"
+    if output is None:
+        values, method = _cumulative(name, grid, fixed, shape), "cumulative"
+        if values is None:
+            values, method = _broadcast(name, callable_, grid, fixed, shape), "broadcast"
+    if values is None:
+        target = function if isinstance(function, str) else callable_
+        values, method = _pointwise(target, axes, fixed, output, shape, workers, chunk_size), "pointwise"
+    return SweepResult(name, axes, np.array(values, dtype=float), method)
@@ -0,0 +1,493 @@
+from itertools import chain, combinations, product
+
+import numpy as np
+import pytest
+
+from modules import (batch, bayesnet, cache, collision, convolution, distributions, fastmath, lottery, poker, ruin, scenarios,
+                     simulations, statistics)
+
+sc = pytest.importorskip("scipy.special")
+ss = pytest.importorskip("scipy.stats")
+
+RTOL = 1e-12
+# Far tails (tiny probabilities) are compared with this relative floor, since
+# both implementations lose digits once exp() of a large exponent is involved
+FLOOR = 1e-100
+
+rng = np.random.default_rng(20240501)
+
+def assert_matches(ours, reference):
+    ours, reference = np.asarray(ours, dtype=float), np.asarray(reference, dtype=float)
+    assert ours.shape == reference.shape
+    significant = np.abs(reference) > FLOOR
+    np.testing.assert_allclose(ours[significant], reference[significant], rtol=RTOL, atol=0)
+    np.testing.assert_allclose(ours[~significant], reference[~significant], rtol=0, atol=FLOOR)
+
+def test_ndtr():
+    x = np.concatenate([np.linspace(-37, 9, 20001), [0.0, -np.inf, np.inf]])
+    assert_matches(fastmath.ndtr(x), sc.ndtr(x))
+
+def test_ndtri():
+    q = np.concatenate([np.logspace(-300, -1, 2000), np.linspace(0.01, 0.99, 2001), 1 - np.logspace(-16, -1, 500)])
+    assert_matches(fastmath.ndtri(q), sc.ndtri(q))
+    assert_matches(fastmath.ndtri([0.0, 0.5, 1.0]), [-np.inf, 0.0, np.inf])
+
+def test_gammaln():
+    x = np.concatenate([rng.uniform(-50, 1e4, 5000), [0.5, 1.0, 2.0, 0.0, -3.0]])
+    assert_matches(fastmath.gammaln(x), sc.gammaln(x))
+
+def test_xlogy_xlog1py():
+    x = np.array([0.0, 0.0, 1.5, 3.0, 2.0])
+    y = np.array([0.0, -1.0, 0.25, 2.0, -0.5])
+    assert_matches(fastmath.xlogy(x, np.abs(y)), sc.xlogy(x, np.abs(y)))
+    assert_matches(fastmath.xlog1py(x, y), sc.xlog1py(x, y))
+
+def test_betainc():
+    a, b = rng.uniform(0.5, 200, (2, 5000))
+    x = rng.uniform(0, 1, 5000)
+    assert_matches(fastmath.betainc(a, b, x), sc.betainc(a, b, x))
+    assert_matches(fastmath.betainc(2.0, 3.0, [0.0, 1.0]), [0.0, 1.0])
+
+def test_scalar_inputs():
+    assert isinstance(fastmath.gammaln(4.0), float)
+    assert isinstance(fastmath.ndtr(0.3), float)
+    assert isinstance(fastmath.stdtr(7, 1.5), float)
+    assert_matches(fastmath.bdtr(3, 10, 0.4), sc.bdtr(3, 10, 0.4))
+
+def test_binomial_cdf_and_sf():
+    k = np.floor(rng.uniform(0, 200, 5000))
+    n = k + np.floor(rng.uniform(1, 200, 5000))
+    p = rng.uniform(0, 1, 5000)
+    assert_matches(fastmath.bdtr(k, n, p), sc.bdtr(k, n.astype(np.int64), p))
+    assert_matches(fastmath.bdtrc(k, n, p), sc.bdtrc(k, n.astype(np.int64), p))
+    assert_matches(distributions.binomial_cdf(k, n, p), sc.bdtr(k, n.astype(np.int64), p))
+    assert_matches(distributions.binomial_sf(k, n, p), sc.bdtrc(k, n.astype(np.int64), p))
+    with pytest.raises(ValueError):
+        distributions.binomial_cdf(3, 10.5, 0.4)
+
+def test_poisson_cdf_and_sf():
+    k = np.floor(rng.uniform(0, 500, 5000))
+    m = rng.uniform(0, 500, 5000)
+    assert_matches(fastmath.pdtr(k, m), sc.pdtr(k, m))
+    assert_matches(fastmath.pdtrc(k, m), sc.pdtrc(k, m))
+    assert_matches(fastmath.gammainc(k + 1, m), sc.gammainc(k + 1, m))
+    assert_matches(fastmath.gammaincc(k + 1, m), sc.gammaincc(k + 1, m))
+
+def test_student_t_cdf():
+    df = np.floor(rng.uniform(1, 1000, 5000))
+    t = rng.normal(0, 5, 5000)
+    assert_matches(fastmath.stdtr(df, t), sc.stdtr(df, t))
+    assert_matches(fastmath.stdtr(5.0, [-np.inf, 0.0, np.inf]), [0.0, 0.5, 1.0])
+
+def test_sample_statistics():
+    data = rng.normal(14, 2, 1001)
+    assert_matches(fastmath.skew(data), ss.skew(data))
+    counts = np.round(data)
+    assert fastmath.mode(counts) == ss.mode(counts).mode
+    t_stat, p_value = fastmath.ttest_1samp(data, 14.1)
+    reference = ss.ttest_1samp(data, 14.1)
+    assert_matches([t_stat, p_value], [reference.statistic, reference.pvalue])
+
+def test_calculators_without_scipy(monkeypatch):
+    # The pure backend gives the same calculator results as scipy
+    monkeypatch.setattr(distributions, "special", fastmath)
+    monkeypatch.setattr(statistics, "special", fastmath)
+    k = np.arange(0, 61)
+    assert_matches(distributions.binomial_cdf(k, 60, 0.3), ss.binom.cdf(k, 60, 0.3))
+    assert_matches(distributions.binomial_sf(k, 60, 0.3), ss.binom.sf(k, 60, 0.3))
+    assert_matches(distributions.poisson_cdf(k, 12.5), ss.poisson.cdf(k, 12.5))
+    assert_matches(distributions.binomial_pmf(k, 60, 0.3), ss.binom.pmf(k, 60, 0.3))
+    x = np.linspace(-6, 6, 101)
+    assert_matches(distributions.normal_cdf(x, 1.0, 2.0), ss.norm.cdf(x, 1.0, 2.0))
+
+    data = rng.normal(14, 2, 200)
+    z = statistics.perform_z_test(data, 14.0, 2.0)
+    z_reference = 2 * ss.norm.sf(abs(z["Z-Score"]))
+    np.testing.assert_allclose(z["P-Value"], z_reference)
+
+def test_quantiles():
+    # Same quantiles as scipy for levels strictly inside (0, 1)
+    q = np.concatenate([rng.random(2000), [1e-12, 0.5, 1 - 1e-12]])
+    np.testing.assert_array_equal(distributions.binomial_ppf(q, 40, 0.3), ss.binom.ppf(q, 40, 0.3))
+    np.testing.assert_array_equal(distributions.binomial_isf(q, 40, 0.3), ss.binom.isf(q, 40, 0.3))
+    np.testing.assert_array_equal(distributions.poisson_ppf(q, 12.5), ss.poisson.ppf(q, 12.5))
+    np.testing.assert_array_equal(distributions.poisson_isf(q, 12.5), ss.poisson.isf(q, 12.5))
+    np.testing.assert_array_equal(distributions.geometric_ppf(q, 0.07), ss.geom.ppf(q, 0.07))
+    np.testing.assert_array_equal(distributions.geometric_isf(q, 0.07), ss.geom.isf(q, 0.07))
+    # Zero mean: with a shift, mean + σz cancels near the mean for any ndtri
+    assert_matches(distributions.normal_ppf(q, 0.0, 2.0), ss.norm.ppf(q, 0.0, 2.0))
+    assert_matches(distributions.normal_isf(q, 0.0, 2.0), ss.norm.isf(q, 0.0, 2.0))
+    assert_matches(distributions.exponential_ppf(q, 0.5), ss.expon.ppf(q, scale=2.0))
+    assert_matches(distributions.exponential_isf(q, 0.5), ss.expon.isf(q, scale=2.0))
+
+    for name, params, reference in [("binomial", (40, 0.3), ss.binom(40, 0.3)),
+                                    ("poisson", (12.5,), ss.poisson(12.5)),
+                                    ("geometric", (0.07,), ss.geom(0.07))]:
+        table = distributions.quantile_table(name, *params)
+        np.testing.assert_array_equal(table.ppf(q), reference.ppf(q))
+        np.testing.assert_array_equal(table.isf(q), reference.isf(q))
+
+    # Endpoints and levels within a few ulp of 0 and 1: tables and searches agree, and
+    # near 1 they follow the upper tail, P(X>k) <= 1 - q, where the CDF has rounded to 1
+    edges = np.concatenate([[0.0, 1e-300, 1e-12, 1.0], 1 - np.logspace(-16, -8, 100), [1 - 2.0**-53]])
+    for name, params, support in [("binomial", (10, 0.3), (0, 10)), ("binomial", (1000, 0.01), (0, 1000)),
+                                  ("binomial", (10**5, 0.5), (0, 10**5)), ("poisson", (1e4,), (0, np.inf)),
+                                  ("geometric", (0.07,), (1, np.inf))]:
+        table = distributions.quantile_table(name, *params)
+        ppf, isf = getattr(distributions, f"{name}_ppf"), getattr(distributions, f"{name}_isf")
+        np.testing.assert_array_equal(table.ppf(edges), ppf(edges, *params))
+        np.testing.assert_array_equal(table.isf(edges), isf(edges, *params))
+        assert (table.ppf(0), table.ppf(1), table.isf(0), table.isf(1)) == (support[0], support[1], support[1], support[0])
+        sf = getattr(distributions, f"{name}_sf")
+        k = table.ppf(edges[4:])
+        assert np.all(sf(k, *params) <= 1 - edges[4:]) and np.all(sf(k - 1, *params) > 1 - edges[4:])
+
+def test_resampling():
+    data = rng.exponential(2.0, 60)
+    references = {"mean": np.mean, "median": np.median, "std": lambda x: np.std(x, ddof=1),
+                  "variance": lambda x: np.var(x, ddof=1), "skewness": ss.skew}
+    # Closed-form leave-one-out values against recomputing without each point
+    for name, reference in references.items():
+        expected = [reference(np.delete(data, i)) for i in range(len(data))]
+        np.testing.assert_allclose(statistics._jackknife(data, name), expected, rtol=1e-10)
+        np.testing.assert_allclose(statistics._jackknife(data, statistics.RESAMPLING_STATISTICS[name]), expected, rtol=1e-10)
+
+    # Monte Carlo intervals agree with scipy's up to resampling noise
+    for method, scipy_method in [("percentile", "percentile"), ("bca", "BCa")]:
+        ours = statistics.bootstrap_ci(data, "mean", 0.9, method, num_resamples=20_000, seed=1)
+        reference = ss.bootstrap((data,), np.mean, confidence_level=0.9, method=scipy_method,
+                                 n_resamples=20_000, random_state=2).confidence_interval
+        assert abs(ours["CI Low"] - reference.low) < 0.1 * ours["Std Error"]
+        assert abs(ours["CI High"] - reference.high) < 0.1 * ours["Std Error"]
+
+    # Seeded streams are per block, so the worker count does not change the replicates
+    one = statistics.bootstrap_distribution(data, "median", 3000, seed=5, workers=1)
+    np.testing.assert_array_equal(one, statistics.bootstrap_distribution(data, "median", 3000, seed=5, workers=2))
+
+    other = rng.exponential(2.6, 40)
+    ours = statistics.permutation_test(data, other, num_permutations=20_000, seed=3)
+    reference = ss.permutation_test((data, other), lambda x, y, axis: x.mean(axis) - y.mean(axis),
+                                    vectorized=True, n_resamples=20_000, random_state=4)
+    assert abs(ours["P-Value"] - reference.pvalue) < 0.02
+    assert_matches(ours["Difference"], reference.statistic)
+
+def _brute_force_hand(cards):
+    # Best 5 of the cards, scored as comparable tuples (category, tie-breaking ranks...)
+    best = None
+    for five in combinations(cards, 5):
+        ranks = sorted((c // 4 for c in five), reverse=True)
+        flush = len({c % 4 for c in five}) == 1
+        groups = sorted(((ranks.count(r), r) for r in set(ranks)), reverse=True)
+        shape, order = [g[0] for g in groups], [g[1] for g in groups]
+        straight = None
+        if len(groups) == 5 and ranks[0] - ranks[4] == 4:
+            straight = ranks[0]
+        elif ranks == [12, 3, 2, 1, 0]:
+            straight = 3
+        if straight is not None:
+            score = (8 if flush else 4, straight)
+        elif flush:
+            score = (5, *ranks)
+        else:
+            score = ({(4, 1): 7, (3, 2): 6, (3, 1, 1): 3, (2, 2, 1): 2, (2, 1, 1, 1): 1}.get(tuple(shape), 0), *order)
+        best = score if best is None else max(best, score)
+    return best
+
+def test_poker(monkeypatch):
+    # Every 5-card hand: the textbook category counts and 7462 distinct hand values
+    hands = np.fromiter(chain.from_iterable(combinations(range(52), 5)), dtype=np.int64).reshape(-1, 5)
+    scores = poker.evaluate_hands(hands)
+    assert len(np.unique(scores)) == 7462
+    assert list(np.bincount(scores >> 20)) == [1302540, 1098240, 123552, 54912, 10200, 5108, 3744, 624, 40]
+
+    # 7-card hands rank exactly like the best-of-21 brute force (random deals plus tricky ones)
+    deals = [rng.permutation(52)[:7] for _ in range(3000)]
+    deals += [poker.parse_cards(h) for h in ["As2d3h4c5s9dKh", "As2s3s4s5s6sKh", "AhAdAcAsKdKhQc", "KhKdKcQsQdQh2c",
+                                             "9s9d8s8d7s7d2c", "TsJsQsKsAs9s8s", "2h2d3c3s4h4dAs", "5c6c7c8c9cTdJd"]]
+    ours = poker.evaluate_hands(np.array(deals))
+    reference = [_brute_force_hand(list(d)) for d in deals]
+    rank_of = {score: i for i, score in enumerate(sorted(set(reference)))}
+    np.testing.assert_array_equal(np.unique(ours, return_inverse=True)[1], [rank_of[r] for r in reference])
+    assert [s >> 20 for s in ours] == [r[0] for r in reference]
+
+    # Exact equity: every runout enumerated with the brute-force evaluator; small blocks
+    # make the streamed enumeration cross block boundaries
+    monkeypatch.setattr(poker, "EVAL_BLOCK", 97)
+    for holes, board in [(["AsAh", "KsKh"], "2s7sQd"), (["AhKh", "9c9d", "7s8s"], "Th5h6sJc"),
+                         (["QcQd", "AcKc"], "2c3cTh"), (["AhKh", "7s7c"], "QhJh2c5d9s")]:
+        result = poker.calculate_equity(holes[0], board, opponents=holes[1:])
+        known, dealt = [poker.parse_cards(h) for h in holes], poker.parse_cards(board)
+        used = set(sum(known, dealt))
+        wins, shares = np.zeros(len(holes)), np.zeros(len(holes))
+        runouts = list(combinations([c for c in range(52) if c not in used], 5 - len(dealt)))
+        for runout in runouts:
+            cards = dealt + list(runout)
+            values = [_brute_force_hand(h + cards) for h in known]
+            winners = [v == max(values) for v in values]
+            shares += np.array(winners) / sum(winners)
+            wins += np.array(winners) * (sum(winners) == 1)
+        assert result["Method"] == "exact" and result["Samples"] == len(runouts)
+        np.testing.assert_allclose(result["Equity"], shares / len(runouts), rtol=1e-12)
+        assert result["Win"] == pytest.approx(wins[0] / len(runouts), rel=1e-12)
+    # Preflop has too many runouts to enumerate by default
+    assert poker.calculate_equity("AhKh", opponents=["7s7c"], iterations=1000, seed=0)["Method"] == "monte carlo"
+
+def test_batch():
+    import json
+
+    requests = [
+        {"id": 1, "function": "distributions.calculate_binomial_probability", "params": {"n": 10, "k": 5, "p": 0.5}},
+        {"id": 2, "function": "distributions.calculate_binomial_probability", "params": {"n": 10.5, "k": 5, "p": 0.5}},
+        {"id": 3, "function": "distributions.calculate_binomial_probability", "args": [20, 3, 0.1]},
+        {"id": 4, "function": "distributions.calculate_binomial_probability", "params": {"n": 10, "k": 11, "p": 0.5}},
+        {"id": 5, "function": "distributions.calculate_poisson_distribution", "params": {"rate": 3, "k": 2}},
+        {"id": 6, "function": "scenarios.calculate_birthday_paradox", "params": {"n_people": 23}},
+        {"id": 7, "function": "probability.nope", "params": {}},
+    ]
+    lines = [json.dumps(r) for r in requests] + ["not json"]
+    results = [json.loads(line) for line in batch.process_batch(list(enumerate(lines, 1))).splitlines()]
+    assert [r["id"] for r in results] == [1, 2, 3, 4, 5, 6, 7, None]
+    # Grouped, vectorized rows give what one scalar call per row gives, errors included
+    for request, result in zip(requests, results):
+        expected = batch._call_one(request)
+        if "error" in expected:
+            assert result == expected
+        else:
+            assert_matches(result["result"], expected["result"])
+    assert [("error" in r) for r in results] == [False, True, False, True, False, False, True, True]
+    assert results[-1]["error"].startswith("line 8")
+
+def test_dice_sums():
+    # Exact counts of n dice summing to s, one sliding-window sum per die, as big integers
+    def exact_dice(n, faces=6):
+        counts = [1]
+        for _ in range(n):
+            padded = [0] * (faces - 1) + counts + [0] * (faces - 1)
+            counts = [sum(padded[s:s + faces]) for s in range(len(counts) + faces - 1)]
+        return np.array([c / faces**n for c in counts])
+
+    for n in (3, 300, 1000):
+        exact, dist = exact_dice(n), convolution.dice_sum(n)
+        s = np.arange(n, 6 * n + 1)
+        # Relative precision all the way into the tails, until float underflow
+        normal = exact > 1e-280
+        np.testing.assert_allclose(dist.pmf(s)[normal], exact[normal], rtol=1e-13)
+        np.testing.assert_allclose(dist.cdf(s)[normal], np.cumsum(exact)[normal], rtol=1e-13)
+        np.testing.assert_allclose(dist.sf(s - 1)[normal], np.cumsum(exact[::-1])[::-1][normal], rtol=1e-13)
+    assert convolution.dice_sum(300).low == 300 and convolution.dice_sum(300).high == 1800
+    assert convolution.dice_sum(1000).cdf(1800) > 0 and convolution.dice_sum(1000).sf(5200) > 0
+
+    # The FFT keeps the support and stays within eps x peak of the exact result
+    p = convolution.dice_sum(200).probs
+    fft, exact = convolution.convolve(p, p, "fft"), exact_dice(400)
+    assert np.all(fft >= 0) and fft[0] == exact[0] and fft[-1] == exact[-1]
+    assert np.max(np.abs(fft - exact)) < 1e-14 * exact.max()
+
+def test_adaptive_estimation():
+    # P(2 dice >= 10) = 6/36; every method's interval should be honest, not zero-width
+    for method in simulations.ESTIMATION_METHODS:
+        res = simulations.estimate_adaptive("dice", 10, target_se=0.002, method=method, seed=1, num_dice=2)
+        assert res["Converged"] and 0 < res["Std Error"] <= 0.002
+        assert abs(res["Estimate"] - 6 / 36) < 5 * res["Std Error"]
+    with pytest.raises(ValueError):
+        simulations.estimate_adaptive("dice", None, target_se=0.01, method="control", num_dice=2)
+
+def test_cache():
+    assert len({cache.normalize(v) for v in (True, 1, 1.0, np.int8(1), np.float64(1), np.bool_(True))}) == 1
+
+    calls = []
+    @cache.memoize(name="test_cache.draw", max_bytes=3000)
+    def draw(size, seed=None):
+        calls.append(seed)
+        return {"Values": np.random.default_rng(seed).random(size), "Tags": [[size]]}
+
+    draw(10), draw(10)
+    assert calls == [None, None]
+    first = draw(100, seed=1)
+    first["Tags"][0].append("changed")
+    with pytest.raises(ValueError):
+        first["Values"][0] = 0
+    assert draw(100, seed=1)["Tags"] == [[100]] and calls == [None, None, 1]
+
+    # 100 floats fit the 3,000 byte budget twice but not three times
+    draw(100, seed=2), draw(100, seed=3)
+    assert draw.cache.nbytes <= 3000 and len(draw.cache) == 2
+    # A result larger than the whole budget is recomputed rather than kept
+    draw(1000, seed=4), draw(1000, seed=4)
+    assert calls[-2:] == [4, 4] and len(draw.cache) == 2
+
+def test_bayesnet():
+    rng = np.random.default_rng(18)
+    # Random DAGs of up to 3 parents; the reference sums the full joint distribution
+    for trial in range(5):
+        net, names = bayesnet.BayesianNetwork(), [f"V{i}" for i in range(8)]
+        for i, name in enumerate(names):
+            parents = list(rng.choice(names[:i], size=min(i, int(rng.integers(0, 4))), replace=False))
+            shape = tuple(len(net.states[p]) for p in parents) + (int(rng.integers(2, 4)),)
+            net.add_variable(name, [f"s{j}" for j in range(shape[-1])], rng.dirichlet(np.ones(shape[-1]), shape[:-1]), parents)
+
+        joint = {}
+        for states in product(*(range(len(net.states[n])) for n in names)):
+            assignment = dict(zip(names, states))
+            joint[states] = np.prod([net.cpts[n][tuple(assignment[p] for p in net.parents[n]) + (assignment[n],)]
+                                     for n in names])
+
+        def enumerate_probability(event):
+            return sum(p for states, p in joint.items() if all(states[names.index(n)] == s for n, s in event.items()))
+
+        evidence_sets = []
+        for _ in range(6):
+            observed = rng.choice(names, size=int(rng.integers(0, 4)), replace=False)
+            evidence = {n: f"s{rng.integers(len(net.states[n]))}" for n in observed}
+            evidence_sets.append(evidence)
+            as_index = {n: int(s[1:]) for n, s in evidence.items()}
+            total = enumerate_probability(as_index)
+            for target in names:
+                expected = [enumerate_probability({**as_index, target: j}) / total if target not in as_index
+                            else float(j == as_index[target]) for j in range(len(net.states[target]))]
+                np.testing.assert_allclose(list(net.query(target, evidence).values()), expected, rtol=1e-10, atol=1e-15)
+            pair = {names[0]: "s1", names[-1]: "s0"}
+            if not set(pair) & set(evidence):
+                expected = enumerate_probability({**as_index, names[0]: 1, names[-1]: 0}) / total
+                assert net.probability(pair, evidence) == pytest.approx(expected, rel=1e-10)
+
+        # Batched posteriors match one query at a time, grouped or not
+        target = names[-1]
+        batch_result = net.query_batch(target, evidence_sets)
+        for row, evidence in zip(batch_result, evidence_sets):
+            np.testing.assert_allclose(row, list(net.query(target, evidence).values()), rtol=1e-10, atol=1e-15)
+        approximate = net.likelihood_weighting(target, evidence_sets[0], num_samples=200_000, seed=trial)
+        np.testing.assert_allclose(list(approximate.values()), batch_result[0], atol=0.02)
+
+    net = bayesnet.BayesianNetwork()
+    net.add_variable("A", ["no", "yes"], [1.0, 0.0])
+    net.add_variable("B", ["no", "yes"], [[0.5, 0.5], [0.1, 0.9]], parents=["A"])
+    with pytest.raises(ValueError):
+        net.query("B", {"A": "yes"})
+
+def test_ruin(monkeypatch):
+    # ±1 bets: ((1 - p) / p)^b; win 2 / lose 1: z^b, z the root in (0, 1) of p z^3 - z + q
+    for p in (0.51, 0.6, 0.9):
+        b = np.arange(0, 200)
+        np.testing.assert_allclose(ruin.ruin_curve([1, -1], [p, 1 - p], 199), ((1 - p) / p) ** b, rtol=1e-9, atol=1e-15)
+        z = (-p + np.sqrt(p * p + 4 * p * (1 - p))) / (2 * p)
+        np.testing.assert_allclose(ruin.ruin_curve([2, -1], [p, 1 - p], 199), z**b, rtol=1e-9, atol=1e-15)
+    assert ruin.ruin_probability([1, -1], [0.5, 0.5], 10) == 1.0
+
+    # The NumPy banded elimination against a dense solve
+    steps, probs, n = (3, 1, -2, -4), (0.3, 0.3, 0.3, 0.1), 60
+    dense = np.eye(n)
+    for step, p in zip(steps, probs):
+        dense -= p * np.eye(n, k=step)
+    lower, upper = 4, 3
+    band = np.array([[dense[i, i + j - lower] if 0 <= i + j - lower < n else 0.0
+                      for j in range(lower + upper + 1)] for i in range(n)])
+    rhs = rng.random(n)
+    np.testing.assert_allclose(ruin._solve_banded(band, lower, rhs), np.linalg.solve(dense, rhs), rtol=1e-12)
+
+    # Payoffs on a very fine lattice (0.333 vs 1 is a 0.001 unit) are too big a band to solve;
+    # risk_of_ruin simulates instead of exhausting memory or time
+    with pytest.raises(ValueError):
+        ruin.ruin_curve([333, -1000], [0.76, 0.24], 50_000)
+    result = ruin.risk_of_ruin([0.333, -1], [0.76, 0.24], 50, num_paths=200, seed=0)
+    assert result["Method"].startswith("Simulation")
+    assert ruin.risk_of_ruin([0.37, -1.23], [0.8, 0.2], 50)["Method"] == "Markov chain"
+
+    # Past the exact bounds the fallback says why, keeps paths x bets within MAX_SIM_WORK,
+    # and unseeded runs are never served from the cache
+    monkeypatch.setattr(ruin, "MAX_HORIZON_WORK", 1000)
+    monkeypatch.setattr(ruin, "MAX_SIM_WORK", 1 << 20)
+    result = ruin.risk_of_ruin([1, -1], [0.6, 0.4], 20, horizon=500, seed=0)
+    assert result["Method"] == "Simulation (2,097 paths, 500 bets)" and result["Note"].startswith("Horizon")
+    cached = cache.cached_module(ruin).risk_of_ruin
+    cached.cache.clear()
+    cached([1, -1], [0.6, 0.4], 20, 500), cached([1, -1], [0.6, 0.4], 20, 500)
+    assert len(cached.cache) == 0
+    cached([1, -1], [0.6, 0.4], 20, 500, seed=0)
+    assert len(cached.cache) == 1
+
+def test_collisions():
+    from fractions import Fraction
+    from math import factorial, prod
+
+    # Pairs: exact products for small spaces, leading series terms for 2^128
+    for d in (2, 30, 365):
+        n = np.arange(d + 3)
+        exact = [1 - float(prod(Fraction(d - i, d) for i in range(m))) for m in n]
+        np.testing.assert_allclose(collision.collision_curve(d + 2, d), exact, rtol=1e-12, atol=1e-15)
+    d, n = 2.0**128, np.array([2.0, 1e3, 2.0**32, 2.0**50])
+    series = n * (n - 1) / (2 * d) + n * (n - 1) * (2 * n - 1) / (12 * d * d)
+    assert_matches(collision.collision_probability(n, 2**128), -np.expm1(-series))
+
+    # k-way: n! [z^n] (truncated exponential)^d / d^n, expanded with exact fractions
+    for d, k in [(7, 3), (12, 3), (6, 4)]:
+        poly = [Fraction(1)]
+        for _ in range(d):
+            poly = [sum(poly[m - j] / factorial(j) for j in range(k) if 0 <= m - j < len(poly))
+                    for m in range(len(poly) + k - 1)]
+        exact = [1 - float(poly[m] * factorial(m) / Fraction(d) ** m) for m in range(len(poly))]
+        np.testing.assert_allclose(collision.collision_curve(len(poly) - 1, d, k), exact, rtol=1e-12, atol=1e-14)
+    # Past n = d (the tilted model), up to the pigeonhole bound; integer coefficients of (k-1)! e(z)
+    d, k = 60, 5
+    poly = [1]
+    for _ in range(d):
+        poly = [sum(factorial(k - 1) // factorial(j) * poly[m - j] for j in range(k) if 0 <= m - j < len(poly))
+                for m in range(len(poly) + k - 1)]
+    exact = [float(1 - Fraction(factorial(m) * c, factorial(k - 1) ** d * d**m)) for m, c in enumerate(poly)]
+    np.testing.assert_allclose(collision.collision_curve(len(poly) - 1, d, k), exact, rtol=1e-9, atol=1e-12)
+    for d, k in [(365, 6), (365, 10), (10**4, 10)]:
+        with np.errstate(over="raise", invalid="raise"):
+            curve = collision.collision_curve(d * (k - 1) + 1, d, k)
+        assert np.all(np.isfinite(curve)) and np.all(np.diff(curve) >= 0) and curve[-1] == 1
+    assert collision.collision_probability(1500, 365, 6) > 1 - 1e-12
+    assert collision.collision_probability(2000, 365, 10) > 0.99
+    # Tiny triple-collision probabilities keep their digits: C(n, 3) / d^2 to leading order
+    assert abs(collision.collision_probability(10**5, 1e12, 3) / (1e5**3 / 6 / 1e24) - 1) < 1e-4
+
+    # Unequal buckets: equal weights reproduce the uniform curve; small case by hand
+    np.testing.assert_allclose(collision.collision_curve(40, probs=np.ones(365)), collision.collision_curve(40), rtol=1e-12, atol=1e-13)
+    np.testing.assert_allclose(collision.collision_curve(4, probs=[2, 1, 1]), [0, 0, 0.375, 0.8125, 1], atol=1e-15)
+
+    # Inverse: the largest group within the budget, and one more person exceeds it
+    for epsilon, d, k in [(0.5, 365, 2), (0.5, 365, 3), (1e-9, 2**64, 2), (1e-6, 2**40, 3)]:
+        n = collision.max_group_size(epsilon, d, k)
+        assert collision.collision_probability(n, d, k) <= epsilon < collision.collision_probability(n + 1, d, k)
+    assert collision.max_group_size(0.5) == 22 and collision.max_group_size(0.5, k=3) == 87
+
+def test_lottery():
+    # Tiers are products of the white and bonus hypergeometric terms
+    for pool, pick, bonus_pool, bonus_pick in [lottery.POWERBALL, (49, 6, 0, 0), (50, 5, 12, 2), (80, 20, 0, 0)]:
+        tiers = lottery.prize_tiers(pool, pick, bonus_pool, bonus_pick)
+        for (w, b), p in tiers.items():
+            bonus = ss.hypergeom.pmf(b, bonus_pool, bonus_pick, bonus_pick) if bonus_pick else 1.0
+            assert_matches(p, ss.hypergeom.pmf(w, pool, pick, pick) * bonus)
+        assert abs(sum(tiers.values()) - 1) < 1e-12
+    assert lottery.prize_tiers(*lottery.POWERBALL)[(5, 1)] == 1 / 292_201_338
+    assert scenarios.calculate_lottery_probability(69, 5, 26, 1) == 1 / 292_201_338
+    with pytest.raises(ValueError):
+        scenarios.calculate_lottery_probability(5, 6)
+
+    # Jackpot sharing: E[1 / (1 + K)], K ~ Binomial(N - 1, p), summed directly
+    for p, tickets in [(0.01, 50), (1e-3, 2000), (0.5, 7)]:
+        k = np.arange(tickets)
+        assert_matches(lottery.jackpot_share(p, tickets), np.sum(ss.binom.pmf(k, tickets - 1, p) / (1 + k)))
+    ev = lottery.expected_value(49, 6, prizes={(6, 0): 1e6, (3, 0): 10}, ticket_price=1)
+    assert_matches(ev["Expected Prize"], 1e6 / 13_983_816 + 10 * lottery.prize_tiers(49, 6)[(3, 0)])
+    with pytest.raises(ValueError):
+        lottery.expected_value(49, 6, prizes={(7, 0): 1})
+
+    # Bitmask tickets: distinct numbers, and the simulated tiers follow the exact odds
+    rng = np.random.default_rng(0)
+    words = rng.integers(0, 2**63, size=(500, 2), dtype=np.uint64)
+    assert list(lottery.popcount(words)) == [bin(int(a)).count("1") + bin(int(b)).count("1") for a, b in words]
+    for pool, pick in [(69, 5), (80, 20)]:
+        assert np.all(lottery.popcount(lottery.random_masks(rng, 1000, pool, pick)) == pick)
+    for game in [lottery.POWERBALL, (80, 20, 0, 0)]:
+        sim = lottery.simulate_tickets(*game, num_tickets=200_000, seed=1, chunk_size=30_000)
+        exact = lottery.prize_tiers(*game)
+        assert sum(sim["Tier Counts"].values()) == 200_000
+        for tier, count in sim["Tier Counts"].items():
+            p = exact[tier]
+            assert abs(count - 200_000 * p) <= 5 * np.sqrt(200_000 * p * (1 - p)) + 1
+    sim = lottery.simulate_tickets(6, 6, num_tickets=10, draw=[1, 2, 3, 4, 5, 6])
+    assert sim["Jackpot Winners"] == 10